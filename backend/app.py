@@ -3,13 +3,28 @@ from flask_cors import CORS
 from config.settings import Config
 from routes.document_routes import document_bp
 from routes.health_routes import health_bp
+from routes.job_routes import job_bp
+from routes.store_routes import store_bp
+from services import compression, metrics, tracing
+from services.json_codec import FastJSONProvider
+from services.file_service import UploadRequest
+from services.service_registry import WARM_UP_MODES, start_warm_up, warm_up_models
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 
 def create_app():
     """Application factory pattern for creating Flask app."""
     app = Flask(__name__)
 
+    # Receive uploads in memory, hashing and sniffing them as they arrive
+    app.request_class = UploadRequest
+
+    # Encode JSON responses compactly, with orjson when it is installed
+    app.json = FastJSONProvider(app)
+
     # Load configuration
     app.config.from_object(Config)
 
@@ -19,10 +34,32 @@ def create_app():
     # Register blueprints
     app.register_blueprint(health_bp, url_prefix='/api')
     app.register_blueprint(document_bp, url_prefix='/api')
+    app.register_blueprint(job_bp, url_prefix='/api')
+    app.register_blueprint(store_bp, url_prefix='/api')
+
+    # Track requests in progress for /api/metrics
+    metrics.init_app(app)
+
+    # Server-Timing headers and opt-in profiling traces
+    tracing.init_app(app)
+
+    # Compress large JSON responses; runs before the tracing headers are set
+    compression.init_app(app)
 
     # Ensure upload directory exists
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+    # Load the conversion models. Preloading blocks until they are ready; under
+    # gunicorn with preload_app this runs once in the master and forked
+    # workers share the weights copy-on-write
+    warm_up_mode = app.config['MODEL_WARMUP']
+    if warm_up_mode not in WARM_UP_MODES:
+        logger.warning(f"Unknown MODEL_WARMUP {warm_up_mode}, loading models lazily")
+    elif warm_up_mode == 'preload':
+        warm_up_models(Config.PIPELINE_WARM_PROFILES)
+    elif warm_up_mode == 'background':
+        start_warm_up(Config.PIPELINE_WARM_PROFILES)
+
     return app
 
 
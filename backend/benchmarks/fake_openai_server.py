@@ -0,0 +1,407 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Serves ``POST /v1/chat/completions`` (plain and streaming) with canned answers
+and a latency model, so the analysis endpoints can be benchmarked offline
+without paying for tokens. Prompt prefix caching is simulated the way the
+provider does it: prompts of at least 1024 tokens are cached in 128-token
+increments, cached tokens are reported in ``prompt_tokens_details`` and skip
+most of the prefill time.
+
+Rate limiting can be injected to see how the service behaves under provider
+back-pressure: a share of requests, or every request beyond a concurrency
+limit, gets a 429 with a ``retry-after`` header, as the real API sends.
+
+Usage:
+    python -m benchmarks.fake_openai_server --port 8765
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python app.py
+"""
+
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# Rough token estimate used throughout the app (~4 characters per token)
+CHARS_PER_TOKEN = 4
+
+# Prefix caching granularity of the provider
+MIN_CACHED_PREFIX_TOKENS = 1024
+CACHE_INCREMENT_TOKENS = 128
+
+
+class FakeOpenAIServer:
+    """Threaded HTTP server imitating the chat completions endpoint."""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        base_latency: float = 0.05,
+        prefill_tokens_per_second: float = 20000.0,
+        cached_prefill_speedup: float = 10.0,
+        output_tokens_per_second: float = 200.0,
+        completion_tokens: int = 50,
+        prefix_cache: bool = True,
+        latency_jitter: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        max_concurrent: int = 0,
+        retry_after: float = 1.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the fake server.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on, 0 for any free port
+            base_latency: Fixed seconds added to every request
+            prefill_tokens_per_second: Prompt processing speed
+            cached_prefill_speedup: How much faster cached prompt tokens are
+            output_tokens_per_second: Completion generation speed
+            completion_tokens: Number of tokens in every answer
+            prefix_cache: Simulate prompt prefix caching
+            latency_jitter: Relative random variation of every delay, e.g.
+                            0.2 for +/-20%
+            rate_limit_rate: Share of requests rejected with a 429
+            max_concurrent: Requests in flight beyond which new ones get a
+                            429, 0 for no limit
+            retry_after: Seconds advertised in the retry-after header of 429s
+            seed: Seed of the jitter and rate limit draws
+        """
+        self.base_latency = base_latency
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.cached_prefill_speedup = cached_prefill_speedup
+        self.output_tokens_per_second = output_tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.prefix_cache = prefix_cache
+        self.latency_jitter = latency_jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+
+        self._random = random.Random(seed)
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to use as OPENAI_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'FakeOpenAIServer':
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self) -> None:
+        """Forget every cached prefix and the request counts."""
+        with self._lock:
+            self._cached_prefixes.clear()
+            self.requests = 0
+            self.rate_limited = 0
+            self.peak_in_flight = self.in_flight
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of requests served and rejected since the last reset."""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'rate_limited': self.rate_limited,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+            }
+
+    def serve_forever(self) -> None:
+        """Serve requests from the calling thread."""
+        self._server.serve_forever()
+
+    def _admit(self) -> bool:
+        """
+        Count a request in flight, unless it is rate limited.
+
+        Returns:
+            False when the request must be answered with a 429
+        """
+        with self._lock:
+            limited = (
+                self.max_concurrent > 0 and self.in_flight >= self.max_concurrent
+            ) or (
+                self.rate_limit_rate > 0
+                and self._random.random() < self.rate_limit_rate
+            )
+            if limited:
+                self.rate_limited += 1
+                return False
+
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def _release(self) -> None:
+        """Count a request as finished."""
+        with self._lock:
+            self.in_flight -= 1
+
+    def _jitter(self, seconds: float) -> float:
+        """Randomly vary a delay by up to ``latency_jitter``."""
+        if not self.latency_jitter:
+            return seconds
+        with self._lock:
+            factor = self._random.uniform(-self.latency_jitter, self.latency_jitter)
+        return max(0.0, seconds * (1 + factor))
+
+    def _lookup_prefix(self, prompt: str) -> int:
+        """
+        Find how many prompt tokens are served from the prefix cache.
+
+        Every increment boundary of the prompt is added to the cache, so a
+        later prompt sharing the prefix hits it.
+        """
+        prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+        if not self.prefix_cache or prompt_tokens < MIN_CACHED_PREFIX_TOKENS:
+            return 0
+
+        digest = hashlib.sha256()
+        boundaries = []
+        position = 0
+        for tokens in range(
+            MIN_CACHED_PREFIX_TOKENS, prompt_tokens + 1, CACHE_INCREMENT_TOKENS
+        ):
+            end = tokens * CHARS_PER_TOKEN
+            digest.update(prompt[position:end].encode('utf-8'))
+            position = end
+            boundaries.append((tokens, digest.hexdigest()))
+
+        cached_tokens = 0
+        with self._lock:
+            for tokens, prefix_hash in boundaries:
+                if prefix_hash not in self._cached_prefixes:
+                    break
+                cached_tokens = tokens
+            self._cached_prefixes.update(prefix_hash for _, prefix_hash in boundaries)
+
+        return cached_tokens
+
+    def _complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute the answer, usage and simulated latency of a request."""
+        messages: List[Dict[str, Any]] = body.get('messages', [])
+        prompt = ''.join(
+            f"<|{message.get('role')}|>{message.get('content') or ''}"
+            for message in messages
+        )
+        prompt_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+        cached_tokens = self._lookup_prefix(prompt)
+        completion_tokens = min(
+            self.completion_tokens, body.get('max_tokens') or self.completion_tokens
+        )
+
+        with self._lock:
+            self.requests += 1
+
+        uncached_tokens = prompt_tokens - cached_tokens
+        prefill_seconds = (
+            uncached_tokens + cached_tokens / self.cached_prefill_speedup
+        ) / self.prefill_tokens_per_second
+
+        words = ['Stand-in', 'answer', f"for a {prompt_tokens}-token", 'prompt.']
+        words += ['lorem'] * max(0, completion_tokens - len(words))
+
+        return {
+            'words': words[:completion_tokens],
+            'prefill_seconds': self._jitter(self.base_latency + prefill_seconds),
+            'token_seconds': self._jitter(1.0 / self.output_tokens_per_second),
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+                'prompt_tokens_details': {'cached_tokens': cached_tokens},
+            },
+        }
+
+    def _make_handler(self):
+        """Build the request handler class bound to this server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send_json(404, {'error': {'message': 'Not found'}})
+                    return
+
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+
+                if not server._admit():
+                    self._rate_limited()
+                    return
+
+                try:
+                    self._answer(body)
+                finally:
+                    server._release()
+
+            def _rate_limited(self):
+                data = json.dumps(
+                    {
+                        'error': {
+                            'message': 'Rate limit reached for requests',
+                            'type': 'requests',
+                            'code': 'rate_limit_exceeded',
+                        }
+                    }
+                ).encode('utf-8')
+                self.send_response(429)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('retry-after', f"{server.retry_after:g}")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _answer(self, body):
+                completion = server._complete(body)
+                model = body.get('model', 'fake-model')
+
+                time.sleep(completion['prefill_seconds'])
+
+                if body.get('stream'):
+                    self._stream(body, model, completion)
+                    return
+
+                time.sleep(completion['token_seconds'] * len(completion['words']))
+                self._send_json(
+                    200,
+                    {
+                        'id': 'chatcmpl-fake',
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': model,
+                        'choices': [
+                            {
+                                'index': 0,
+                                'message': {
+                                    'role': 'assistant',
+                                    'content': ' '.join(completion['words']),
+                                },
+                                'finish_reason': 'stop',
+                            }
+                        ],
+                        'usage': completion['usage'],
+                    },
+                )
+
+            def _stream(self, body, model, completion):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+
+                def send(chunk):
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+
+                base = {
+                    'id': 'chatcmpl-fake',
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': model,
+                }
+                for index, word in enumerate(completion['words']):
+                    time.sleep(completion['token_seconds'])
+                    content = word if index == 0 else f" {word}"
+                    send(
+                        {
+                            **base,
+                            'choices': [
+                                {
+                                    'index': 0,
+                                    'delta': {'content': content},
+                                    'finish_reason': None,
+                                }
+                            ],
+                        }
+                    )
+
+                send(
+                    {
+                        **base,
+                        'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+                    }
+                )
+                if (body.get('stream_options') or {}).get('include_usage'):
+                    send({**base, 'choices': [], 'usage': completion['usage']})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main() -> None:
+    """Run the fake server in the foreground."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--base-latency', type=float, default=0.05)
+    parser.add_argument('--prefill-tps', type=float, default=20000.0)
+    parser.add_argument('--output-tps', type=float, default=200.0)
+    parser.add_argument('--completion-tokens', type=int, default=50)
+    parser.add_argument('--no-prefix-cache', action='store_true')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--max-concurrent', type=int, default=0)
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        host=args.host,
+        port=args.port,
+        base_latency=args.base_latency,
+        prefill_tokens_per_second=args.prefill_tps,
+        output_tokens_per_second=args.output_tps,
+        completion_tokens=args.completion_tokens,
+        prefix_cache=not args.no_prefix_cache,
+        latency_jitter=args.jitter,
+        rate_limit_rate=args.rate_limit_rate,
+        max_concurrent=args.max_concurrent,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"Fake OpenAI server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
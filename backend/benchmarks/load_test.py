@@ -0,0 +1,583 @@
+"""
+HTTP load test of the document API.
+
+Drives /api/parse, /api/analyze and /api/validate-file with a weighted mix of
+endpoints and corpus files, either closed-loop at a fixed concurrency or
+open-loop at a fixed arrival rate. Reports throughput, latency percentiles,
+error rates and worker saturation. Saturation is measured from the
+requests-in-progress gauge of /api/metrics and from Little's law.
+
+With --spawn it starts gunicorn for every combination of --workers and
+--threads, pointed at an in-process fake OpenAI server, so worker and thread
+counts can be compared in one run.
+
+Usage:
+    python -m benchmarks.load_test --url http://127.0.0.1:5000/api --duration 60
+    python -m benchmarks.load_test --spawn --workers 2,4 --threads 1,4 --concurrency 16
+    python -m benchmarks.load_test --spawn --mix parse=5,analyze=3,validate=2 --rate 4
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import socket
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.parser_benchmark import percentile
+from benchmarks.parser_corpus import CATEGORIES, generate_corpus
+
+ENDPOINTS = {
+    'parse': '/parse',
+    'analyze': '/analyze',
+    'validate': '/validate-file',
+}
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_weights(value: str) -> List[Tuple[str, float]]:
+    """Parse "name=weight,name=weight" (or "name:weight") into pairs."""
+    weights = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        for separator in ('=', ':'):
+            if separator in item:
+                name, weight = item.rsplit(separator, 1)
+                weights.append((name.strip(), float(weight)))
+                break
+        else:
+            weights.append((item, 1.0))
+    return weights
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Sum the durations of a Server-Timing header by metric name."""
+    durations: Dict[str, float] = {}
+    for metric in header.split(','):
+        parts = [part.strip() for part in metric.split(';')]
+        if not parts[0]:
+            continue
+        for part in parts[1:]:
+            if part.startswith('dur='):
+                try:
+                    durations[parts[0]] = durations.get(parts[0], 0.0) + float(part[4:])
+                except ValueError:
+                    pass
+    return durations
+
+
+class Workload:
+    """Weighted random choice of endpoints and files to send."""
+
+    def __init__(
+        self,
+        endpoints: List[Tuple[str, float]],
+        files: List[Tuple[str, float]],
+        prompt: str,
+        seed: int = 0,
+    ):
+        """
+        Initialize the workload.
+
+        Args:
+            endpoints: (endpoint name, weight) pairs, names from ENDPOINTS
+            files: (file path, weight) pairs
+            prompt: Prompt sent to /analyze
+            seed: Seed of the random choices
+        """
+        self.endpoints = [name for name, _ in endpoints]
+        self.endpoint_weights = [weight for _, weight in endpoints]
+        self.files = [path for path, _ in files]
+        self.file_weights = [weight for _, weight in files]
+        self.prompt = prompt
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # Uploads are read once so the client never waits on the disk
+        self._contents = {}
+        for path in self.files:
+            with open(path, 'rb') as f:
+                self._contents[path] = f.read()
+
+    def next_request(self) -> Dict[str, Any]:
+        """Pick the endpoint, file and form fields of the next request."""
+        with self._lock:
+            endpoint = self._random.choices(self.endpoints, self.endpoint_weights)[0]
+            path = self._random.choices(self.files, self.file_weights)[0]
+
+        data = {}
+        if endpoint == 'parse':
+            data['output_format'] = 'markdown'
+        elif endpoint == 'analyze':
+            data['prompt'] = self.prompt
+
+        return {
+            'endpoint': endpoint,
+            'file': os.path.basename(path),
+            'files': {'file': (os.path.basename(path), self._contents[path])},
+            'data': data,
+        }
+
+
+class SaturationSampler:
+    """Poll the requests-in-progress gauge of /api/metrics during a run."""
+
+    def __init__(self, client: httpx.Client, base_url: str, interval: float = 0.5):
+        self.client = client
+        self.url = f"{base_url}/metrics"
+        self.interval = interval
+        self.in_progress: List[float] = []
+        self.scrape_seconds: List[float] = []
+        self.available = True
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='saturation-sampler', daemon=True
+        )
+
+    def start(self) -> 'SaturationSampler':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            started_at = time.perf_counter()
+            try:
+                response = self.client.get(self.url, timeout=10)
+            except httpx.HTTPError:
+                continue
+            if response.status_code != 200:
+                # Metrics are disabled (prometheus-client not installed)
+                self.available = False
+                return
+
+            self.scrape_seconds.append(time.perf_counter() - started_at)
+            in_progress = 0.0
+            for line in response.text.splitlines():
+                if line.startswith('docparser_requests_in_progress{'):
+                    # The scrape itself is always in progress
+                    if 'health.metrics_export' not in line:
+                        in_progress += float(line.rsplit(' ', 1)[1])
+            self.in_progress.append(in_progress)
+
+
+def send(client: httpx.Client, base_url: str, request: Dict[str, Any]) -> Dict:
+    """Send one request and measure it."""
+    started_at = time.perf_counter()
+    try:
+        response = client.post(
+            base_url + ENDPOINTS[request['endpoint']],
+            files=request['files'],
+            data=request['data'],
+        )
+        status = response.status_code
+        size = len(response.content)
+        server_timing = parse_server_timing(response.headers.get('Server-Timing', ''))
+    except httpx.TimeoutException:
+        status, size, server_timing = 'timeout', 0, {}
+    except httpx.HTTPError as e:
+        status, size, server_timing = type(e).__name__, 0, {}
+
+    return {
+        'endpoint': request['endpoint'],
+        'file': request['file'],
+        'status': status,
+        'seconds': time.perf_counter() - started_at,
+        'bytes': size,
+        'server_timing': server_timing,
+    }
+
+
+def run_closed_loop(
+    client, base_url: str, workload: Workload, concurrency: int, duration: float
+) -> List[Dict[str, Any]]:
+    """Keep ``concurrency`` requests in flight for ``duration`` seconds."""
+    deadline = time.monotonic() + duration
+    results: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+
+    def user():
+        while time.monotonic() < deadline:
+            result = send(client, base_url, workload.next_request())
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=user) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run_open_loop(
+    client,
+    base_url: str,
+    workload: Workload,
+    rate: float,
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Send requests at Poisson arrivals of ``rate`` per second.
+
+    Latency is measured from each request's scheduled arrival, so time spent
+    waiting for a free client slot counts, as it would for a real user. This
+    avoids hiding queueing when the service falls behind.
+    """
+    arrivals = random.Random(seed)
+    started_at = time.perf_counter()
+    futures = []
+
+    def scheduled(request, arrival):
+        result = send(client, base_url, request)
+        result['seconds'] = time.perf_counter() - arrival
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        arrival = started_at
+        while True:
+            arrival += arrivals.expovariate(rate)
+            if arrival - started_at > duration:
+                break
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(scheduled, workload.next_request(), arrival))
+
+    return [future.result() for future in futures]
+
+
+def summarize_results(results: List[Dict[str, Any]], elapsed: float) -> Dict:
+    """Throughput, latency percentiles and errors of a set of requests."""
+    latencies = [result['seconds'] for result in results]
+    errors: Dict[str, int] = {}
+    for result in results:
+        if result['status'] != 200:
+            errors[str(result['status'])] = errors.get(str(result['status']), 0) + 1
+
+    stages: Dict[str, List[float]] = {}
+    for result in results:
+        for stage, milliseconds in result['server_timing'].items():
+            stages.setdefault(stage, []).append(milliseconds)
+
+    def rounded(value: Optional[float]) -> Optional[float]:
+        return round(value, 4) if value is not None else None
+
+    return {
+        'requests': len(results),
+        'ok': len(results) - sum(errors.values()),
+        'errors': errors,
+        'error_rate': round(sum(errors.values()) / len(results), 4) if results else 0,
+        'throughput_rps': round(len(results) / elapsed, 3) if elapsed else None,
+        'latency_seconds': {
+            'p50': rounded(percentile(latencies, 0.5)),
+            'p90': rounded(percentile(latencies, 0.9)),
+            'p95': rounded(percentile(latencies, 0.95)),
+            'p99': rounded(percentile(latencies, 0.99)),
+            'max': rounded(max(latencies, default=None)),
+            'mean': rounded(statistics.mean(latencies)) if latencies else None,
+        },
+        'server_timing_ms': {
+            stage: round(statistics.mean(values), 1) for stage, values in stages.items()
+        },
+    }
+
+
+def run_load(
+    base_url: str,
+    workload: Workload,
+    args,
+    capacity: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Warm up, run the load and summarize it."""
+    limits = httpx.Limits(
+        max_connections=args.concurrency + 1,
+        max_keepalive_connections=args.concurrency + 1,
+    )
+    with httpx.Client(timeout=args.timeout, limits=limits) as client:
+        if args.warmup > 0:
+            run_closed_loop(client, base_url, workload, args.concurrency, args.warmup)
+
+        sampler = SaturationSampler(client, base_url).start()
+        started_at = time.perf_counter()
+        if args.rate:
+            results = run_open_loop(
+                client,
+                base_url,
+                workload,
+                args.rate,
+                args.concurrency,
+                args.duration,
+                args.seed,
+            )
+        else:
+            results = run_closed_loop(
+                client, base_url, workload, args.concurrency, args.duration
+            )
+        elapsed = time.perf_counter() - started_at
+        sampler.stop()
+
+    summary = summarize_results(results, elapsed)
+    summary['endpoints'] = {
+        endpoint: summarize_results(
+            [result for result in results if result['endpoint'] == endpoint],
+            elapsed,
+        )
+        for endpoint in workload.endpoints
+    }
+
+    # Little's law: requests in the system = arrival rate x time in the system
+    mean_latency = summary['latency_seconds']['mean'] or 0
+    saturation = {
+        'capacity': capacity,
+        'littles_law_concurrency': round(
+            (summary['throughput_rps'] or 0) * mean_latency, 2
+        ),
+        'in_progress_mean': None,
+        'in_progress_max': None,
+        'utilization': None,
+        'metrics_scrape_p95_seconds': None,
+    }
+    if sampler.available and sampler.in_progress:
+        saturation['in_progress_mean'] = round(statistics.mean(sampler.in_progress), 2)
+        saturation['in_progress_max'] = max(sampler.in_progress)
+        saturation['metrics_scrape_p95_seconds'] = round(
+            percentile(sampler.scrape_seconds, 0.95), 4
+        )
+        if capacity:
+            # Each scrape holds one of the slots while it is answered
+            saturation['utilization'] = round(
+                saturation['in_progress_mean'] / max(1, capacity - 1), 3
+            )
+    summary['saturation'] = saturation
+    summary['elapsed_seconds'] = round(elapsed, 2)
+    return summary
+
+
+def free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(base_url: str, process, timeout: float) -> Dict[str, Any]:
+    """Wait for a spawned server to answer and for its models to warm up."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {process.returncode}")
+        try:
+            response = httpx.get(f"{base_url}/ready", timeout=5)
+            state = response.json()
+            if response.status_code == 200 or state['models']['status'] == 'failed':
+                return state
+        except (httpx.HTTPError, ValueError, KeyError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server not ready after {timeout}s")
+
+
+def spawn_gunicorn(
+    workers: int, threads: int, openai_url: str, args
+) -> Tuple[subprocess.Popen, str, Any]:
+    """Start gunicorn with the given size, pointed at the fake OpenAI server."""
+    port = free_port()
+    log = tempfile.NamedTemporaryFile(
+        prefix=f"gunicorn-w{workers}-t{threads}-", suffix='.log', delete=False
+    )
+    env = {
+        **os.environ,
+        'GUNICORN_BIND': f"127.0.0.1:{port}",
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_THREADS': str(threads),
+        'OPENAI_BASE_URL': openai_url,
+        'OPENAI_API_KEY': os.environ.get('OPENAI_API_KEY') or 'load-test',
+        'MODEL_WARMUP': 'preload',
+        # A fresh directory per run so metrics of earlier runs don't add up
+        'PROMETHEUS_MULTIPROC_DIR': tempfile.mkdtemp(prefix='load-test-metrics-'),
+    }
+    if not args.cache:
+        env['PARSE_CACHE_ENABLED'] = 'False'
+        env['RESPONSE_CACHE_ENABLED'] = 'False'
+
+    process = subprocess.Popen(
+        ['gunicorn', '-c', 'gunicorn.conf.py'],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    return process, f"http://127.0.0.1:{port}/api", log
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    """Stop gunicorn gracefully, killing it if it doesn't exit."""
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def print_summary(label: str, summary: Dict[str, Any]) -> None:
+    """Print one line per endpoint and the saturation of a run."""
+    print(
+        f"\n== {label}: {summary['throughput_rps']} req/s over "
+        f"{summary['elapsed_seconds']}s"
+    )
+    print(
+        f"{'endpoint':<10}{'req':>7}{'req/s':>8}{'err %':>7}"
+        f"{'p50 (s)':>9}{'p95 (s)':>9}{'p99 (s)':>9}  errors"
+    )
+    for endpoint, result in summary['endpoints'].items():
+        latency = result['latency_seconds']
+        print(
+            f"{endpoint:<10}{result['requests']:>7}"
+            f"{result['throughput_rps'] or 0:>8.2f}"
+            f"{result['error_rate'] * 100:>7.1f}"
+            f"{latency['p50'] or 0:>9.3f}{latency['p95'] or 0:>9.3f}"
+            f"{latency['p99'] or 0:>9.3f}  {result['errors'] or ''}"
+        )
+    saturation = summary['saturation']
+    utilization = saturation['utilization']
+    print(
+        f"Saturation: {saturation['in_progress_mean']} in progress on average "
+        f"(max {saturation['in_progress_max']}) for a capacity of "
+        f"{saturation['capacity'] or '?'}"
+        + (f", {utilization:.0%} utilized" if utilization is not None else '')
+        + f"; Little's law: {saturation['littles_law_concurrency']}"
+    )
+
+
+def main() -> int:
+    """Run the load test and print a summary per server size."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000/api')
+    parser.add_argument('--spawn', action='store_true', help='Start gunicorn')
+    parser.add_argument('--workers', default='2', help='Comma-separated, with --spawn')
+    parser.add_argument('--threads', default='1', help='Comma-separated, with --spawn')
+    parser.add_argument('--mix', default='parse=6,analyze=2,validate=2')
+    parser.add_argument(
+        '--files', help='Comma-separated "path" or "path:weight" (default: corpus)'
+    )
+    parser.add_argument('--corpus', default=os.path.join('benchmarks', 'corpus'))
+    parser.add_argument(
+        '--categories', help=f"Corpus subset of {', '.join(CATEGORIES)}"
+    )
+    parser.add_argument('--prompt', default='Summarize the document.')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, help='Open loop: arrivals per second')
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--warmup', type=float, default=5.0)
+    parser.add_argument('--timeout', type=float, default=300.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--cache', action='store_true', help='Keep caches on in spawned servers'
+    )
+    parser.add_argument('--startup-timeout', type=float, default=600.0)
+    parser.add_argument('--llm-latency', type=float, default=0.3)
+    parser.add_argument('--llm-output-tps', type=float, default=80.0)
+    parser.add_argument('--llm-jitter', type=float, default=0.2)
+    parser.add_argument('--llm-rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--llm-max-concurrent', type=int, default=0)
+    parser.add_argument('--json', dest='json_path', help='Write results to a file')
+    args = parser.parse_args()
+
+    endpoints = parse_weights(args.mix)
+    unknown = {name for name, _ in endpoints} - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"Unknown endpoints in --mix: {', '.join(sorted(unknown))}")
+
+    if args.files:
+        files = parse_weights(args.files)
+    else:
+        manifest = generate_corpus(args.corpus)
+        categories = args.categories.split(',') if args.categories else CATEGORIES
+        files = [
+            (os.path.join(args.corpus, document['name']), 1.0)
+            for document in manifest['documents']
+            if document['category'] in categories
+        ]
+    workload = Workload(endpoints, files, args.prompt, args.seed)
+
+    runs = []
+    if not args.spawn:
+        summary = run_load(args.url.rstrip('/'), workload, args)
+        print_summary(args.url, summary)
+        runs.append({'url': args.url, **summary})
+    else:
+        fake_openai = FakeOpenAIServer(
+            base_latency=args.llm_latency,
+            output_tokens_per_second=args.llm_output_tps,
+            latency_jitter=args.llm_jitter,
+            rate_limit_rate=args.llm_rate_limit_rate,
+            max_concurrent=args.llm_max_concurrent,
+            seed=args.seed,
+        ).start()
+        try:
+            for workers in [int(value) for value in args.workers.split(',')]:
+                for threads in [int(value) for value in args.threads.split(',')]:
+                    label = f"{workers} worker(s) x {threads} thread(s)"
+                    process, base_url, log = spawn_gunicorn(
+                        workers, threads, fake_openai.base_url, args
+                    )
+                    try:
+                        state = wait_until_up(base_url, process, args.startup_timeout)
+                        if state['models']['status'] != 'ready':
+                            print(f"{label}: model warm-up failed, measuring anyway")
+                        fake_openai.reset()
+                        summary = run_load(
+                            base_url, workload, args, capacity=workers * threads
+                        )
+                    finally:
+                        stop_process(process)
+                        log.close()
+
+                    summary['fake_openai'] = fake_openai.stats()
+                    print_summary(label, summary)
+                    print(f"Server log: {log.name}")
+                    runs.append({'workers': workers, 'threads': threads, **summary})
+        finally:
+            fake_openai.stop()
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    'mix': dict(endpoints),
+                    'files': dict(files),
+                    'concurrency': args.concurrency,
+                    'rate': args.rate,
+                    'duration': args.duration,
+                    'runs': runs,
+                },
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
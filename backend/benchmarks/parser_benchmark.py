@@ -0,0 +1,454 @@
+"""
+Benchmark DocumentParser over a generated document corpus.
+
+Converts every document of the corpus (see parser_corpus.py) several times
+and exports it in every output format, then reports latency percentiles,
+pages per second, peak RSS and a per-stage breakdown as JSON. Each run is
+isolated in a forked process, so peak RSS is measured per document and no
+state leaks between runs. A saved report can be passed as a baseline to flag
+regressions, e.g. before and after a Docling upgrade.
+
+Usage:
+    python -m benchmarks.parser_benchmark --json baseline.json
+    python -m benchmarks.parser_benchmark --baseline baseline.json --json current.json
+    python -m benchmarks.parser_benchmark --categories pdf_digital,docx --repeat 5
+"""
+
+import os
+import sys
+import json
+import time
+import math
+import platform
+import argparse
+import resource
+import statistics
+from typing import Any, Dict, List, Optional
+
+# Conversions are timed in-process; the parse cache would turn repeats into hits
+os.environ.setdefault('PARSE_CACHE_ENABLED', 'False')
+
+from benchmarks.parser_corpus import CATEGORIES, generate_corpus  # noqa: E402
+
+# Regressions smaller than this are treated as noise whatever the threshold
+MIN_LATENCY_CHANGE_SECONDS = 0.01
+MIN_RSS_CHANGE_MB = 16.0
+
+
+def percentile(values: List[float], share: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Latency summary of a list of seconds."""
+    if not values:
+        return {'p50': None, 'p95': None, 'mean': None, 'min': None}
+    return {
+        'p50': round(percentile(values, 0.5), 4),
+        'p95': round(percentile(values, 0.95), 4),
+        'mean': round(statistics.mean(values), 4),
+        'min': round(min(values), 4),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(parser, path: str, profile: str, formats: List[str]) -> Dict[str, Any]:
+    """
+    Convert a document once and export it in every format.
+
+    Stage durations are collected through the tracing hooks the parser
+    reports to, the same ones behind the Server-Timing header.
+    """
+    from services import tracing
+
+    trace = tracing.RequestTrace('benchmark')
+    with tracing.activate(trace):
+        started_at = time.perf_counter()
+        parsed = parser.parse_document(path, formats[0], profile=profile)
+        for output_format in formats:
+            parsed.export(output_format)
+        total = time.perf_counter() - started_at
+
+    stages: Dict[str, float] = {}
+    for stage, seconds, description in trace.stages:
+        key = f"{stage}:{description}" if description else stage
+        stages[key] = stages.get(key, 0.0) + seconds
+
+    return {
+        'seconds': total,
+        'stages': stages,
+        'pages': parsed.metadata.get('page_count') or 0,
+        'profile': parsed.metadata.get('profile'),
+        'preprocessing': parsed.metadata.get('preprocessing', {}).get('timings'),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def benchmark_document(
+    parser,
+    corpus_dir: str,
+    document: Dict[str, Any],
+    profile: str,
+    formats: List[str],
+    repeat: int,
+    isolate: bool,
+    timeout: float,
+) -> Dict[str, Any]:
+    """Run one corpus document ``repeat`` times and summarize the runs."""
+    from services.conversion_sandbox import run_in_sandbox
+
+    path = os.path.join(corpus_dir, document['name'])
+    runs, errors = [], []
+    for _ in range(repeat):
+        try:
+            if isolate:
+                runs.append(
+                    run_in_sandbox(run_case, (parser, path, profile, formats), timeout)
+                )
+            else:
+                runs.append(run_case(parser, path, profile, formats))
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+    seconds = [run['seconds'] for run in runs]
+    stage_names = sorted({stage for run in runs for stage in run['stages']})
+    stages = {
+        stage: summarize([run['stages'].get(stage, 0.0) for run in runs])
+        for stage in stage_names
+    }
+    pages = runs[0]['pages'] if runs else document['pages']
+    p50 = percentile(seconds, 0.5)
+
+    return {
+        'name': document['name'],
+        'category': document['category'],
+        'pages': pages,
+        'size_bytes': document['size_bytes'],
+        'profile': runs[0]['profile'] if runs else None,
+        'runs': len(runs),
+        'latency_seconds': summarize(seconds),
+        'pages_per_second': round(pages / p50, 3) if pages and p50 else None,
+        'peak_rss_mb': max((run['peak_rss_mb'] for run in runs), default=None),
+        'stages': stages,
+        'preprocessing': runs[0]['preprocessing'] if runs else None,
+        'errors': errors,
+    }
+
+
+def build_summary(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate the per-document results."""
+    measured = [document for document in documents if document['runs']]
+    paged = [
+        document
+        for document in measured
+        if document['pages'] and document['latency_seconds']['p50']
+    ]
+    pages = sum(document['pages'] for document in paged)
+    seconds = sum(document['latency_seconds']['p50'] for document in paged)
+    return {
+        'documents': len(documents),
+        'failed_documents': len(documents) - len(measured),
+        'pages': pages,
+        'pages_per_second': round(pages / seconds, 3) if seconds else None,
+        'peak_rss_mb': max(
+            (document['peak_rss_mb'] for document in measured), default=None
+        ),
+    }
+
+
+def environment_info(args) -> Dict[str, Any]:
+    """Describe what the benchmark ran on, to tell apart incomparable reports."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    def package_version(name: str) -> Optional[str]:
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return None
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'docling': package_version('docling'),
+        'docling_core': package_version('docling-core'),
+        'profile': args.profile,
+        'repeat': args.repeat,
+        'isolated': not args.no_isolate,
+    }
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[Dict[str, Any]]:
+    """
+    Compare a report with a baseline report.
+
+    Args:
+        report: Current benchmark report
+        baseline: Earlier benchmark report
+        threshold: Relative change treated as a regression, e.g. 0.15
+
+    Returns:
+        One row per compared metric with 'document', 'metric', 'baseline',
+        'current', 'change' (relative, positive is worse) and 'regression'
+    """
+    baseline_documents = {
+        document['name']: document for document in baseline['documents']
+    }
+    rows = []
+
+    def add(name: str, metric: str, old, new, higher_is_worse: bool, floor: float):
+        if old is None or new is None or old == 0:
+            return
+        change = (new - old) / old if higher_is_worse else (old - new) / old
+        rows.append(
+            {
+                'document': name,
+                'metric': metric,
+                'baseline': old,
+                'current': new,
+                'change': round(change, 4),
+                'regression': change > threshold and abs(new - old) > floor,
+            }
+        )
+
+    for document in report['documents']:
+        old = baseline_documents.get(document['name'])
+        if not old:
+            continue
+        name = document['name']
+        for key in ('p50', 'p95'):
+            add(
+                name,
+                f"latency_{key}",
+                old['latency_seconds'][key],
+                document['latency_seconds'][key],
+                True,
+                MIN_LATENCY_CHANGE_SECONDS,
+            )
+        add(
+            name,
+            'pages_per_second',
+            old['pages_per_second'],
+            document['pages_per_second'],
+            False,
+            0.0,
+        )
+        add(
+            name,
+            'peak_rss_mb',
+            old['peak_rss_mb'],
+            document['peak_rss_mb'],
+            True,
+            MIN_RSS_CHANGE_MB,
+        )
+        for stage, summary in document['stages'].items():
+            if stage in old['stages']:
+                add(
+                    name,
+                    f"{stage}_p50",
+                    old['stages'][stage]['p50'],
+                    summary['p50'],
+                    True,
+                    MIN_LATENCY_CHANGE_SECONDS,
+                )
+
+    add(
+        'all',
+        'pages_per_second',
+        baseline['summary']['pages_per_second'],
+        report['summary']['pages_per_second'],
+        False,
+        0.0,
+    )
+    return rows
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print a table of the per-document results."""
+    print(
+        f"{'document':<20}{'pages':>6}{'p50 (s)':>10}{'p95 (s)':>10}"
+        f"{'pages/s':>10}{'RSS (MB)':>10}  slowest stage"
+    )
+    for document in report['documents']:
+        latency = document['latency_seconds']
+        if not document['runs']:
+            print(f"{document['name']:<20}  failed: {document['errors'][0]}")
+            continue
+        slowest = max(
+            document['stages'].items(),
+            key=lambda item: item[1]['p50'] or 0,
+            default=('-', {'p50': 0}),
+        )
+        pages_per_second = (
+            f"{document['pages_per_second']:.2f}"
+            if document['pages_per_second']
+            else '-'
+        )
+        print(
+            f"{document['name']:<20}{document['pages']:>6}"
+            f"{latency['p50']:>10.3f}{latency['p95']:>10.3f}"
+            f"{pages_per_second:>10}"
+            f"{document['peak_rss_mb'] or 0:>10.0f}"
+            f"  {slowest[0]} ({slowest[1]['p50'] or 0:.3f}s)"
+        )
+    summary = report['summary']
+    print(
+        f"Total: {summary['pages']} pages at {summary['pages_per_second'] or 0:.2f} "
+        f"pages/s, peak RSS {summary['peak_rss_mb'] or 0:.0f} MB"
+    )
+
+
+def main() -> int:
+    """Run the benchmark, print a summary and compare with a baseline."""
+    from config.settings import Config
+    from services.document_parser import (
+        PROFILE_CHOICES,
+        SUPPORTED_OUTPUT_FORMATS,
+        DocumentParser,
+    )
+    from services.image_preprocessor import ImagePreprocessor
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--corpus', default=os.path.join('benchmarks', 'corpus'))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--categories', help=f"Comma-separated subset of {', '.join(CATEGORIES)}"
+    )
+    parser.add_argument('--profile', default='auto', choices=PROFILE_CHOICES)
+    parser.add_argument(
+        '--formats',
+        default=','.join(SUPPORTED_OUTPUT_FORMATS),
+        help='Comma-separated output formats to export',
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=Config.DOCLING_TIMEOUT)
+    parser.add_argument(
+        '--no-isolate',
+        action='store_true',
+        help='Run in this process; peak RSS is then the process high-water mark',
+    )
+    parser.add_argument('--json', dest='json_path', help='Write the report here')
+    parser.add_argument('--baseline', help='Report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15)
+    args = parser.parse_args()
+
+    formats = [value.strip() for value in args.formats.split(',') if value.strip()]
+    unknown = set(formats) - set(SUPPORTED_OUTPUT_FORMATS)
+    if unknown:
+        parser.error(f"Unsupported output formats: {', '.join(sorted(unknown))}")
+    categories = (
+        [value.strip() for value in args.categories.split(',')]
+        if args.categories
+        else CATEGORIES
+    )
+
+    manifest = generate_corpus(args.corpus, args.seed)
+    documents = [
+        document
+        for document in manifest['documents']
+        if document['category'] in categories
+    ]
+
+    document_parser = DocumentParser(
+        timeout=0,
+        cache=None,
+        use_sandbox=False,
+        image_preprocessor=(
+            ImagePreprocessor(Config.IMAGE_MAX_DPI)
+            if Config.IMAGE_PREPROCESSING_ENABLED
+            else None
+        ),
+        image_page_parallelism=Config.IMAGE_PAGE_PARALLELISM,
+    )
+
+    # Load models and backends in this process, so forked runs start warm
+    try:
+        document_parser.warm_up()
+    except Exception as e:
+        print(f"Warm-up failed, the first run of each document pays for it: {e}")
+    warmed = set()
+    for document in documents:
+        if document['category'] not in warmed:
+            warmed.add(document['category'])
+            try:
+                run_case(
+                    document_parser,
+                    os.path.join(args.corpus, document['name']),
+                    args.profile,
+                    formats,
+                )
+            except Exception:
+                pass  # Reported by the measured runs
+
+    results = [
+        benchmark_document(
+            document_parser,
+            args.corpus,
+            document,
+            args.profile,
+            formats,
+            args.repeat,
+            not args.no_isolate,
+            args.timeout,
+        )
+        for document in documents
+    ]
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'environment': environment_info(args),
+        'corpus': {
+            'seed': manifest['seed'],
+            'version': manifest['version'],
+            'fingerprint': manifest['fingerprint'],
+        },
+        'formats': formats,
+        'documents': results,
+        'summary': build_summary(results),
+    }
+    print_report(report)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['corpus']['fingerprint'] != report['corpus']['fingerprint']:
+            print("Warning: the baseline was measured on a different corpus")
+        if baseline['environment'] != report['environment']:
+            print("Warning: the baseline ran in a different environment")
+
+        rows = compare(report, baseline, args.threshold)
+        report['comparison'] = {'baseline': args.baseline, 'metrics': rows}
+        regressions = [row for row in rows if row['regression']]
+        for row in regressions:
+            print(
+                f"REGRESSION {row['document']} {row['metric']}: "
+                f"{row['baseline']} -> {row['current']} ({row['change']:+.0%})"
+            )
+        print(
+            f"{len(regressions)} regression(s) beyond {args.threshold:.0%} "
+            f"across {len(rows)} compared metrics"
+        )
+        exit_code = 1 if regressions else 0
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
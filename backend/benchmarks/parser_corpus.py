@@ -0,0 +1,401 @@
+"""
+Deterministic document corpus for the parser benchmark.
+
+Generates born-digital PDFs of several lengths, table-heavy PDFs, DOCX and
+PPTX files, and scanned-style images and PDFs from a fixed seed. Office files
+are written with fixed zip timestamps, so the same seed always produces
+byte-identical files and benchmark reports can be compared run to run.
+
+Usage:
+    python -m benchmarks.parser_corpus --out benchmarks/corpus
+"""
+
+import os
+import sys
+import json
+import random
+import hashlib
+import zipfile
+import argparse
+from typing import Any, Callable, Dict, List, Tuple
+
+# Bump when generated documents change so old baselines aren't compared
+CORPUS_VERSION = 1
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US Letter in points
+MARGIN = 72
+SCAN_DPI = 300
+
+WORDS = (
+    'agreement supplier customer delivery invoice payment schedule clause '
+    'warranty liability termination notice period services acceptance '
+    'criteria milestone report audit confidential data processing fee '
+    'annual review renewal obligation party section exhibit amendment'
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def _paragraph(rng: random.Random, sentences: int = 5) -> str:
+    return ' '.join(_sentence(rng, rng.randint(8, 18)) for _ in range(sentences))
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines, line = [], ''
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _table_rows(rng: random.Random, rows: int, columns: int) -> List[List[str]]:
+    header = [f"Column {column + 1}" for column in range(columns)]
+    body = [
+        [
+            (
+                f"{rng.randint(1, 9999)}.{rng.randint(0, 99):02d}"
+                if column
+                else f"Item {row + 1}"
+            )
+            for column in range(columns)
+        ]
+        for row in range(rows)
+    ]
+    return [header] + body
+
+
+# PDF ---------------------------------------------------------------------
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_text(x: float, y: float, size: int, text: str, font: str = 'F1') -> str:
+    return f"BT /{font} {size} Tf {x:.1f} {y:.1f} Td ({_pdf_escape(text)}) Tj ET"
+
+
+def _write_pdf(path: str, pages: List[str]) -> None:
+    """Write a PDF whose pages are raw content streams using Helvetica."""
+    objects: List[bytes] = [
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+    ]
+    pages_id = len(objects) + 2 * len(pages) + 1
+    page_ids = []
+    for content in pages:
+        stream = content.encode('latin-1')
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 1 0 R /F2 2 0 R >> >> >>"
+            % (pages_id, PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+        )
+        page_ids.append(len(objects))
+
+    kids = b' '.join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(pages)))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        len(objects),
+        xref,
+    )
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def _text_pdf_pages(rng: random.Random, page_count: int) -> List[str]:
+    pages = []
+    for page in range(page_count):
+        ops = [_pdf_text(MARGIN, PAGE_HEIGHT - MARGIN, 16, f"Section {page + 1}", 'F2')]
+        y = PAGE_HEIGHT - MARGIN - 30
+        while y > MARGIN + 60:
+            for line in _wrap(_paragraph(rng), 90):
+                ops.append(_pdf_text(MARGIN, y, 10, line))
+                y -= 13
+            y -= 10
+        ops.append(_pdf_text(PAGE_WIDTH / 2, MARGIN / 2, 9, str(page + 1)))
+        pages.append('\n'.join(ops))
+    return pages
+
+
+def _table_pdf_pages(rng: random.Random, page_count: int) -> List[str]:
+    pages = []
+    columns, row_height = 5, 18
+    column_width = (PAGE_WIDTH - 2 * MARGIN) / columns
+    for page in range(page_count):
+        ops = [_pdf_text(MARGIN, PAGE_HEIGHT - MARGIN, 14, f"Table {page + 1}", 'F2')]
+        rows = _table_rows(rng, 30, columns)
+        top = PAGE_HEIGHT - MARGIN - 20
+        for row_index, row in enumerate(rows):
+            y = top - row_index * row_height
+            for column_index, cell in enumerate(row):
+                x = MARGIN + column_index * column_width
+                ops.append(
+                    f"{x:.1f} {y - row_height:.1f} {column_width:.1f} {row_height} re S"
+                )
+                ops.append(
+                    _pdf_text(x + 4, y - 13, 9, cell, 'F2' if row_index == 0 else 'F1')
+                )
+        pages.append('\n'.join(ops))
+    return pages
+
+
+def make_text_pdf(path: str, rng: random.Random, pages: int) -> int:
+    _write_pdf(path, _text_pdf_pages(rng, pages))
+    return pages
+
+
+def make_table_pdf(path: str, rng: random.Random, pages: int) -> int:
+    _write_pdf(path, _table_pdf_pages(rng, pages))
+    return pages
+
+
+# Office ------------------------------------------------------------------
+
+
+def _normalize_zip(path: str) -> None:
+    """Rewrite a zip with fixed timestamps so its bytes are reproducible."""
+    with zipfile.ZipFile(path) as source:
+        entries = [(info.filename, source.read(info)) for info in source.infolist()]
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as target:
+        for name, data in sorted(entries):
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            target.writestr(info, data)
+
+
+def make_docx(path: str, rng: random.Random, sections: int) -> int:
+    from datetime import datetime
+    from docx import Document
+
+    document = Document()
+    document.core_properties.created = datetime(2024, 1, 1)
+    document.core_properties.modified = datetime(2024, 1, 1)
+    document.add_heading('Master Services Agreement', 0)
+    for section in range(sections):
+        document.add_heading(f"Section {section + 1}", 1)
+        for _ in range(3):
+            document.add_paragraph(_paragraph(rng))
+        if section % 2 == 0:
+            rows = _table_rows(rng, 8, 4)
+            table = document.add_table(rows=len(rows), cols=4)
+            table.style = 'Table Grid'
+            for row, values in zip(table.rows, rows):
+                for cell, value in zip(row.cells, values):
+                    cell.text = value
+    document.save(path)
+    _normalize_zip(path)
+    return 0
+
+
+def make_pptx(path: str, rng: random.Random, slides: int) -> int:
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    presentation = Presentation()
+    for slide_index in range(slides):
+        if slide_index % 3 == 2:
+            slide = presentation.slides.add_slide(presentation.slide_layouts[5])
+            slide.shapes.title.text = f"Figures {slide_index + 1}"
+            rows = _table_rows(rng, 6, 4)
+            table = slide.shapes.add_table(
+                len(rows), 4, Inches(0.5), Inches(1.5), Inches(9), Inches(4)
+            ).table
+            for row_index, values in enumerate(rows):
+                for column_index, value in enumerate(values):
+                    table.cell(row_index, column_index).text = value
+        else:
+            slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+            slide.shapes.title.text = f"Topic {slide_index + 1}"
+            body = slide.placeholders[1].text_frame
+            body.text = _sentence(rng, 8)
+            for _ in range(4):
+                body.add_paragraph().text = _sentence(rng, 10)
+    presentation.save(path)
+    _normalize_zip(path)
+    return slides
+
+
+# Scans -------------------------------------------------------------------
+
+
+def _scan_pages(rng: random.Random, page_count: int) -> List[Any]:
+    """Render text pages as noisy, slightly skewed 300 DPI grayscale scans."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        font = ImageFont.load_default(size=36)
+    except TypeError:  # Pillow < 10.1 has a single bitmap size
+        font = ImageFont.load_default()
+
+    width, height = int(8.5 * SCAN_DPI), int(11 * SCAN_DPI)
+    pages = []
+    for page in range(page_count):
+        image = Image.new('L', (width, height), 255)
+        draw = ImageDraw.Draw(image)
+        y = SCAN_DPI
+        draw.text((SCAN_DPI, y), f"Section {page + 1}", fill=0, font=font)
+        y += 90
+        while y < height - SCAN_DPI * 1.5:
+            for line in _wrap(_paragraph(rng), 70):
+                draw.text((SCAN_DPI, y), line, fill=20, font=font)
+                y += 48
+            y += 30
+
+        # Speckle and a small skew, like a sheet fed through a scanner
+        for _ in range(4000):
+            draw.point(
+                (rng.randrange(width), rng.randrange(height)), fill=rng.randint(0, 160)
+            )
+        image = image.rotate(rng.uniform(-0.8, 0.8), fillcolor=255)
+        pages.append(image)
+    return pages
+
+
+def make_scan_png(path: str, rng: random.Random, pages: int) -> int:
+    _scan_pages(rng, 1)[0].save(path, dpi=(SCAN_DPI, SCAN_DPI))
+    return 1
+
+
+def make_scan_tiff(path: str, rng: random.Random, pages: int) -> int:
+    first, *rest = _scan_pages(rng, pages)
+    first.save(
+        path,
+        save_all=True,
+        append_images=rest,
+        compression='tiff_lzw',
+        dpi=(SCAN_DPI, SCAN_DPI),
+    )
+    return pages
+
+
+def make_scan_pdf(path: str, rng: random.Random, pages: int) -> int:
+    import time
+
+    first, *rest = _scan_pages(rng, pages)
+    # Pillow otherwise stamps the current time
+    fixed_date = time.strptime('2024-01-01', '%Y-%m-%d')
+    first.save(
+        path,
+        save_all=True,
+        append_images=rest,
+        resolution=SCAN_DPI,
+        creationDate=fixed_date,
+        modDate=fixed_date,
+    )
+    return pages
+
+
+# name, category, generator, size argument
+CORPUS: List[Tuple[str, str, Callable[[str, random.Random, int], int], int]] = [
+    ('digital-1p.pdf', 'pdf_digital', make_text_pdf, 1),
+    ('digital-10p.pdf', 'pdf_digital', make_text_pdf, 10),
+    ('digital-50p.pdf', 'pdf_digital', make_text_pdf, 50),
+    ('tables-5p.pdf', 'pdf_tables', make_table_pdf, 5),
+    ('contract.docx', 'docx', make_docx, 12),
+    ('slides.pptx', 'pptx', make_pptx, 12),
+    ('scan-1p.png', 'scan', make_scan_png, 1),
+    ('scan-3p.tiff', 'scan', make_scan_tiff, 3),
+    ('scan-2p.pdf', 'scan', make_scan_pdf, 2),
+]
+
+CATEGORIES = sorted({category for _, category, _, _ in CORPUS})
+
+
+def generate_corpus(out_dir: str, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate the corpus, reusing it when already generated with the same seed.
+
+    Args:
+        out_dir: Directory the documents are written to
+        seed: Seed of the generated text
+
+    Returns:
+        Manifest with the corpus fingerprint and every document's name,
+        category, page count (0 when unknown), size and SHA-256
+    """
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('seed') == seed and manifest.get('version') == CORPUS_VERSION:
+            if all(
+                os.path.exists(os.path.join(out_dir, document['name']))
+                for document in manifest['documents']
+            ):
+                return manifest
+
+    os.makedirs(out_dir, exist_ok=True)
+    documents = []
+    for name, category, generate, size in CORPUS:
+        path = os.path.join(out_dir, name)
+        # A per-document generator keeps documents independent of each other
+        rng = random.Random(f"{seed}:{name}")
+        pages = generate(path, rng, size)
+        with open(path, 'rb') as f:
+            data = f.read()
+        documents.append(
+            {
+                'name': name,
+                'category': category,
+                'pages': pages,
+                'size_bytes': len(data),
+                'sha256': hashlib.sha256(data).hexdigest(),
+            }
+        )
+
+    fingerprint = hashlib.sha256(
+        ''.join(document['sha256'] for document in documents).encode()
+    ).hexdigest()[:16]
+    manifest = {
+        'version': CORPUS_VERSION,
+        'seed': seed,
+        'fingerprint': fingerprint,
+        'documents': documents,
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main() -> int:
+    """Generate the corpus and list its documents."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--out', default=os.path.join('benchmarks', 'corpus'))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    manifest = generate_corpus(args.out, args.seed)
+    for document in manifest['documents']:
+        print(
+            f"{document['name']:<20}{document['category']:<14}"
+            f"{document['pages']:>5} p{document['size_bytes'] / 1024:>10.1f} KiB"
+        )
+    print(f"Corpus fingerprint: {manifest['fingerprint']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Benchmark prompt prefix caching across follow-up questions on one document.
+
+Asks a series of questions about the same document through the fake OpenAI
+server, once with the previous request-first prompt layout and once with the
+current document-first layout, and reports latency, prompt tokens and cached
+prompt tokens for each.
+
+Usage:
+    python -m benchmarks.prefix_cache_benchmark
+    python -m benchmarks.prefix_cache_benchmark --document report.md --json out.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+from benchmarks.fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+DEFAULT_QUESTIONS = [
+    'Summarize the document.',
+    'List the parties involved.',
+    'What are the payment terms?',
+    'Which obligations have deadlines?',
+    'Are there any termination clauses?',
+    'What risks does the document mention?',
+]
+
+
+def synthetic_document(sections: int = 40) -> str:
+    """Generate a markdown document of roughly 8k tokens."""
+    parts = ['# Master Services Agreement']
+    for index in range(1, sections + 1):
+        parts.append(f"## Section {index}")
+        parts.append(
+            f"Clause {index}.1 sets out the obligations of the supplier for "
+            f"deliverable {index}, including acceptance criteria, reporting "
+            f"duties and a payment of {index * 1250} EUR due within 30 days. " * 4
+        )
+        parts.append(
+            "| Milestone | Owner | Due |\n|---|---|---|\n"
+            + '\n'.join(
+                f"| M{index}.{step} | Team {step} | Week {index + step} |"
+                for step in range(1, 4)
+            )
+        )
+    return '\n\n'.join(parts)
+
+
+def legacy_user_message(document_content: str, user_prompt: str) -> str:
+    """User message of the previous layout, with the request first."""
+    return (
+        f"User Request: {user_prompt}\n\n"
+        f"Document Content:\n{document_content}\n\n"
+        "Please analyze the document and respond to the user's request "
+        "based on the content above."
+    )
+
+
+def legacy_system_prompt(service, metadata: Dict[str, Any]) -> str:
+    """System prompt of the previous layout, embedding per-upload metadata."""
+    return (
+        service._create_system_prompt()
+        + f"""
+
+Document Information:
+- File type: {metadata['file_type']}
+- Title: {metadata['title']}
+"""
+    )
+
+
+def run_layout(
+    name: str, ask: Callable[[str, int], Dict[str, Any]], questions: List[str]
+) -> Dict[str, Any]:
+    """Ask every question with one layout and collect per-call measurements."""
+    calls = []
+    for index, question in enumerate(questions):
+        started_at = time.perf_counter()
+        result = ask(question, index)
+        latency = time.perf_counter() - started_at
+        calls.append(
+            {
+                'question': question,
+                'latency_seconds': round(latency, 4),
+                'prompt_tokens': result['usage']['prompt_tokens'],
+                'cached_tokens': result['usage'].get('cached_tokens', 0),
+            }
+        )
+
+    follow_ups = calls[1:] or calls
+    prompt_tokens = sum(call['prompt_tokens'] for call in calls)
+    cached_tokens = sum(call['cached_tokens'] for call in calls)
+    return {
+        'layout': name,
+        'calls': calls,
+        'first_latency_seconds': calls[0]['latency_seconds'],
+        'follow_up_latency_seconds': round(
+            statistics.mean(call['latency_seconds'] for call in follow_ups), 4
+        ),
+        'prompt_tokens': prompt_tokens,
+        'cached_tokens': cached_tokens,
+        'cached_share': round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0,
+    }
+
+
+def main() -> int:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--document', help='Markdown or text file to ask about')
+    parser.add_argument('--questions', type=int, default=len(DEFAULT_QUESTIONS))
+    parser.add_argument('--prefill-tps', type=float, default=5000.0)
+    parser.add_argument('--json', dest='json_path', help='Write results to a file')
+    args = parser.parse_args()
+
+    if args.document:
+        with open(args.document, 'r', encoding='utf-8') as f:
+            document_content = f.read()
+    else:
+        document_content = synthetic_document()
+
+    questions = (DEFAULT_QUESTIONS * (args.questions // len(DEFAULT_QUESTIONS) + 1))[
+        : args.questions
+    ]
+
+    server = FakeOpenAIServer(prefill_tokens_per_second=args.prefill_tps).start()
+    os.environ['OPENAI_BASE_URL'] = server.base_url
+
+    from services.openai_service import OpenAIService
+
+    service = OpenAIService(response_cache=None)
+    metadata = {'file_type': '.pdf', 'page_count': 12, 'tables_count': 40}
+
+    def ask_legacy(question: str, index: int) -> Dict[str, Any]:
+        # Each upload used to get a fresh randomized title in the system prompt
+        upload_metadata = {**metadata, 'title': f"upload-{index:04d}"}
+        return service._complete(
+            legacy_system_prompt(service, upload_metadata),
+            legacy_user_message(document_content, question),
+        )
+
+    def ask_current(question: str, index: int) -> Dict[str, Any]:
+        return service.analyze_document(document_content, question, metadata)
+
+    try:
+        results = []
+        for name, ask in (
+            ('request_first', ask_legacy),
+            ('document_first', ask_current),
+        ):
+            server.reset()
+            results.append(run_layout(name, ask, questions))
+    finally:
+        server.stop()
+
+    print(
+        f"{'layout':<16}{'first (s)':>12}{'follow-up (s)':>16}"
+        f"{'prompt tok':>13}{'cached tok':>13}{'cached':>9}"
+    )
+    for result in results:
+        print(
+            f"{result['layout']:<16}{result['first_latency_seconds']:>12.3f}"
+            f"{result['follow_up_latency_seconds']:>16.3f}"
+            f"{result['prompt_tokens']:>13}{result['cached_tokens']:>13}"
+            f"{result['cached_share']:>9.0%}"
+        )
+
+    legacy, current = results
+    if current['follow_up_latency_seconds']:
+        speedup = (
+            legacy['follow_up_latency_seconds']
+            / current['follow_up_latency_seconds']
+        )
+        print(f"Follow-up speedup: {speedup:.2f}x")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'questions': len(questions), 'results': results}, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,9 +22,132 @@ class Config:
         os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024)
     )  # 16MB
     ALLOWED_EXTENSIONS = {'pdf', 'docx', 'pptx', 'png', 'jpg', 'jpeg', 'gif', 'tiff'}
+    UPLOAD_SPOOL_MAX_BYTES = int(
+        os.environ.get('UPLOAD_SPOOL_MAX_BYTES', 8 * 1024 * 1024)
+    )  # 8MB kept in memory, larger uploads spool to disk
 
     # Docling settings
     DOCLING_TIMEOUT = int(os.environ.get('DOCLING_TIMEOUT', 300))  # 5 min
+    CONVERSION_SANDBOX_ENABLED = (
+        os.environ.get('CONVERSION_SANDBOX_ENABLED', 'True').lower() == 'true'
+    )
+
+    # PDF pages sampled by /api/inspect for text layer and image coverage
+    INSPECT_SAMPLE_PAGES = int(os.environ.get('INSPECT_SAMPLE_PAGES', 10))
+
+    # Pipeline profile used when a request doesn't pick one
+    PIPELINE_DEFAULT_PROFILE = os.environ.get('PIPELINE_DEFAULT_PROFILE', 'auto')
+    PIPELINE_WARM_PROFILES = [
+        profile.strip()
+        for profile in os.environ.get(
+            'PIPELINE_WARM_PROFILES', 'fast,digital,standard,full'
+        ).split(',')
+        if profile.strip()
+    ]
+
+    # Model loading: 'preload' warms up before serving (in the gunicorn master
+    # with preload_app), 'background' warms up after startup, 'lazy' loads
+    # each profile's models on its first conversion in the worker
+    MODEL_WARMUP = os.environ.get('MODEL_WARMUP', 'background').lower()
+
+    # Profiling settings: requests sending 'X-Profile: true', and a sampled
+    # fraction of the others, get a stack profile written to the trace dir
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.0))
+    PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', 5))
+    PROFILING_TRACE_DIR = os.environ.get('PROFILING_TRACE_DIR', 'traces')
+    PROFILING_MAX_TRACES = int(os.environ.get('PROFILING_MAX_TRACES', 200))
+
+    # Response compression: JSON bodies of at least COMPRESSION_MIN_BYTES are
+    # sent zstd (when available) or gzip encoded, as the client accepts
+    COMPRESSION_ENABLED = (
+        os.environ.get('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    )
+    COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+
+    # Image preprocessing settings
+    IMAGE_PREPROCESSING_ENABLED = (
+        os.environ.get('IMAGE_PREPROCESSING_ENABLED', 'True').lower() == 'true'
+    )
+    IMAGE_MAX_DPI = int(os.environ.get('IMAGE_MAX_DPI', 300))
+    IMAGE_PAGE_PARALLELISM = int(os.environ.get('IMAGE_PAGE_PARALLELISM', 4))
+
+    # Parse cache settings
+    PARSE_CACHE_ENABLED = (
+        os.environ.get('PARSE_CACHE_ENABLED', 'True').lower() == 'true'
+    )
+    PARSE_CACHE_DIR = os.environ.get('PARSE_CACHE_DIR', 'cache/parse')
+    PARSE_CACHE_MAX_BYTES = int(
+        os.environ.get('PARSE_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+    )  # 512MB
+
+    # Map-reduce analysis settings
+    MAP_REDUCE_CHUNK_TOKENS = int(os.environ.get('MAP_REDUCE_CHUNK_TOKENS', 8000))
+    MAP_REDUCE_MAX_CONCURRENCY = int(os.environ.get('MAP_REDUCE_MAX_CONCURRENCY', 4))
+
+    # Response cache settings
+    RESPONSE_CACHE_ENABLED = (
+        os.environ.get('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+    )
+    RESPONSE_CACHE_PATH = os.environ.get(
+        'RESPONSE_CACHE_PATH', 'cache/responses.sqlite3'
+    )
+    RESPONSE_CACHE_TTL_SECONDS = int(
+        os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 24 * 3600)
+    )  # 1 day
+    RESPONSE_CACHE_MAX_ENTRIES = int(
+        os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 10000)
+    )
+
+    # Multi-question analysis settings
+    QUESTIONS_MAX_PROMPTS = int(os.environ.get('QUESTIONS_MAX_PROMPTS', 20))
+    QUESTIONS_MAX_CONCURRENCY = int(os.environ.get('QUESTIONS_MAX_CONCURRENCY', 5))
+
+    # Retrieval analysis settings
+    RETRIEVAL_CHUNK_TOKENS = int(os.environ.get('RETRIEVAL_CHUNK_TOKENS', 512))
+    RETRIEVAL_TOP_K = int(os.environ.get('RETRIEVAL_TOP_K', 5))
+    RETRIEVAL_DENSE_ENABLED = (
+        os.environ.get('RETRIEVAL_DENSE_ENABLED', 'True').lower() == 'true'
+    )
+    RETRIEVAL_INDEX_MEMORY_ENTRIES = int(
+        os.environ.get('RETRIEVAL_INDEX_MEMORY_ENTRIES', 32)
+    )
+    # Persisted indexes have their own cache, enabled with the parse cache,
+    # so they never evict converted documents or skew the parse hit rate
+    RETRIEVAL_INDEX_CACHE_DIR = os.environ.get(
+        'RETRIEVAL_INDEX_CACHE_DIR', 'cache/retrieval'
+    )
+    RETRIEVAL_INDEX_CACHE_MAX_BYTES = int(
+        os.environ.get('RETRIEVAL_INDEX_CACHE_MAX_BYTES', 128 * 1024 * 1024)
+    )  # 128MB
+
+    # Document store settings: elements of parsed documents, served by
+    # /api/documents/<id> without converting the document again. Off by
+    # default: storing writes every element row on the request path
+    DOCUMENT_STORE_ENABLED = (
+        os.environ.get('DOCUMENT_STORE_ENABLED', 'False').lower() == 'true'
+    )
+    DOCUMENT_STORE_PATH = os.environ.get(
+        'DOCUMENT_STORE_PATH', 'cache/documents.sqlite3'
+    )
+    DOCUMENT_STORE_MAX_DOCUMENTS = int(
+        os.environ.get('DOCUMENT_STORE_MAX_DOCUMENTS', 1000)
+    )
+
+    # Characters buffered per chunk by /api/parse with stream=true
+    PARSE_STREAM_CHUNK_SIZE = int(os.environ.get('PARSE_STREAM_CHUNK_SIZE', 65536))
+
+    # Batch parsing settings
+    BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 500))
+    BATCH_PARALLELISM = int(os.environ.get('BATCH_PARALLELISM', 2))
+
+    # Async job settings. Each web worker runs its own pool, so a server runs
+    # web workers x JOB_WORKERS conversion processes, each with its models
+    JOBS_FOLDER = os.environ.get('JOBS_FOLDER', 'jobs')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_RETENTION_HOURS = int(os.environ.get('JOB_RETENTION_HOURS', 24))
 
     @staticmethod
     def validate_config():
@@ -0,0 +1,73 @@
+"""
+Gunicorn settings for production.
+
+Usage:
+    gunicorn -c gunicorn.conf.py
+
+With MODEL_WARMUP=preload the application, and with it the Docling layout,
+table and OCR models, is loaded once in the master process before workers
+are forked. Workers then share the model weights copy-on-write instead of
+each loading its own copy, which cuts both cold start and per-worker memory.
+
+Metrics of every worker are written to PROMETHEUS_MULTIPROC_DIR and
+aggregated by /api/metrics, whichever worker answers the scrape. Unless it
+is set, each server gets a new, uniquely named directory under the system
+temp dir, removed when the master exits, so servers sharing a host never
+mix or delete each other's metrics.
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+
+METRICS_DIR_PREFIX = 'docparser-metrics-'
+
+# Must be set before prometheus_client is imported by the application
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix=METRICS_DIR_PREFIX)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+from config.settings import Config  # noqa: E402
+
+try:
+    from prometheus_client import multiprocess
+except ImportError:  # Metrics are optional
+    multiprocess = None
+
+wsgi_app = 'app:create_app()'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+# More than one thread per worker switches to the gthread worker class
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', Config.DOCLING_TIMEOUT + 60))
+
+# Warm the models in the master; see the module docstring
+preload_app = Config.MODEL_WARMUP == 'preload'
+
+
+def when_ready(server):
+    """Freeze the preloaded heap before workers are forked."""
+    if preload_app:
+        # Objects moved to the permanent generation are never touched by the
+        # cyclic GC, so their pages stay shared with the master
+        gc.freeze()
+        server.log.info(
+            f"Preloaded application, frozen {gc.get_freeze_count()} objects"
+        )
+
+
+def child_exit(server, worker):
+    """Drop the live gauge values of a worker that exited."""
+    if multiprocess is not None:
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    """Remove the metrics directory created for this server."""
+    # Matched by name, as reloads re-read this file with the variable set
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    if os.path.dirname(metrics_dir) == tempfile.gettempdir() and (
+        os.path.basename(metrics_dir).startswith(METRICS_DIR_PREFIX)
+    ):
+        shutil.rmtree(metrics_dir, ignore_errors=True)
@@ -1,18 +1,74 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+import json
 import logging
-import os
-from services.file_service import FileService, FileServiceError
-from services.document_parser import DocumentParser, DocumentParsingError
-from services.openai_service import OpenAIService, OpenAIServiceError
+from config.settings import Config
+from services import json_codec
+from services.file_service import FileService, FileServiceError, UploadedFile
+from services.document_parser import (
+    ConversionTimeoutError,
+    DocumentParsingError,
+    SUPPORTED_OUTPUT_FORMATS,
+    resolve_page_range,
+)
+from services.document_inspector import DocumentInspectionError, inspect_document
+from services.openai_service import OpenAIServiceError
+from services.document_chunker import DocumentChunker
+from services.retrieval_index import RetrievalIndexStore
+from services.table_extractor import TABLE_FORMATS
+from services.service_registry import (
+    get_document_parser,
+    get_openai_service,
+    get_parse_cache,
+    get_retrieval_index_cache,
+)
+from routes.request_options import parse_request_options
 
 logger = logging.getLogger(__name__)
 
 document_bp = Blueprint('document', __name__)
 
-# Initialize services
+ANALYSIS_MODES = ['auto', 'full', 'map_reduce', 'retrieval']
+
+# Content types of /parse responses streamed with stream=true
+STREAM_MIMETYPES = {
+    'markdown': 'text/markdown',
+    'text': 'text/plain',
+    'html': 'text/html',
+    'json': 'application/x-ndjson',
+}
+
+# Initialize services; the parser and OpenAI client are created on first use
 file_service = FileService()
-document_parser = DocumentParser()
-openai_service = OpenAIService()
+retrieval_index_store = RetrievalIndexStore(
+    cache=get_retrieval_index_cache(),
+    max_entries=Config.RETRIEVAL_INDEX_MEMORY_ENTRIES,
+    use_dense=Config.RETRIEVAL_DENSE_ENABLED,
+)
+
+
+def _get_retrieval_index(parsed_document, upload: UploadedFile):
+    """Get the retrieval index of a parsed document, building it if needed."""
+    # Without the parse cache, key the index on the same conversion options
+    page_range = parsed_document.metadata.get('page_range')
+    document_key = parsed_document.cache_key or get_document_parser().get_document_key(
+        upload.filename,
+        tuple(page_range) if page_range else None,
+        upload.content_hash,
+        parsed_document.metadata['profile'],
+    )
+    index_key = RetrievalIndexStore.make_key(
+        document_key, Config.RETRIEVAL_CHUNK_TOKENS
+    )
+    chunker = DocumentChunker(max_tokens=Config.RETRIEVAL_CHUNK_TOKENS)
+    return retrieval_index_store.get_or_build(
+        index_key, lambda: chunker.chunk(parsed_document.document)
+    )
+
+
+def _include_parsed_content() -> bool:
+    """Whether an analysis response should carry the parsed document."""
+    value = request.form.get('include_parsed_content', 'true').strip().lower()
+    return value not in ('false', '0', 'no')
 
 
 @document_bp.route('/analyze', methods=['POST'])
@@ -24,6 +80,17 @@ def analyze_document():
     - file: Document file
     - prompt: User's analysis prompt
     - output_format: Optional output format for parsing (default: markdown)
+    - page_range: Optional pages to convert, e.g. "1-5" (default: all)
+    - max_pages: Optional cap on the number of pages converted
+    - profile: Optional pipeline profile: auto, fast, digital, standard or full
+    - include_parsed_content: Optional, "false" leaves the parsed document
+      out of the response (default: true)
+    - analysis_mode: Optional analysis mode (default: auto)
+        - full: send the whole document in one request
+        - map_reduce: analyze chunks concurrently, then combine the answers
+        - retrieval: send only the chunks most relevant to the prompt
+        - auto: full when the document fits in one request, else map_reduce
+    - top_k: Optional number of chunks sent in retrieval mode (default: 5)
     """
     try:
         # Validate request
@@ -35,70 +102,132 @@ def analyze_document():
 
         file = request.files['file']
         user_prompt = request.form['prompt'].strip()
-        output_format = request.form.get('output_format', 'markdown')
+        include_parsed_content = _include_parsed_content()
+        analysis_mode = request.form.get('analysis_mode', 'auto')
 
         if not user_prompt:
             return jsonify({'success': False, 'error': 'Prompt cannot be empty'}), 400
 
-        # Validate output format
-        supported_formats = document_parser.get_supported_formats()
-        if output_format not in supported_formats:
+        if analysis_mode not in ANALYSIS_MODES:
             return (
                 jsonify(
                     {
                         'success': False,
-                        'error': f'Unsupported output format: {output_format}. Supported formats: {supported_formats}',
+                        'error': f'Unsupported analysis mode: {analysis_mode}. Supported modes: {ANALYSIS_MODES}',
                     }
                 ),
                 400,
             )
 
-        # Save uploaded file
-        success, message, file_path = file_service.save_file(file)
+        top_k = request.form.get('top_k', '').strip() or str(Config.RETRIEVAL_TOP_K)
+        if not top_k.isdigit() or int(top_k) < 1:
+            return (
+                jsonify(
+                    {
+                        'success': False,
+                        'error': f'Invalid top_k: {top_k}. Expected a positive integer',
+                    }
+                ),
+                400,
+            )
+        top_k = int(top_k)
+
+        # Validate output format, pipeline profile and page selection
+        options, error_response = parse_request_options()
+        if error_response:
+            return error_response
+        output_format = options['output_format']
+        profile = options['profile']
+        page_range, max_pages = options['page_range'], options['max_pages']
+
+        # Receive uploaded file
+        success, message, upload = file_service.receive_file(file)
         if not success:
             return jsonify({'success': False, 'error': message}), 400
 
         try:
-            # Parse document with specified format
-            logger.info(f"Parsing document: {file_path} in {output_format} format")
-            parse_result = document_parser.parse_document(file_path, output_format)
-
-            if not parse_result['success']:
-                return (
-                    jsonify({'success': False, 'error': 'Failed to parse document'}),
-                    500,
-                )
+            # Parse document once; every format is rendered from this conversion
+            logger.info(
+                f"Parsing document: {upload.filename} in {output_format} format"
+            )
+            parsed_document = get_document_parser().parse_document(
+                upload, output_format, page_range, max_pages, profile
+            )
 
-            document_content = parse_result['content']
-            document_metadata = parse_result['metadata']
+            document_metadata = parsed_document.metadata
 
             # For LLM analysis, always use markdown format for better processing
-            if output_format != 'markdown':
-                # Get markdown version for LLM processing
-                markdown_result = document_parser.parse_document(file_path, 'markdown')
-                llm_content = markdown_result['content']
-            else:
-                llm_content = document_content
+            llm_content = parsed_document.export('markdown')
 
             # Check content length
-            if not openai_service.check_content_length(llm_content, user_prompt):
+            fits_context = get_openai_service().check_content_length(
+                llm_content, user_prompt
+            )
+            if analysis_mode == 'auto':
+                analysis_mode = 'full' if fits_context else 'map_reduce'
+
+            if analysis_mode == 'full' and not fits_context:
                 return (
                     jsonify(
                         {
                             'success': False,
-                            'error': 'Document is too large for analysis. Please try with a smaller document.',
+                            'error': 'Document is too large for analysis. Please try with a smaller document or analysis_mode=map_reduce.',
                         }
                     ),
                     400,
                 )
 
             # Analyze with OpenAI
-            logger.info("Analyzing document with OpenAI")
-            analysis_result = openai_service.analyze_document(
-                document_content=llm_content,
-                user_prompt=user_prompt,
-                document_metadata=document_metadata,
-            )
+            if analysis_mode == 'map_reduce':
+                chunker = DocumentChunker(
+                    max_tokens=min(
+                        Config.MAP_REDUCE_CHUNK_TOKENS,
+                        get_openai_service().get_context_token_limit() * 2 // 3,
+                    )
+                )
+                chunks = chunker.chunk(parsed_document.document)
+
+                logger.info(f"Analyzing {len(chunks)} document chunks with OpenAI")
+                analysis_result = get_openai_service().analyze_document_map_reduce(
+                    chunks=chunks,
+                    user_prompt=user_prompt,
+                    document_metadata=document_metadata,
+                    max_concurrency=Config.MAP_REDUCE_MAX_CONCURRENCY,
+                )
+            elif analysis_mode == 'retrieval':
+                index, index_cache_hit = _get_retrieval_index(parsed_document, upload)
+                excerpts = index.search(user_prompt, top_k)
+
+                logger.info(
+                    f"Analyzing {len(excerpts)} of {len(index.chunks)} chunks with OpenAI"
+                )
+                analysis_result = get_openai_service().analyze_document_excerpts(
+                    excerpts=excerpts,
+                    user_prompt=user_prompt,
+                    document_metadata=document_metadata,
+                )
+                analysis_result['analysis'] = {
+                    'mode': 'retrieval',
+                    'chunks': len(index.chunks),
+                    'index_cache_hit': index_cache_hit,
+                    'dense_scoring': index.has_dense,
+                    'retrieved': [
+                        {
+                            'index': excerpt['index'],
+                            'score': excerpt['score'],
+                            'headings': excerpt['headings'],
+                            'pages': excerpt['pages'],
+                        }
+                        for excerpt in excerpts
+                    ],
+                }
+            else:
+                logger.info("Analyzing document with OpenAI")
+                analysis_result = get_openai_service().analyze_document(
+                    document_content=llm_content,
+                    user_prompt=user_prompt,
+                    document_metadata=document_metadata,
+                )
 
             if not analysis_result['success']:
                 return (
@@ -110,31 +239,54 @@ def analyze_document():
             response_data = {
                 'success': True,
                 'analysis': analysis_result['response'],
-                'parsed_content': document_content,
                 'metadata': {
                     'document': document_metadata,
                     'usage': analysis_result['usage'],
                     'model': analysis_result['usage']['model_used'],
+                    'cached': analysis_result['cached'],
+                    'analysis': analysis_result.get(
+                        'analysis', {'mode': analysis_mode}
+                    ),
                 },
             }
 
+            if include_parsed_content:
+                response_data['parsed_content'] = parsed_document.response_content()
+
             logger.info("Document analysis completed successfully")
             return jsonify(response_data), 200
 
         finally:
-            # Clean up uploaded file
-            if file_path and os.path.exists(file_path):
-                file_service.delete_file(file_path)
-                logger.info(f"Cleaned up file: {file_path}")
+            # Release the uploaded file
+            upload.close()
 
     except FileServiceError as e:
         logger.error(f"File service error: {e}")
         return jsonify({'success': False, 'error': f'File handling error: {e}'}), 400
 
+    except ConversionTimeoutError as e:
+        logger.error(f"Document parsing timed out: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Document parsing timed out: {e}',
+                    'error_code': e.error_code,
+                }
+            ),
+            504,
+        )
+
     except DocumentParsingError as e:
         logger.error(f"Document parsing error: {e}")
         return (
-            jsonify({'success': False, 'error': f'Document parsing failed: {e}'}),
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Document parsing failed: {e}',
+                    'error_code': e.error_code,
+                }
+            ),
             500,
         )
 
@@ -155,14 +307,23 @@ def analyze_document():
         )
 
 
-@document_bp.route('/parse', methods=['POST'])
-def parse_document_only():
+@document_bp.route('/analyze/questions', methods=['POST'])
+def analyze_document_questions():
     """
-    Parse a document without AI analysis.
+    Answer several prompts about one document, parsing it only once.
+
+    All prompts are sent to the model concurrently, so the request takes about
+    one conversion plus the slowest answer.
 
     Expected form data:
     - file: Document file
-    - output_format: Optional output format (default: markdown)
+    - prompts: Analysis prompts, either repeated form fields or a JSON array
+    - output_format: Optional output format for parsing (default: markdown)
+    - page_range: Optional pages to convert, e.g. "1-5" (default: all)
+    - max_pages: Optional cap on the number of pages converted
+    - profile: Optional pipeline profile: auto, fast, digital, standard or full
+    - include_parsed_content: Optional, "false" leaves the parsed document
+      out of the response (default: true)
     """
     try:
         # Validate request
@@ -170,61 +331,450 @@ def parse_document_only():
             return jsonify({'success': False, 'error': 'No file provided'}), 400
 
         file = request.files['file']
-        output_format = request.form.get('output_format', 'markdown')
+        include_parsed_content = _include_parsed_content()
 
-        # Validate output format
-        supported_formats = document_parser.get_supported_formats()
-        if output_format not in supported_formats:
+        user_prompts = request.form.getlist('prompts')
+        if len(user_prompts) == 1 and user_prompts[0].strip().startswith('['):
+            try:
+                user_prompts = json.loads(user_prompts[0])
+            except ValueError:
+                return (
+                    jsonify({'success': False, 'error': 'Invalid prompts JSON array'}),
+                    400,
+                )
+
+        if not isinstance(user_prompts, list) or not all(
+            isinstance(prompt, str) for prompt in user_prompts
+        ):
+            return (
+                jsonify({'success': False, 'error': 'Prompts must be strings'}),
+                400,
+            )
+
+        user_prompts = [prompt.strip() for prompt in user_prompts]
+        if not user_prompts or not all(user_prompts):
+            return (
+                jsonify({'success': False, 'error': 'Prompts cannot be empty'}),
+                400,
+            )
+
+        if len(user_prompts) > Config.QUESTIONS_MAX_PROMPTS:
             return (
                 jsonify(
                     {
                         'success': False,
-                        'error': f'Unsupported output format: {output_format}. Supported formats: {supported_formats}',
+                        'error': f'Too many prompts. Maximum is {Config.QUESTIONS_MAX_PROMPTS}',
                     }
                 ),
                 400,
             )
 
-        # Save uploaded file
-        success, message, file_path = file_service.save_file(file)
+        # Validate output format, pipeline profile and page selection
+        options, error_response = parse_request_options()
+        if error_response:
+            return error_response
+        output_format = options['output_format']
+        profile = options['profile']
+        page_range, max_pages = options['page_range'], options['max_pages']
+
+        # Receive uploaded file
+        success, message, upload = file_service.receive_file(file)
         if not success:
             return jsonify({'success': False, 'error': message}), 400
 
         try:
-            # Parse document
-            logger.info(f"Parsing document: {file_path} in {output_format} format")
-            parse_result = document_parser.parse_document(file_path, output_format)
+            logger.info(
+                f"Parsing document: {upload.filename} in {output_format} format"
+            )
+            parsed_document = get_document_parser().parse_document(
+                upload, output_format, page_range, max_pages, profile
+            )
+            document_metadata = parsed_document.metadata
+            llm_content = parsed_document.export('markdown')
 
-            if not parse_result['success']:
+            if not get_openai_service().check_content_length(
+                llm_content, max(user_prompts, key=len)
+            ):
                 return (
-                    jsonify({'success': False, 'error': 'Failed to parse document'}),
-                    500,
+                    jsonify(
+                        {
+                            'success': False,
+                            'error': 'Document is too large for analysis. Please try with a smaller document.',
+                        }
+                    ),
+                    400,
+                )
+
+            logger.info(f"Answering {len(user_prompts)} questions with OpenAI")
+            results = get_openai_service().analyze_document_questions(
+                document_content=llm_content,
+                user_prompts=user_prompts,
+                document_metadata=document_metadata,
+                max_concurrency=Config.QUESTIONS_MAX_CONCURRENCY,
+            )
+
+            answers = []
+            for user_prompt, result in zip(user_prompts, results):
+                if not result['success']:
+                    answers.append(
+                        {
+                            'prompt': user_prompt,
+                            'success': False,
+                            'error': result['error'],
+                        }
+                    )
+                    continue
+
+                answers.append(
+                    {
+                        'prompt': user_prompt,
+                        'success': True,
+                        'analysis': result['response'],
+                        'usage': result['usage'],
+                        'cached': result['cached'],
+                        'finish_reason': result['finish_reason'],
+                    }
+                )
+
+            # Cached answers cost nothing, so only fresh calls count towards usage
+            fresh_results = [
+                result
+                for result in results
+                if result['success'] and not result['cached']
+            ]
+            usage = {
+                key: sum(result['usage'].get(key, 0) for result in fresh_results)
+                for key in (
+                    'prompt_tokens',
+                    'completion_tokens',
+                    'total_tokens',
+                    'cached_tokens',
+                )
+            }
+
+            response_data = {
+                'success': True,
+                'answers': answers,
+                'metadata': {
+                    'document': document_metadata,
+                    'usage': {
+                        **usage,
+                        'model_used': get_openai_service().model,
+                        'calls': len(fresh_results),
+                    },
+                    'model': get_openai_service().model,
+                },
+            }
+
+            if include_parsed_content:
+                response_data['parsed_content'] = parsed_document.response_content()
+
+            logger.info("Multi-question document analysis completed successfully")
+            return jsonify(response_data), 200
+
+        finally:
+            # Release the uploaded file
+            upload.close()
+
+    except FileServiceError as e:
+        logger.error(f"File service error: {e}")
+        return jsonify({'success': False, 'error': f'File handling error: {e}'}), 400
+
+    except ConversionTimeoutError as e:
+        logger.error(f"Document parsing timed out: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Document parsing timed out: {e}',
+                    'error_code': e.error_code,
+                }
+            ),
+            504,
+        )
+
+    except DocumentParsingError as e:
+        logger.error(f"Document parsing error: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Document parsing failed: {e}',
+                    'error_code': e.error_code,
+                }
+            ),
+            500,
+        )
+
+    except OpenAIServiceError as e:
+        logger.error(f"OpenAI service error: {e}")
+        return jsonify({'success': False, 'error': f'AI analysis failed: {e}'}), 500
+
+    except Exception as e:
+        logger.error(f"Unexpected error in multi-question document analysis: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': 'An unexpected error occurred. Please try again.',
+                }
+            ),
+            500,
+        )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json_codec.dumps(data)}\n\n"
+
+
+@document_bp.route('/analyze/stream', methods=['POST'])
+def analyze_document_stream():
+    """
+    Analyze a document with AI, streaming the answer as server-sent events.
+
+    Events, in order: ``metadata`` once the document is parsed, ``token`` for
+    each completion delta, ``usage`` when the completion ends, then ``done``.
+    Failures after the stream has started are reported as an ``error`` event.
+
+    Expected form data:
+    - file: Document file
+    - prompt: User's analysis prompt
+    - output_format: Optional output format for parsing (default: markdown)
+    - page_range: Optional pages to convert, e.g. "1-5" (default: all)
+    - max_pages: Optional cap on the number of pages converted
+    - profile: Optional pipeline profile: auto, fast, digital, standard or full
+    - include_parsed_content: Optional, "false" leaves the parsed document
+      out of the response (default: true)
+    """
+    try:
+        # Validate request
+        if 'file' not in request.files:
+            return jsonify({'success': False, 'error': 'No file provided'}), 400
+
+        if 'prompt' not in request.form:
+            return jsonify({'success': False, 'error': 'No prompt provided'}), 400
+
+        file = request.files['file']
+        user_prompt = request.form['prompt'].strip()
+        include_parsed_content = _include_parsed_content()
+
+        if not user_prompt:
+            return jsonify({'success': False, 'error': 'Prompt cannot be empty'}), 400
+
+        # Validate output format, pipeline profile and page selection
+        options, error_response = parse_request_options()
+        if error_response:
+            return error_response
+        output_format = options['output_format']
+        profile = options['profile']
+        page_range, max_pages = options['page_range'], options['max_pages']
+
+        # Receive uploaded file
+        success, message, upload = file_service.receive_file(file)
+        if not success:
+            return jsonify({'success': False, 'error': message}), 400
+
+    except Exception as e:
+        logger.error(f"Unexpected error in streaming document analysis: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': 'An unexpected error occurred. Please try again.',
+                }
+            ),
+            500,
+        )
+
+    def generate():
+        try:
+            logger.info(
+                f"Parsing document: {upload.filename} in {output_format} format"
+            )
+            parsed_document = get_document_parser().parse_document(
+                upload, output_format, page_range, max_pages, profile
+            )
+            document_metadata = parsed_document.metadata
+
+            metadata_event = {'document': document_metadata}
+            if include_parsed_content:
+                metadata_event['parsed_content'] = parsed_document.response_content()
+            yield _sse_event('metadata', metadata_event)
+
+            llm_content = parsed_document.export('markdown')
+            if not get_openai_service().check_content_length(llm_content, user_prompt):
+                yield _sse_event(
+                    'error',
+                    {
+                        'error': 'Document is too large for analysis. Please try with a smaller document.'
+                    },
+                )
+                return
+
+            logger.info("Streaming document analysis from OpenAI")
+            for event in get_openai_service().stream_analysis(
+                document_content=llm_content,
+                user_prompt=user_prompt,
+                document_metadata=document_metadata,
+            ):
+                if event['type'] == 'token':
+                    yield _sse_event('token', {'content': event['content']})
+                else:
+                    yield _sse_event(
+                        'usage',
+                        {
+                            'usage': event['usage'],
+                            'model': event['usage']['model_used'],
+                            'finish_reason': event['finish_reason'],
+                            'cached': event['cached'],
+                        },
+                    )
+
+            yield _sse_event('done', {'success': True})
+            logger.info("Streaming document analysis completed successfully")
+
+        except DocumentParsingError as e:
+            logger.error(f"Document parsing error: {e}")
+            yield _sse_event(
+                'error',
+                {
+                    'error': f'Document parsing failed: {e}',
+                    'error_code': e.error_code,
+                },
+            )
+
+        except OpenAIServiceError as e:
+            logger.error(f"OpenAI service error: {e}")
+            yield _sse_event('error', {'error': f'AI analysis failed: {e}'})
+
+        except Exception as e:
+            logger.error(f"Unexpected error in streaming document analysis: {e}")
+            yield _sse_event(
+                'error', {'error': 'An unexpected error occurred. Please try again.'}
+            )
+
+    response = Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+    # Release the uploaded file when the response is closed, even if the
+    # client went away before the stream started
+    response.call_on_close(upload.close)
+    return response
+
+
+def _stream_parsed_content(parsed_document):
+    """Yield a parsed document's content in chunks as it is rendered."""
+    try:
+        yield from parsed_document.iter_export(
+            chunk_size=Config.PARSE_STREAM_CHUNK_SIZE
+        )
+        logger.info("Document parsing completed successfully")
+    except Exception as e:
+        # Headers are sent already; dropping the connection tells the client
+        # the body is incomplete
+        logger.error(f"Streaming document content failed: {e}")
+        raise
+
+
+@document_bp.route('/parse', methods=['POST'])
+def parse_document_only():
+    """
+    Parse a document without AI analysis.
+
+    Expected form data:
+    - file: Document file
+    - output_format: Optional output format (default: markdown)
+    - page_range: Optional pages to convert, e.g. "1-5" (default: all)
+    - max_pages: Optional cap on the number of pages converted
+    - profile: Optional pipeline profile: auto, fast, digital, standard or full
+    - stream: Optional, "true" streams the content as the response body,
+      rendered one element at a time (NDJSON for json), with the metadata
+      in the X-Document-Metadata header (default: false)
+    """
+    try:
+        # Validate request
+        if 'file' not in request.files:
+            return jsonify({'success': False, 'error': 'No file provided'}), 400
+
+        file = request.files['file']
+        stream = request.form.get('stream', '').strip().lower() in ('true', '1', 'yes')
+
+        # Validate output format, pipeline profile and page selection
+        options, error_response = parse_request_options()
+        if error_response:
+            return error_response
+        output_format = options['output_format']
+        profile = options['profile']
+        page_range, max_pages = options['page_range'], options['max_pages']
+
+        # Receive uploaded file
+        success, message, upload = file_service.receive_file(file)
+        if not success:
+            return jsonify({'success': False, 'error': message}), 400
+
+        try:
+            # Parse document
+            logger.info(
+                f"Parsing document: {upload.filename} in {output_format} format"
+            )
+            parsed_document = get_document_parser().parse_document(
+                upload, output_format, page_range, max_pages, profile
+            )
+
+            if stream:
+                return Response(
+                    _stream_parsed_content(parsed_document),
+                    mimetype=STREAM_MIMETYPES[output_format],
+                    headers={
+                        'X-Document-Metadata': json.dumps(parsed_document.metadata),
+                        'X-Accel-Buffering': 'no',
+                    },
                 )
 
             # Prepare response
             response_data = {
                 'success': True,
-                'content': parse_result['content'],
-                'metadata': parse_result['metadata'],
+                'content': parsed_document.response_content(),
+                'metadata': parsed_document.metadata,
             }
 
             logger.info("Document parsing completed successfully")
             return jsonify(response_data), 200
 
         finally:
-            # Clean up uploaded file
-            if file_path and os.path.exists(file_path):
-                file_service.delete_file(file_path)
-                logger.info(f"Cleaned up file: {file_path}")
+            # Release the uploaded file
+            upload.close()
 
     except FileServiceError as e:
         logger.error(f"File service error: {e}")
         return jsonify({'success': False, 'error': f'File handling error: {e}'}), 400
 
+    except ConversionTimeoutError as e:
+        logger.error(f"Document parsing timed out: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Document parsing timed out: {e}',
+                    'error_code': e.error_code,
+                }
+            ),
+            504,
+        )
+
     except DocumentParsingError as e:
         logger.error(f"Document parsing error: {e}")
         return (
-            jsonify({'success': False, 'error': f'Document parsing failed: {e}'}),
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Document parsing failed: {e}',
+                    'error_code': e.error_code,
+                }
+            ),
             500,
         )
 
@@ -241,6 +791,248 @@ def parse_document_only():
         )
 
 
+@document_bp.route('/parse/tables', methods=['POST'])
+def parse_document_tables():
+    """
+    Extract the tables of a document as columnar data.
+
+    Only the tables are read from the converted document, so table-heavy
+    documents come back much smaller and faster than a full export.
+
+    Expected form data:
+    - file: Document file
+    - table_format: Optional table layout (default: columns)
+        - columns: column names and the cell texts of each column
+        - csv: each table as CSV text
+        - arrays: typed column arrays with dtypes, for numpy or pyarrow
+    - page_range: Optional pages to convert, e.g. "1-5" (default: all)
+    - max_pages: Optional cap on the number of pages converted
+    - profile: Optional pipeline profile: auto, fast, digital, standard or full
+    """
+    try:
+        # Validate request
+        if 'file' not in request.files:
+            return jsonify({'success': False, 'error': 'No file provided'}), 400
+
+        file = request.files['file']
+        table_format = request.form.get('table_format', 'columns')
+
+        # Validate table format
+        if table_format not in TABLE_FORMATS:
+            return (
+                jsonify(
+                    {
+                        'success': False,
+                        'error': f'Unsupported table format: {table_format}. Supported formats: {TABLE_FORMATS}',
+                    }
+                ),
+                400,
+            )
+
+        # Validate pipeline profile and page selection
+        options, error_response = parse_request_options(with_output_format=False)
+        if error_response:
+            return error_response
+        profile = options['profile']
+        page_range, max_pages = options['page_range'], options['max_pages']
+
+        # Receive uploaded file
+        success, message, upload = file_service.receive_file(file)
+        if not success:
+            return jsonify({'success': False, 'error': message}), 400
+
+        try:
+            logger.info(f"Extracting tables from document: {upload.filename}")
+            parsed_document = get_document_parser().parse_document(
+                upload, 'markdown', page_range, max_pages, profile
+            )
+            tables = parsed_document.extract_tables(table_format)
+
+            metadata = dict(parsed_document.metadata)
+            metadata.pop('output_format', None)
+            metadata['table_format'] = table_format
+
+            logger.info(f"Extracted {len(tables)} tables from {upload.filename}")
+            return (
+                jsonify({'success': True, 'tables': tables, 'metadata': metadata}),
+                200,
+            )
+
+        finally:
+            # Release the uploaded file
+            upload.close()
+
+    except FileServiceError as e:
+        logger.error(f"File service error: {e}")
+        return jsonify({'success': False, 'error': f'File handling error: {e}'}), 400
+
+    except ConversionTimeoutError as e:
+        logger.error(f"Document parsing timed out: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Document parsing timed out: {e}',
+                    'error_code': e.error_code,
+                }
+            ),
+            504,
+        )
+
+    except DocumentParsingError as e:
+        logger.error(f"Document parsing error: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': f'Document parsing failed: {e}',
+                    'error_code': e.error_code,
+                }
+            ),
+            500,
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error in table extraction: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': 'An unexpected error occurred. Please try again.',
+                }
+            ),
+            500,
+        )
+
+
+@document_bp.route('/parse/batch', methods=['POST'])
+def parse_documents_batch():
+    """
+    Parse many documents, streaming one NDJSON line per document.
+
+    Lines are written as documents finish converting, so their order follows
+    completion rather than upload order; each line carries the upload index.
+
+    Expected form data:
+    - files: Document files (repeated field)
+    - output_format: Optional output format (default: markdown)
+    """
+    try:
+        # Validate request
+        files = request.files.getlist('files')
+        if not files:
+            return jsonify({'success': False, 'error': 'No files provided'}), 400
+
+        if len(files) > Config.BATCH_MAX_FILES:
+            return (
+                jsonify(
+                    {
+                        'success': False,
+                        'error': f'Too many files. Maximum per batch: {Config.BATCH_MAX_FILES}',
+                    }
+                ),
+                400,
+            )
+
+        output_format = request.form.get('output_format', 'markdown')
+
+        # Validate output format
+        supported_formats = list(SUPPORTED_OUTPUT_FORMATS)
+        if output_format not in supported_formats:
+            return (
+                jsonify(
+                    {
+                        'success': False,
+                        'error': f'Unsupported output format: {output_format}. Supported formats: {supported_formats}',
+                    }
+                ),
+                400,
+            )
+
+        # Receive all uploads before streaming; invalid files are reported inline
+        uploads = {}
+        rejected_files = []
+        for index, file in enumerate(files):
+            success, message, upload = file_service.receive_file(file)
+            if success:
+                uploads[upload] = (index, file.filename)
+            else:
+                rejected_files.append(
+                    {
+                        'index': index,
+                        'filename': file.filename,
+                        'success': False,
+                        'error': message,
+                    }
+                )
+
+    except Exception as e:
+        logger.error(f"Unexpected error in batch parsing: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': 'An unexpected error occurred. Please try again.',
+                }
+            ),
+            500,
+        )
+
+    def generate():
+        results = None
+        try:
+            for line in rejected_files:
+                yield json_codec.dumps(line) + '\n'
+
+            results = get_document_parser().parse_batch(
+                list(uploads),
+                output_format,
+                max_parallel=Config.BATCH_PARALLELISM,
+            )
+            for upload, parsed_document, error in results:
+                index, filename = uploads[upload]
+                line = {'index': index, 'filename': filename}
+
+                try:
+                    if error is not None:
+                        raise error
+                    line.update(
+                        {
+                            'success': True,
+                            'content': parsed_document.response_content(),
+                            'metadata': parsed_document.metadata,
+                        }
+                    )
+                except DocumentParsingError as e:
+                    logger.error(f"Batch parsing failed for {filename}: {e}")
+                    line.update(
+                        {
+                            'success': False,
+                            'error': f'Document parsing failed: {e}',
+                            'error_code': e.error_code,
+                        }
+                    )
+
+                yield json_codec.dumps(line) + '\n'
+
+            logger.info(f"Batch parsing completed for {len(files)} files")
+
+        finally:
+            # Stop any conversions still running if the client went away
+            if results is not None:
+                results.close()
+
+    def cleanup():
+        # Release the uploads' memory and spool files
+        for upload in uploads:
+            upload.close()
+
+    response = Response(generate(), mimetype='application/x-ndjson')
+    # Runs after the generator is closed, even if it never started
+    response.call_on_close(cleanup)
+    return response
+
+
 @document_bp.route('/supported-formats', methods=['GET'])
 def get_supported_formats():
     """Get list of supported file formats."""
@@ -269,7 +1061,7 @@ def get_supported_formats():
 def get_output_formats():
     """Get list of supported output formats for parsing."""
     try:
-        output_formats = document_parser.get_supported_formats()
+        output_formats = list(SUPPORTED_OUTPUT_FORMATS)
         return (
             jsonify(
                 {
@@ -288,6 +1080,125 @@ def get_output_formats():
         )
 
 
+@document_bp.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Get parse, retrieval index and response cache hit/miss statistics."""
+    try:
+        response_cache = get_openai_service().response_cache
+        response_cache_stats = {
+            'enabled': response_cache is not None,
+            **({'stats': response_cache.get_stats()} if response_cache else {}),
+        }
+        index_cache = retrieval_index_store.cache
+        index_cache_stats = {
+            'enabled': index_cache is not None,
+            **({'stats': index_cache.get_stats()} if index_cache else {}),
+        }
+
+        parse_cache = get_parse_cache()
+        if not parse_cache:
+            return (
+                jsonify(
+                    {
+                        'success': True,
+                        'enabled': False,
+                        'retrieval_index_cache': index_cache_stats,
+                        'response_cache': response_cache_stats,
+                    }
+                ),
+                200,
+            )
+
+        return (
+            jsonify(
+                {
+                    'success': True,
+                    'enabled': True,
+                    'stats': parse_cache.get_stats(),
+                    'retrieval_index_cache': index_cache_stats,
+                    'response_cache': response_cache_stats,
+                }
+            ),
+            200,
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting cache stats: {e}")
+        return jsonify({'success': False, 'error': 'Failed to get cache stats'}), 500
+
+
+@document_bp.route('/inspect', methods=['POST'])
+def inspect_document_file():
+    """
+    Inspect a document's structure and estimate its conversion cost.
+
+    Nothing is converted and no model runs: PDFs have the text layer and
+    image placements of a few pages read, images their header, docx and pptx
+    files their archive. Clients can route, reject or schedule a document
+    before paying for its conversion.
+
+    Expected form data:
+    - file: Document file
+    - page_range: Optional pages to convert, e.g. "1-5" (default: all)
+    - max_pages: Optional cap on the number of pages converted
+    - profile: Optional pipeline profile: auto, fast, digital, standard or full
+    """
+    try:
+        if 'file' not in request.files:
+            return jsonify({'success': False, 'error': 'No file provided'}), 400
+
+        file = request.files['file']
+
+        # Validate pipeline profile and page selection
+        options, error_response = parse_request_options(with_output_format=False)
+        if error_response:
+            return error_response
+        profile = options['profile']
+        page_range, max_pages = options['page_range'], options['max_pages']
+
+        # Receive uploaded file
+        success, message, upload = file_service.receive_file(file)
+        if not success:
+            return jsonify({'success': False, 'error': message}), 400
+
+        try:
+            inspection = inspect_document(
+                upload.path or upload.get_stream(),
+                upload.filename,
+                resolve_page_range(page_range, max_pages),
+                profile,
+                Config.INSPECT_SAMPLE_PAGES,
+            )
+            inspection['file_size'] = upload.size
+            estimate = inspection['estimate']
+            estimate['exceeds_timeout'] = estimate['seconds'] > Config.DOCLING_TIMEOUT
+
+            return jsonify({'success': True, 'inspection': inspection}), 200
+
+        finally:
+            # Release the uploaded file
+            upload.close()
+
+    except DocumentInspectionError as e:
+        logger.error(f"Document inspection error: {e}")
+        return (
+            jsonify({'success': False, 'error': f'Document inspection failed: {e}'}),
+            400,
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error in document inspection: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': 'An unexpected error occurred. Please try again.',
+                }
+            ),
+            500,
+        )
+
+
 @document_bp.route('/validate-file', methods=['POST'])
 def validate_file():
     """Validate a file without processing it."""
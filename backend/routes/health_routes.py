@@ -1,6 +1,9 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, send_file
 import logging
+import os
 from config.settings import Config
+from services import metrics, tracing
+from services.service_registry import get_warm_up_state
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,82 @@ def health_check():
     )
 
 
+@health_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness probe reporting the model warm-up state.
+
+    Answers 503 until the conversion models are loaded, so a load balancer
+    only routes documents to workers that won't pay the model loading cost.
+    In lazy mode each worker loads a profile's models on its first conversion
+    with that profile, before forking the sandbox, and this always succeeds.
+    """
+    state = get_warm_up_state()
+    ready = state['status'] == 'ready' or Config.MODEL_WARMUP not in (
+        'preload',
+        'background',
+    )
+
+    return (
+        jsonify(
+            {
+                'status': 'ready' if ready else 'not_ready',
+                'warm_up_mode': Config.MODEL_WARMUP,
+                'models': state,
+            }
+        ),
+        200 if ready else 503,
+    )
+
+
+@health_bp.route('/metrics', methods=['GET'])
+def metrics_export():
+    """
+    Prometheus metrics of the parse and analyze pipeline.
+
+    Under gunicorn every worker writes its values to PROMETHEUS_MULTIPROC_DIR
+    and this endpoint aggregates them, so any worker can answer a scrape.
+    """
+    if not metrics.is_enabled():
+        return (
+            jsonify(
+                {
+                    'error': 'Metrics are disabled: install prometheus-client',
+                    'error_code': 'metrics_disabled',
+                }
+            ),
+            501,
+        )
+
+    payload, content_type = metrics.render_latest()
+    return Response(payload, content_type=content_type)
+
+
+@health_bp.route('/traces/<trace_id>', methods=['GET'])
+def get_trace(trace_id: str):
+    """
+    Folded stacks of a profiled request, as named by its X-Profile-Trace header.
+
+    Render with ``flamegraph.pl`` or open in speedscope.
+    """
+    if not Config.PROFILING_ENABLED:
+        return (
+            jsonify(
+                {
+                    'error': 'Profiling is disabled: set PROFILING_ENABLED=true',
+                    'error_code': 'profiling_disabled',
+                }
+            ),
+            501,
+        )
+
+    path = tracing.get_trace_path(trace_id, Config.PROFILING_TRACE_DIR)
+    if path is None:
+        return jsonify({'error': f'No trace {trace_id}'}), 404
+
+    return send_file(os.path.abspath(path), mimetype='text/plain')
+
+
 @health_bp.route('/config', methods=['GET'])
 def config_check():
     """Check configuration status."""
@@ -0,0 +1,102 @@
+from flask import Blueprint, request, jsonify, url_for
+import logging
+from services.file_service import FileService, FileServiceError
+from services.job_service import JobService, JobServiceError
+from routes.request_options import parse_request_options
+
+logger = logging.getLogger(__name__)
+
+job_bp = Blueprint('jobs', __name__)
+
+# Initialize services
+file_service = FileService()
+job_service = JobService()
+
+
+@job_bp.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue a document for asynchronous parsing and optional analysis.
+
+    Expected form data:
+    - file: Document file
+    - output_format: Optional output format (default: markdown)
+    - prompt: Optional analysis prompt; when given the job also runs the analysis
+    - page_range: Optional pages to convert, e.g. "1-5" (default: all)
+    - max_pages: Optional cap on the number of pages converted
+    - profile: Optional pipeline profile: auto, fast, digital, standard or full
+    """
+    try:
+        # Validate request
+        if 'file' not in request.files:
+            return jsonify({'success': False, 'error': 'No file provided'}), 400
+
+        file = request.files['file']
+        user_prompt = request.form.get('prompt', '').strip() or None
+
+        # Validate output format, pipeline profile and page selection
+        options, error_response = parse_request_options()
+        if error_response:
+            return error_response
+        output_format = options['output_format']
+        profile = options['profile']
+        page_range, max_pages = options['page_range'], options['max_pages']
+
+        # Save uploaded file; the job deletes it once processed
+        success, message, file_path = file_service.save_file(file)
+        if not success:
+            return jsonify({'success': False, 'error': message}), 400
+
+        try:
+            job = job_service.submit(
+                file_path, output_format, user_prompt, page_range, max_pages, profile
+            )
+        except JobServiceError:
+            file_service.delete_file(file_path)
+            raise
+
+        return (
+            jsonify(
+                {
+                    'success': True,
+                    'job': job,
+                    'status_url': url_for('jobs.get_job', job_id=job['id']),
+                }
+            ),
+            202,
+        )
+
+    except FileServiceError as e:
+        logger.error(f"File service error: {e}")
+        return jsonify({'success': False, 'error': f'File handling error: {e}'}), 400
+
+    except JobServiceError as e:
+        logger.error(f"Job service error: {e}")
+        return jsonify({'success': False, 'error': f'Failed to queue job: {e}'}), 500
+
+    except Exception as e:
+        logger.error(f"Unexpected error creating job: {e}")
+        return (
+            jsonify(
+                {
+                    'success': False,
+                    'error': 'An unexpected error occurred. Please try again.',
+                }
+            ),
+            500,
+        )
+
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get status, progress and, once finished, the result of a job."""
+    try:
+        job = job_service.get_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+        return jsonify({'success': True, 'job': job}), 200
+
+    except Exception as e:
+        logger.error(f"Error getting job {job_id}: {e}")
+        return jsonify({'success': False, 'error': 'Failed to get job'}), 500
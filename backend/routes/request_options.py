@@ -0,0 +1,64 @@
+from typing import Any, Dict, Optional, Tuple
+from flask import Response, request, jsonify
+from config.settings import Config
+from services.document_parser import (
+    PROFILE_CHOICES,
+    SUPPORTED_OUTPUT_FORMATS,
+    parse_page_options,
+)
+
+
+def parse_request_options(
+    with_output_format: bool = True,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[Response, int]]]:
+    """
+    Read and validate the parsing options of a document request.
+
+    Shared by the synchronous document endpoints and the job API, so both
+    accept and reject the same options.
+
+    Args:
+        with_output_format: Whether the endpoint takes an output_format field
+
+    Returns:
+        Tuple of (options, error_response): options holds 'output_format'
+        (None when not taken), 'profile', 'page_range' and 'max_pages';
+        error_response is the 400 response to return when an option is
+        invalid, in which case options is None
+    """
+    output_format = None
+    if with_output_format:
+        output_format = request.form.get('output_format', 'markdown')
+        supported_formats = list(SUPPORTED_OUTPUT_FORMATS)
+        if output_format not in supported_formats:
+            return None, _bad_request(
+                f'Unsupported output format: {output_format}. '
+                f'Supported formats: {supported_formats}'
+            )
+
+    profile = request.form.get('profile', Config.PIPELINE_DEFAULT_PROFILE)
+    if profile not in PROFILE_CHOICES:
+        return None, _bad_request(
+            f'Unsupported pipeline profile: {profile}. '
+            f'Supported profiles: {PROFILE_CHOICES}'
+        )
+
+    try:
+        page_range, max_pages = parse_page_options(
+            request.form.get('page_range', '').strip(),
+            request.form.get('max_pages', '').strip(),
+        )
+    except ValueError as e:
+        return None, _bad_request(str(e))
+
+    return {
+        'output_format': output_format,
+        'profile': profile,
+        'page_range': page_range,
+        'max_pages': max_pages,
+    }, None
+
+
+def _bad_request(error: str) -> Tuple[Response, int]:
+    """Build the 400 response rejecting a request option."""
+    return jsonify({'success': False, 'error': error}), 400
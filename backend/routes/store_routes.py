@@ -0,0 +1,173 @@
+from flask import Blueprint, request, jsonify
+import logging
+import re
+from services.document_store import ELEMENT_KIND_CHOICES
+from services.service_registry import get_document_store
+
+logger = logging.getLogger(__name__)
+
+store_bp = Blueprint('store', __name__)
+
+DOCUMENT_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _store_unavailable():
+    return (
+        jsonify({'success': False, 'error': 'Document store is disabled'}),
+        501,
+    )
+
+
+def _document_not_found():
+    return jsonify({'success': False, 'error': 'Document not found'}), 404
+
+
+def _parse_int_arg(name: str, minimum: int):
+    """Read an optional integer query argument, raising ValueError if invalid."""
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    if not value.isdigit() or int(value) < minimum:
+        raise ValueError(f'Invalid {name}: {value}. Expected an integer >= {minimum}')
+    return int(value)
+
+
+@store_bp.route('/documents/<document_id>', methods=['GET'])
+def get_document(document_id):
+    """
+    Get the metadata of a stored document, its pages and its element counts.
+
+    Documents are stored when they are parsed; the id is reported as
+    ``document_id`` in the parse and analysis metadata.
+    """
+    store = get_document_store()
+    if store is None:
+        return _store_unavailable()
+
+    try:
+        if not DOCUMENT_ID_PATTERN.match(document_id):
+            return _document_not_found()
+
+        document = store.get_document(document_id)
+        if document is None:
+            return _document_not_found()
+
+        return jsonify({'success': True, 'document': document}), 200
+
+    except Exception as e:
+        logger.error(f"Error getting document {document_id}: {e}")
+        return jsonify({'success': False, 'error': 'Failed to get document'}), 500
+
+
+@store_bp.route('/documents/<document_id>/outline', methods=['GET'])
+def get_document_outline(document_id):
+    """Get the title and section headings of a stored document, in order."""
+    store = get_document_store()
+    if store is None:
+        return _store_unavailable()
+
+    try:
+        outline = (
+            store.get_outline(document_id)
+            if DOCUMENT_ID_PATTERN.match(document_id)
+            else None
+        )
+        if outline is None:
+            return _document_not_found()
+
+        return jsonify({'success': True, 'outline': outline}), 200
+
+    except Exception as e:
+        logger.error(f"Error getting outline of document {document_id}: {e}")
+        return jsonify({'success': False, 'error': 'Failed to get outline'}), 500
+
+
+@store_bp.route('/documents/<document_id>/pages/<int:page>', methods=['GET'])
+def get_document_page(document_id, page):
+    """Get the elements on one page of a stored document, in reading order."""
+    store = get_document_store()
+    if store is None:
+        return _store_unavailable()
+
+    try:
+        elements = (
+            store.get_elements(document_id, page=page)
+            if DOCUMENT_ID_PATTERN.match(document_id)
+            else None
+        )
+        if elements is None:
+            return _document_not_found()
+
+        return jsonify({'success': True, 'page': page, 'elements': elements}), 200
+
+    except Exception as e:
+        logger.error(f"Error getting page {page} of document {document_id}: {e}")
+        return jsonify({'success': False, 'error': 'Failed to get page'}), 500
+
+
+@store_bp.route('/documents/<document_id>/elements', methods=['GET'])
+def get_document_elements(document_id):
+    """
+    Get elements of a stored document, in reading order.
+
+    Query parameters:
+    - kind: Optional element kind, e.g. heading, paragraph, table or picture
+    - page: Optional page number
+    - limit: Optional maximum number of elements returned
+    - offset: Optional number of matching elements skipped (default: 0)
+    """
+    store = get_document_store()
+    if store is None:
+        return _store_unavailable()
+
+    try:
+        kind = request.args.get('kind') or None
+        if kind is not None and kind not in ELEMENT_KIND_CHOICES:
+            return (
+                jsonify(
+                    {
+                        'success': False,
+                        'error': f'Unsupported element kind: {kind}. Supported kinds: {ELEMENT_KIND_CHOICES}',
+                    }
+                ),
+                400,
+            )
+
+        try:
+            page = _parse_int_arg('page', 1)
+            limit = _parse_int_arg('limit', 1)
+            offset = _parse_int_arg('offset', 0) or 0
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        elements = (
+            store.get_elements(document_id, kind, page, limit, offset)
+            if DOCUMENT_ID_PATTERN.match(document_id)
+            else None
+        )
+        if elements is None:
+            return _document_not_found()
+
+        return jsonify({'success': True, 'elements': elements}), 200
+
+    except Exception as e:
+        logger.error(f"Error getting elements of document {document_id}: {e}")
+        return jsonify({'success': False, 'error': 'Failed to get elements'}), 500
+
+
+@store_bp.route('/documents/<document_id>', methods=['DELETE'])
+def delete_document(document_id):
+    """Remove a stored document and its elements."""
+    store = get_document_store()
+    if store is None:
+        return _store_unavailable()
+
+    try:
+        if not DOCUMENT_ID_PATTERN.match(document_id) or not store.delete(document_id):
+            return _document_not_found()
+
+        return jsonify({'success': True}), 200
+
+    except Exception as e:
+        logger.error(f"Error deleting document {document_id}: {e}")
+        return jsonify({'success': False, 'error': 'Failed to delete document'}), 500
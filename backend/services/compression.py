@@ -0,0 +1,163 @@
+import gzip
+import logging
+import time
+from typing import Dict, List, Optional
+
+from services import tracing
+
+logger = logging.getLogger(__name__)
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd
+except ImportError:
+    _zstd = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: zstd is only offered when a module is available
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/xml',
+    'text/',
+)
+
+
+class CompressionError(Exception):
+    """Custom exception for response compression errors."""
+
+    pass
+
+
+def supported_encodings() -> List[str]:
+    """Content codings this server can produce, most preferred first."""
+    encodings = ['gzip']
+    if _zstd is not None or zstandard is not None:
+        encodings.insert(0, 'zstd')
+    return encodings
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into quality values by coding.
+
+    Args:
+        header: Header value, e.g. "gzip;q=0.8, zstd, *;q=0"
+
+    Returns:
+        Quality value of each coding listed, lower cased
+    """
+    qualities = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def negotiate_encoding(header: str) -> Optional[str]:
+    """
+    Choose the content coding for a response.
+
+    Args:
+        header: The request's Accept-Encoding header
+
+    Returns:
+        The acceptable coding with the highest quality, preferring zstd on
+        ties, or None when the response should be sent uncompressed
+    """
+    qualities = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for coding in supported_encodings():
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """
+    Compress a response body.
+
+    Args:
+        data: Body to compress
+        encoding: 'gzip' or 'zstd'
+        level: Compression level of the coding
+
+    Raises:
+        CompressionError: If the coding isn't supported
+    """
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == 'zstd':
+        if _zstd is not None:
+            return _zstd.compress(data, level=level)
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=level).compress(data)
+    raise CompressionError(f"Unsupported content coding: {encoding}")
+
+
+def _is_compressible(response, min_bytes: int) -> bool:
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if not 200 <= response.status_code < 300 or 'Content-Encoding' in response.headers:
+        return False
+    if not response.mimetype.startswith(COMPRESSIBLE_MIMETYPES):
+        return False
+    return response.content_length is not None and response.content_length >= min_bytes
+
+
+def init_app(app) -> None:
+    """
+    Compress the responses of a Flask app.
+
+    Bodies of at least COMPRESSION_MIN_BYTES with a text or JSON mimetype are
+    compressed with zstd or gzip, whichever the client prefers. Streamed
+    responses (server-sent events, NDJSON batches) are sent as they are so
+    each event reaches the client as soon as it's written. Register this after
+    tracing.init_app so the compression time shows in Server-Timing.
+    """
+    from flask import request
+
+    config = app.config
+    if not config['COMPRESSION_ENABLED']:
+        return
+
+    levels = {
+        'gzip': config['COMPRESSION_GZIP_LEVEL'],
+        'zstd': config['COMPRESSION_ZSTD_LEVEL'],
+    }
+
+    @app.after_request
+    def _compress_response(response):
+        response.vary.add('Accept-Encoding')
+        if not _is_compressible(response, config['COMPRESSION_MIN_BYTES']):
+            return response
+
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        started_at = time.perf_counter()
+        try:
+            body = compress(response.get_data(), encoding, levels[encoding])
+        except (CompressionError, ValueError) as e:
+            logger.warning(f"Failed to compress response with {encoding}: {e}")
+            return response
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        tracing.record_stage('compress', time.perf_counter() - started_at, encoding)
+        return response
@@ -0,0 +1,248 @@
+import time
+import logging
+import multiprocessing
+from contextlib import nullcontext
+from multiprocessing.connection import wait
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a terminated child before killing it outright
+TERMINATE_GRACE_PERIOD = 5
+
+
+class SandboxError(Exception):
+    """Custom exception for conversion sandbox errors."""
+
+    pass
+
+
+class SandboxTimeoutError(SandboxError):
+    """Raised when the sandboxed call exceeds its deadline."""
+
+    pass
+
+
+class SandboxCrashError(SandboxError):
+    """Raised when the sandboxed process dies without returning a result."""
+
+    pass
+
+
+def is_sandbox_supported() -> bool:
+    """
+    Check whether sandboxed execution is available on this platform.
+
+    The sandbox forks so the child inherits already-loaded converter models
+    instead of re-importing and re-loading them.
+    """
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def _sandbox_main(conn, target: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+    """Entry point of the sandboxed child process."""
+    try:
+        conn.send(('ok', target(*args)))
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _reap(process) -> None:
+    """Stop a child process if still running and release its resources."""
+    if process.is_alive():
+        process.terminate()
+        process.join(TERMINATE_GRACE_PERIOD)
+
+        if process.is_alive():
+            logger.warning(f"Sandbox process {process.pid} ignored SIGTERM, killing")
+            process.kill()
+
+    process.join()
+    process.close()
+
+
+def run_in_sandbox(
+    target: Callable[..., Any],
+    args: Tuple[Any, ...],
+    timeout: float,
+    fork_lock: Optional[ContextManager] = None,
+) -> Any:
+    """
+    Run a function in a forked child process with a hard wall-clock deadline.
+
+    The child is terminated (and killed if it does not exit) once the deadline
+    passes, so CPU, memory and file handles held by a runaway call are always
+    reclaimed. The return value must be picklable.
+
+    A child only has the forking thread, so a lock held by another thread at
+    fork time stays held forever in the child. ``fork_lock`` is held while
+    forking; other threads hold it around any work taking locks the child
+    needs.
+
+    Args:
+        target: Function to run in the child process
+        args: Positional arguments for the function
+        timeout: Deadline in seconds
+        fork_lock: Optional lock held while the child is forked
+
+    Returns:
+        The value returned by the function
+
+    Raises:
+        SandboxTimeoutError: If the deadline passes before a result arrives
+        SandboxCrashError: If the child dies without returning a result
+        SandboxError: If the function raised an exception in the child
+    """
+    context = multiprocessing.get_context('fork')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_sandbox_main, args=(child_conn, target, args), daemon=True
+    )
+    with fork_lock or nullcontext():
+        process.start()
+    child_conn.close()
+
+    try:
+        if not parent_conn.poll(timeout):
+            raise SandboxTimeoutError(f"Deadline of {timeout}s exceeded")
+
+        try:
+            status, value = parent_conn.recv()
+        except EOFError:
+            process.join(TERMINATE_GRACE_PERIOD)
+            raise SandboxCrashError(
+                f"Sandbox process exited unexpectedly (exit code {process.exitcode})"
+            )
+
+        if status != 'ok':
+            raise SandboxError(value)
+
+        return value
+
+    finally:
+        parent_conn.close()
+        _reap(process)
+
+
+def _stream_main(
+    conn, target: Callable[[List[Any]], Iterable[Tuple[Hashable, Any]]], shard
+) -> None:
+    """Entry point of a streaming sandboxed child process."""
+    try:
+        for key, value in target(shard):
+            conn.send(('item', key, value))
+        conn.send(('done', None, None))
+    except Exception as e:
+        conn.send(('error', None, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def iter_in_sandboxes(
+    target: Callable[[List[Any]], Iterable[Tuple[Hashable, Any]]],
+    shards: List[List[Hashable]],
+    timeout: float,
+    fork_lock: Optional[ContextManager] = None,
+) -> Iterator[Tuple[Hashable, Any, Any]]:
+    """
+    Run a generator function over several shards in parallel forked children.
+
+    Each child runs ``target(shard)``, which must yield one ``(key, value)``
+    pair per shard key. Pairs are yielded as soon as any child produces them,
+    so results arrive in completion order. A child that produces nothing for
+    ``timeout`` seconds is terminated and its outstanding keys are reported as
+    timed out; keys of a child that dies are reported as crashed.
+
+    Args:
+        target: Generator function run on each shard in a child process
+        shards: Lists of keys, one child process per shard
+        timeout: Maximum seconds a child may spend on a single key
+        fork_lock: Optional lock held while each child is forked, see
+                   run_in_sandbox
+
+    Yields:
+        Tuples of (key, value, error) where exactly one of value/error is set
+    """
+    context = multiprocessing.get_context('fork')
+    children: Dict[Any, Dict[str, Any]] = {}
+
+    try:
+        for shard in shards:
+            parent_conn, child_conn = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_stream_main, args=(child_conn, target, shard), daemon=True
+            )
+            with fork_lock or nullcontext():
+                process.start()
+            child_conn.close()
+            children[parent_conn] = {
+                'process': process,
+                'pending': list(shard),
+                'deadline': time.monotonic() + timeout,
+            }
+
+        while children:
+            next_deadline = min(child['deadline'] for child in children.values())
+            ready = wait(list(children), max(0.0, next_deadline - time.monotonic()))
+
+            for conn in ready:
+                child = children[conn]
+                failure = None
+                try:
+                    kind, key, value = conn.recv()
+                except EOFError:
+                    child['process'].join(TERMINATE_GRACE_PERIOD)
+                    kind, failure = 'crashed', SandboxCrashError(
+                        "Sandbox process exited unexpectedly "
+                        f"(exit code {child['process'].exitcode})"
+                    )
+
+                if kind == 'item':
+                    if key in child['pending']:
+                        child['pending'].remove(key)
+                    child['deadline'] = time.monotonic() + timeout
+                    yield key, value, None
+                    continue
+
+                if kind == 'error':
+                    failure = SandboxError(value)
+                elif kind == 'done':
+                    failure = SandboxCrashError("No result produced for document")
+
+                del children[conn]
+                conn.close()
+                _reap(child['process'])
+                for key in child['pending']:
+                    yield key, None, failure
+
+            now = time.monotonic()
+            for conn, child in list(children.items()):
+                if child['deadline'] > now:
+                    continue
+
+                logger.error(f"Sandbox process {child['process'].pid} timed out")
+                del children[conn]
+                conn.close()
+                _reap(child['process'])
+                for key in child['pending']:
+                    yield key, None, SandboxTimeoutError(
+                        f"Deadline of {timeout}s exceeded"
+                    )
+
+    finally:
+        for conn, child in children.items():
+            conn.close()
+            _reap(child['process'])
@@ -0,0 +1,215 @@
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough estimate of token count for text (~4 characters per token)."""
+    return len(text) // 4
+
+
+class DocumentChunker:
+    """
+    Split a Docling document into token-budgeted markdown chunks.
+
+    Chunks follow the document structure: every element is rendered to
+    markdown on its own, tables are never merged into the middle of a
+    paragraph, and each chunk starts with the heading path of its first
+    element so it can be understood in isolation. Elements larger than the
+    budget are split by lines, repeating the header of split tables, and
+    single lines larger than the budget are cut into pieces.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 8000,
+        token_counter: Callable[[str], int] = estimate_tokens,
+    ):
+        """
+        Initialize the document chunker.
+
+        Args:
+            max_tokens: Maximum estimated tokens per chunk
+            token_counter: Function estimating the token count of a text
+        """
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+
+    def chunk(self, document) -> List[Dict[str, Any]]:
+        """
+        Split a document into chunks.
+
+        Args:
+            document: The converted Docling document
+
+        Returns:
+            List of chunks, each with 'text', 'headings', 'pages' and 'tokens'
+        """
+        chunks: List[Dict[str, Any]] = []
+        current: Optional[Dict[str, Any]] = None
+
+        for unit in self._iter_units(document):
+            for text in self._split_oversized(unit):
+                tokens = self.token_counter(text)
+                starts_section = current is not None and (
+                    unit['headings'] != current['section']
+                )
+
+                if current is not None and (
+                    current['tokens'] + tokens > self.max_tokens
+                    # Prefer section boundaries once a chunk is reasonably full
+                    or (starts_section and current['tokens'] > self.max_tokens // 2)
+                ):
+                    chunks.append(self._finalize(current))
+                    current = None
+
+                if current is None:
+                    breadcrumb = self._format_headings(unit['headings'])
+                    current = {
+                        'parts': [breadcrumb] if breadcrumb else [],
+                        'headings': unit['headings'],
+                        'section': unit['headings'],
+                        'pages': set(),
+                        'tokens': self.token_counter(breadcrumb),
+                    }
+                elif starts_section:
+                    breadcrumb = self._format_headings(unit['headings'])
+                    if breadcrumb:
+                        current['parts'].append(breadcrumb)
+                        current['tokens'] += self.token_counter(breadcrumb)
+                    current['section'] = unit['headings']
+
+                current['parts'].append(text)
+                current['pages'].update(unit['pages'])
+                current['tokens'] += tokens
+
+        if current is not None:
+            chunks.append(self._finalize(current))
+
+        logger.info(f"Split document into {len(chunks)} chunks")
+        return chunks
+
+    def _iter_units(self, document):
+        """Yield markdown units for each content element of the document."""
+        # Imported here so that importing the chunker doesn't load Docling
+        from docling_core.types.doc import (
+            ListItem,
+            PictureItem,
+            SectionHeaderItem,
+            TableItem,
+            TextItem,
+            TitleItem,
+        )
+
+        title: Optional[str] = None
+        sections: List[str] = []
+
+        for item, _ in document.iterate_items():
+            if isinstance(item, TitleItem):
+                title, sections = item.text, []
+                continue
+
+            if isinstance(item, SectionHeaderItem):
+                # Keep the parent sections of this heading level
+                sections = sections[: max(item.level, 1) - 1] + [item.text]
+                continue
+
+            if isinstance(item, TableItem):
+                text = item.export_to_markdown(doc=document)
+                is_table = True
+            elif isinstance(item, ListItem):
+                text = f"{item.marker or '-'} {item.text}"
+                is_table = False
+            elif isinstance(item, TextItem):
+                text = item.text
+                is_table = False
+            elif isinstance(item, PictureItem):
+                text = item.caption_text(document)
+                is_table = False
+            else:
+                continue
+
+            if not text or not text.strip():
+                continue
+
+            yield {
+                'text': text,
+                'headings': ([title] if title else []) + sections,
+                'pages': {prov.page_no for prov in getattr(item, 'prov', [])},
+                'is_table': is_table,
+            }
+
+    def _split_oversized(self, unit: Dict[str, Any]) -> List[str]:
+        """Split a unit that exceeds the budget on its own into line groups."""
+        text = unit['text']
+        if self.token_counter(text) <= self.max_tokens:
+            return [text]
+
+        lines = text.split('\n')
+        # Markdown tables repeat their header and separator rows in each part
+        header = lines[:2] if unit['is_table'] and len(lines) > 2 else []
+        body = lines[len(header) :]
+
+        # Token counts are summed line by line instead of re-counting the
+        # growing part, which would be quadratic in the size of the unit.
+        # Each line also pays its newline and a token of slack, as counts of
+        # separate lines can round below the count of the joined text
+        line_overhead = self.token_counter('\n') + 1
+        header_tokens = self.token_counter('\n'.join(header)) if header else 0
+        line_budget = max(1, self.max_tokens - header_tokens - line_overhead)
+
+        parts = []
+        current, current_tokens = list(header), header_tokens
+        for line in body:
+            for piece in self._split_line(line, line_budget):
+                piece_tokens = self.token_counter(piece) + line_overhead
+                if (
+                    len(current) > len(header)
+                    and current_tokens + piece_tokens > self.max_tokens
+                ):
+                    parts.append('\n'.join(current))
+                    current, current_tokens = list(header), header_tokens
+                current.append(piece)
+                current_tokens += piece_tokens
+
+        if len(current) > len(header):
+            parts.append('\n'.join(current))
+
+        return parts
+
+    def _split_line(self, line: str, budget: int) -> List[str]:
+        """Hard-split a single line longer than the budget into pieces."""
+        tokens = self.token_counter(line)
+        if tokens <= budget:
+            return [line]
+
+        pieces = []
+        # Start from the line's average characters per token, then shrink
+        # until the piece fits
+        chars_per_token = max(1, len(line) // max(tokens, 1))
+        start = 0
+        while start < len(line):
+            size = max(1, budget * chars_per_token)
+            while size > 1 and self.token_counter(line[start : start + size]) > budget:
+                size = max(1, size * 9 // 10)
+            pieces.append(line[start : start + size])
+            start += size
+        return pieces
+
+    @staticmethod
+    def _format_headings(headings: List[str]) -> str:
+        """Render a heading path as a markdown breadcrumb."""
+        if not headings:
+            return ''
+        return f"{'#' * min(len(headings) + 1, 6)} {' > '.join(headings)}"
+
+    @staticmethod
+    def _finalize(current: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn an in-progress chunk into its public form."""
+        return {
+            'text': '\n\n'.join(current['parts']),
+            'headings': current['headings'],
+            'pages': sorted(current['pages']),
+            'tokens': current['tokens'],
+        }
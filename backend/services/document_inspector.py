@@ -0,0 +1,201 @@
+import re
+import math
+import zipfile
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from xml.etree import ElementTree
+
+from services.pdf_probe import PdfProbeError, probe_page_layout
+
+logger = logging.getLogger(__name__)
+
+# Rough conversion cost in CPU seconds per page of each kind of work. They
+# only need to rank documents and catch outliers; calibrate them against
+# benchmarks/parser_benchmark.py results on the serving hardware
+SECONDS_PER_PAGE = {
+    'text': 0.05,  # text layer only (fast profile)
+    'layout': 0.4,  # layout analysis and table structure
+    'ocr': 1.5,  # OCR of a whole page
+    'office': 0.02,  # docx and pptx, read without models
+}
+
+# Characters of running text on a typical page, to estimate docx page counts
+CHARS_PER_PAGE = 3000
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+SLIDE_PATTERN = re.compile(r'^ppt/slides/slide\d+\.xml$')
+
+
+class DocumentInspectionError(Exception):
+    """Custom exception for document inspection errors."""
+
+    pass
+
+
+def _inspect_pdf(source: Any, page_range, samples: int) -> Dict[str, Any]:
+    try:
+        return probe_page_layout(source, page_range, samples)
+    except PdfProbeError as e:
+        raise DocumentInspectionError(str(e))
+
+
+def _inspect_image(source: Any) -> Dict[str, Any]:
+    from PIL import Image
+
+    try:
+        with Image.open(source) as image:
+            dpi = image.info.get('dpi')
+            return {
+                'page_count': getattr(image, 'n_frames', 1),
+                'has_text_layer': False,
+                'image_coverage': 1.0,
+                'width': image.width,
+                'height': image.height,
+                'dpi': [round(float(value)) for value in dpi] if dpi else None,
+            }
+    except Exception as e:
+        raise DocumentInspectionError(f"Failed to read image: {e}")
+
+
+def _inspect_office(source: Any, suffix: str) -> Dict[str, Any]:
+    try:
+        with zipfile.ZipFile(source) as archive:
+            names = archive.namelist()
+            info = {
+                'has_text_layer': True,
+                'images': sum('/media/' in name for name in names),
+            }
+            if suffix == '.pptx':
+                info['page_count'] = sum(bool(SLIDE_PATTERN.match(n)) for n in names)
+                return info
+
+            # Word only stores the page count it last rendered, when it did,
+            # so pages are estimated from the text and explicit page breaks
+            chars = breaks = tables = 0
+            with archive.open('word/document.xml') as document_xml:
+                for _, element in ElementTree.iterparse(document_xml):
+                    if element.tag == f'{WORD_NAMESPACE}t':
+                        chars += len(element.text or '')
+                    elif element.tag == f'{WORD_NAMESPACE}tbl':
+                        tables += 1
+                    elif element.tag == f'{WORD_NAMESPACE}br' and (
+                        element.get(f'{WORD_NAMESPACE}type') == 'page'
+                    ):
+                        breaks += 1
+                    element.clear()
+
+            info.update(
+                page_count=max(breaks + 1, math.ceil(chars / CHARS_PER_PAGE)),
+                page_count_estimated=True,
+                characters=chars,
+                tables=tables,
+            )
+            return info
+
+    except (KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        raise DocumentInspectionError(f"Failed to read {suffix} file: {e}")
+
+
+def estimate_cost(
+    info: Dict[str, Any],
+    suffix: str,
+    profile: str = 'auto',
+    page_range: Optional[Tuple[int, int]] = None,
+) -> Dict[str, Any]:
+    """
+    Estimate the work a conversion of an inspected document takes.
+
+    The profile is resolved the way the parser does: 'auto' becomes digital
+    for PDFs with a text layer and standard otherwise, and formats other than
+    PDF always use standard.
+
+    Args:
+        info: Inspection result of the document
+        suffix: File extension of the document, e.g. '.pdf'
+        profile: Requested pipeline profile, one of PROFILE_CHOICES
+        page_range: Optional 1-based, inclusive (first, last) page range
+
+    Returns:
+        Dictionary with the resolved 'profile', 'pages' to convert, the
+        'ocr_pages' expected and the estimated CPU 'seconds'
+    """
+    page_count = info.get('page_count') or 0
+    first, last = page_range or (1, page_count)
+    pages = max(0, min(last, page_count) - max(1, first) + 1)
+
+    if suffix != '.pdf':
+        profile = 'standard'
+    elif profile == 'auto':
+        profile = 'digital' if info.get('has_text_layer') else 'standard'
+
+    if suffix in ('.docx', '.pptx'):
+        ocr_pages = 0
+        seconds = pages * SECONDS_PER_PAGE['office']
+    elif profile == 'fast':
+        ocr_pages = 0
+        seconds = pages * SECONDS_PER_PAGE['text']
+    else:
+        if profile == 'digital':
+            ocr_pages = 0
+        elif profile == 'full':
+            ocr_pages = pages
+        else:
+            # Standard OCRs the bitmap regions found by the layout model
+            ocr_pages = round(pages * info.get('image_coverage', 0.0))
+        seconds = (
+            pages * SECONDS_PER_PAGE['layout'] + ocr_pages * SECONDS_PER_PAGE['ocr']
+        )
+
+    return {
+        'profile': profile,
+        'pages': pages,
+        'ocr_pages': ocr_pages,
+        'seconds': round(seconds, 2),
+    }
+
+
+def inspect_document(
+    source: Any,
+    file_name: str,
+    page_range: Optional[Tuple[int, int]] = None,
+    profile: str = 'auto',
+    samples: int = 10,
+) -> Dict[str, Any]:
+    """
+    Read the structure of a document without converting it.
+
+    PDFs get their page count, text layer and image placements read from up
+    to ``samples`` pages; images their size and frame count; docx and pptx
+    files their slide count or an estimate of their pages. No model runs and
+    nothing is rendered, so inspecting takes milliseconds.
+
+    Args:
+        source: Path or binary file object of the document
+        file_name: Name of the document, whose extension selects the reader
+        page_range: Optional 1-based, inclusive (first, last) page range
+        profile: Requested pipeline profile, one of PROFILE_CHOICES
+        samples: Maximum number of PDF pages inspected
+
+    Returns:
+        Dictionary with 'file_type', 'page_count', 'has_text_layer',
+        'image_coverage' and format-specific details, plus the conversion
+        'estimate' from estimate_cost
+
+    Raises:
+        DocumentInspectionError: If the file can't be read
+    """
+    suffix = Path(file_name).suffix.lower()
+    if suffix == '.pdf':
+        info = _inspect_pdf(source, page_range, samples)
+    elif suffix in ('.docx', '.pptx'):
+        info = _inspect_office(source, suffix)
+    else:
+        info = _inspect_image(source)
+
+    info.setdefault('image_coverage', 0.0)
+    return {
+        'file_type': suffix,
+        **info,
+        'estimate': estimate_cost(info, suffix, profile, page_range),
+    }
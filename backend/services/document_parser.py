@@ -1,113 +1,1335 @@
 import logging
-from typing import Dict, Any, Literal
+from typing import (
+    Dict,
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
 from pathlib import Path
+import io
 import os
 import json
+import time
+import hashlib
+import re
+import sys
+import uuid
+import threading
+from functools import partial
+from importlib import metadata as importlib_metadata
+from config.settings import Config
+from services import json_codec, metrics, tracing
+from services.file_service import UploadedFile
+from services.parse_cache import ParseCache
+from services.document_store import DocumentStore, DocumentStoreError
+from services.table_extractor import extract_tables
+from services.image_preprocessor import ImagePreprocessor
+from services.pdf_probe import PdfProbeError, probe_text_layer
+from services.conversion_sandbox import (
+    SandboxCrashError,
+    SandboxTimeoutError,
+    is_sandbox_supported,
+    iter_in_sandboxes,
+    run_in_sandbox,
+)
 
-try:
-    from docling.document_converter import DocumentConverter
-    from docling_core.transforms.serializer.html import HTMLDocSerializer
-    from docling_core.transforms.serializer.markdown import MarkdownDocSerializer
-except ImportError as e:
-    raise ImportError(
-        "Docling is not installed. Please install it with: "
-        "pip install docling docling-core"
-    ) from e
+# Docling is imported where it is used: loading it takes seconds, and this
+# module is also imported by code paths that never convert a document
 
 logger = logging.getLogger(__name__)
 
 # Define supported output formats
 OutputFormat = Literal["markdown", "json", "text", "html"]
+SUPPORTED_OUTPUT_FORMATS: list[OutputFormat] = ["markdown", "json", "text", "html"]
+
+# 1-based, inclusive (first, last) page numbers
+PageRange = Tuple[int, int]
+
+# Named PDF pipeline configurations, cheapest first:
+# - fast: text layer only, no OCR and no table structure model
+# - digital: text layer with table structure, for born-digital PDFs
+# - standard: Docling's defaults, OCR where the layout finds bitmaps
+# - full: OCR of every full page, for poor or misleading text layers
+PipelineProfile = Literal["fast", "digital", "standard", "full"]
+PIPELINE_PROFILES: list[PipelineProfile] = ["fast", "digital", "standard", "full"]
+
+# Formats converted by Docling's simple pipelines, which load no models
+MODEL_FREE_EXTENSIONS = {'.docx', '.pptx'}
+
+# 'auto' probes a PDF's text layer and picks digital or standard
+PROFILE_CHOICES = ["auto", *PIPELINE_PROFILES]
+
+
+def parse_page_range(value: str) -> PageRange:
+    """
+    Parse a page range such as "3" or "1-5".
+
+    Args:
+        value: Page range string
+
+    Returns:
+        Tuple of (first, last) page numbers
+
+    Raises:
+        ValueError: If the page range is malformed
+    """
+    parts = [part.strip() for part in value.split('-')]
+    if len(parts) > 2 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"Invalid page range: {value}. Expected e.g. '3' or '1-5'")
+
+    first, last = int(parts[0]), int(parts[-1])
+    if first < 1 or last < first:
+        raise ValueError(
+            f"Invalid page range: {value}. Pages start at 1 and must be in order"
+        )
+
+    return first, last
+
+
+def parse_page_options(
+    page_range: Optional[str] = None, max_pages: Optional[str] = None
+) -> Tuple[Optional[PageRange], Optional[int]]:
+    """
+    Parse the optional page selection fields of a request.
+
+    Args:
+        page_range: Optional page range string, e.g. "1-5"
+        max_pages: Optional maximum number of pages as a string
+
+    Returns:
+        Tuple of (page_range, max_pages), each None when not given
+
+    Raises:
+        ValueError: If either value is malformed
+    """
+    parsed_range = parse_page_range(page_range) if page_range else None
+
+    parsed_max_pages = None
+    if max_pages:
+        if not max_pages.strip().isdigit() or int(max_pages) < 1:
+            raise ValueError(
+                f"Invalid max_pages: {max_pages}. Expected a positive integer"
+            )
+        parsed_max_pages = int(max_pages)
+
+    return parsed_range, parsed_max_pages
+
+
+def resolve_page_range(
+    page_range: Optional[PageRange] = None, max_pages: Optional[int] = None
+) -> Optional[PageRange]:
+    """
+    Combine a requested page range with a cap on the number of pages.
+
+    Args:
+        page_range: Optional (first, last) page range
+        max_pages: Optional maximum number of pages
+
+    Returns:
+        The effective page range, or None to convert every page
+    """
+    if not max_pages:
+        return page_range
+
+    first, last = page_range or (1, sys.maxsize)
+    return first, min(last, first + max_pages - 1)
 
 
 class DocumentParsingError(Exception):
     """Custom exception for document parsing errors."""
 
-    pass
+    error_code = 'parsing_failed'
+
+
+class ConversionTimeoutError(DocumentParsingError):
+    """Raised when a conversion exceeds the configured timeout."""
+
+    error_code = 'conversion_timeout'
+
+
+class ConversionCrashedError(DocumentParsingError):
+    """Raised when the conversion process dies without producing a result."""
+
+    error_code = 'conversion_crashed'
+
+
+class ParsedDocument:
+    """
+    Result of a single document conversion.
+
+    Holds the converted Docling document and renders it to any supported
+    output format on demand, memoizing each rendering so a format is only
+    exported once per conversion.
+    """
+
+    def __init__(
+        self,
+        document,
+        metadata: Dict[str, Any],
+        output_format: OutputFormat,
+        exporter: Callable[[Any, OutputFormat], str],
+        cache_key: Optional[str] = None,
+        streamer: Optional[Callable[[Any, OutputFormat], Iterator[str]]] = None,
+    ):
+        """
+        Initialize the parsed document.
+
+        Args:
+            document: The converted Docling document
+            metadata: Metadata describing the source file and document
+            output_format: Format returned by the content property
+            exporter: Function rendering a document in a given format
+            cache_key: Parse cache key of the conversion, when caching is on
+            streamer: Function rendering a document in a given format as a
+                sequence of parts, used by iter_export
+        """
+        self.document = document
+        self.metadata = metadata
+        self.output_format = output_format
+        self.cache_key = cache_key
+        self._exporter = exporter
+        self._streamer = streamer
+        self._renderings: Dict[str, str] = {}
+        self._document_dict: Optional[Dict[str, Any]] = None
+
+    @property
+    def content(self) -> str:
+        """Document content in the requested output format."""
+        return self.export(self.output_format)
+
+    def response_content(
+        self, output_format: Optional[OutputFormat] = None
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        Document content for an API response.
+
+        The json format is returned as the document dictionary, so it is
+        encoded once, nested in the response, rather than as a JSON string
+        escaped inside another JSON document. Other formats are strings.
+
+        Args:
+            output_format: Desired output format (default: the requested one)
+        """
+        output_format = output_format or self.output_format
+        if output_format != 'json':
+            return self.export(output_format)
+
+        if self._document_dict is None:
+            file_type = self.metadata.get('file_type', '')
+            with metrics.track_stage('export', file_type, 'json'):
+                with tracing.sample_stage('export'):
+                    self._document_dict = self.document.export_to_dict()
+        return self._document_dict
+
+    def export(self, output_format: OutputFormat) -> str:
+        """
+        Render the document in the given format, reusing earlier renderings.
+
+        Args:
+            output_format: Desired output format
+
+        Returns:
+            String representation of the document in the given format
+        """
+        if output_format not in self._renderings:
+            file_type = self.metadata.get('file_type', '')
+            with metrics.track_stage('export', file_type, output_format):
+                with tracing.sample_stage('export'):
+                    rendering = self._exporter(self.document, output_format)
+            metrics.record_bytes(
+                'out', len(rendering.encode('utf-8')), file_type, output_format
+            )
+            self._renderings[output_format] = rendering
+        return self._renderings[output_format]
+
+    def extract_tables(self, table_format: str = 'columns') -> List[Dict[str, Any]]:
+        """
+        Extract the document's tables without exporting the rest of it.
+
+        Args:
+            table_format: Table layout, one of TABLE_FORMATS
+
+        Returns:
+            Tables with their provenance, see table_extractor.extract_tables
+        """
+        file_type = self.metadata.get('file_type', '')
+        with metrics.track_stage('export', file_type, 'tables'):
+            with tracing.sample_stage('export'):
+                return extract_tables(self.document, table_format)
+
+    def iter_export(
+        self,
+        output_format: Optional[OutputFormat] = None,
+        chunk_size: int = 65536,
+    ) -> Iterator[str]:
+        """
+        Render the document in chunks, without building the whole export.
+
+        The document is serialized one top-level element at a time and parts
+        are yielded in chunks of about ``chunk_size`` characters, so memory
+        stays bounded by the largest element rather than the document. A
+        format that was already exported is sliced instead. The json format
+        is rendered as NDJSON, one document element per line.
+
+        Args:
+            output_format: Desired output format (default: the requested one)
+            chunk_size: Characters buffered before a chunk is yielded
+        """
+        output_format = output_format or self.output_format
+        if output_format in self._renderings or self._streamer is None:
+            rendering = self.export(output_format)
+            for start in range(0, len(rendering), chunk_size):
+                yield rendering[start : start + chunk_size]
+            return
+
+        file_type = self.metadata.get('file_type', '')
+        size = 0
+        buffer: List[str] = []
+        buffered = 0
+        with metrics.track_stage('export', file_type, output_format):
+            for part in self._streamer(self.document, output_format):
+                buffer.append(part)
+                buffered += len(part)
+                if buffered >= chunk_size:
+                    chunk = ''.join(buffer)
+                    size += len(chunk.encode('utf-8'))
+                    buffer, buffered = [], 0
+                    yield chunk
+            if buffer:
+                chunk = ''.join(buffer)
+                size += len(chunk.encode('utf-8'))
+                yield chunk
+        metrics.record_bytes('out', size, file_type, output_format)
 
 
 class DocumentParser:
     """Service for parsing documents using Docling."""
 
-    def __init__(self, timeout: int = 300):
+    def __init__(
+        self,
+        timeout: int = 300,
+        cache: Optional[ParseCache] = None,
+        use_sandbox: bool = True,
+        image_preprocessor: Optional[ImagePreprocessor] = None,
+        image_page_parallelism: int = 4,
+        store: Optional[DocumentStore] = None,
+    ):
         """
         Initialize the document parser.
 
         Args:
             timeout: Maximum time in seconds to wait for parsing
+            cache: Optional cache of converted documents keyed by file content
+            use_sandbox: Run conversions in a child process killed on timeout
+            image_preprocessor: Optional preprocessor bounding the resolution
+                                of image inputs and splitting their pages
+            image_page_parallelism: Pages of a multi-page image converted
+                                    concurrently, in sandboxed children
+            store: Optional store keeping the elements of parsed documents
         """
         self.timeout = timeout
+        self.cache = cache
+        self.store = store
+        self.image_preprocessor = image_preprocessor
+        self.image_page_parallelism = max(1, image_page_parallelism)
+        self.use_sandbox = use_sandbox and timeout > 0 and is_sandbox_supported()
+        if use_sandbox and not self.use_sandbox:
+            logger.warning("Conversion sandbox unavailable, timeout not enforced")
         self.converter = None
+        self.config_fingerprint = None
+        self.converters: Dict[str, Any] = {}
+        self.config_fingerprints: Dict[str, str] = {}
+        self.warm_profiles: set[str] = set()
+        self.failed_warm_profiles: set[str] = set()
+        # Held while models load and while sandboxes fork: a child forked
+        # while another thread holds Docling's pipeline cache lock would
+        # inherit it held and hang on its first conversion
+        self._warm_up_lock = threading.RLock()
         self._initialize_converter()
 
+    @classmethod
+    def from_config(
+        cls,
+        cache: Optional[ParseCache] = None,
+        store: Optional[DocumentStore] = None,
+    ) -> 'DocumentParser':
+        """
+        Create a document parser configured from application settings.
+
+        Args:
+            cache: Parse cache to share; created from the settings when omitted
+            store: Document store to share; created from the settings when
+                   omitted
+        """
+        if cache is None and Config.PARSE_CACHE_ENABLED:
+            cache = ParseCache(Config.PARSE_CACHE_DIR, Config.PARSE_CACHE_MAX_BYTES)
+        image_preprocessor = (
+            ImagePreprocessor(Config.IMAGE_MAX_DPI)
+            if Config.IMAGE_PREPROCESSING_ENABLED
+            else None
+        )
+        if store is None and Config.DOCUMENT_STORE_ENABLED:
+            try:
+                store = DocumentStore(
+                    Config.DOCUMENT_STORE_PATH, Config.DOCUMENT_STORE_MAX_DOCUMENTS
+                )
+            except DocumentStoreError as e:
+                logger.error(f"Document store disabled: {e}")
+        return cls(
+            timeout=Config.DOCLING_TIMEOUT,
+            cache=cache,
+            use_sandbox=Config.CONVERSION_SANDBOX_ENABLED,
+            image_preprocessor=image_preprocessor,
+            image_page_parallelism=Config.IMAGE_PAGE_PARALLELISM,
+            store=store,
+        )
+
     def _initialize_converter(self) -> None:
-        """Initialize the Docling converter with default settings."""
+        """Initialize one Docling converter per pipeline profile."""
         try:
-            # Initialize with default configuration
-            self.converter = DocumentConverter()
-            logger.info("Document converter initialized successfully")
+            for profile in PIPELINE_PROFILES:
+                converter = self._create_converter(profile)
+                self.converters[profile] = converter
+                self.config_fingerprints[profile] = self._compute_config_fingerprint(
+                    converter
+                )
+
+            # Batches and unprofiled calls use Docling's default configuration
+            self.converter = self.converters['standard']
+            self.config_fingerprint = self.config_fingerprints['standard']
+            logger.info("Document converters initialized successfully")
+
+        except ImportError as e:
+            raise ImportError(
+                "Docling is not installed. Please install it with: "
+                "pip install docling docling-core"
+            ) from e
 
         except Exception as e:
             logger.error(f"Failed to initialize document converter: {e}")
             raise DocumentParsingError(f"Failed to initialize parser: {e}")
 
+    @staticmethod
+    def _create_converter(profile: PipelineProfile):
+        """Create the converter of a pipeline profile."""
+        from docling.datamodel.base_models import InputFormat
+        from docling.datamodel.pipeline_options import OcrMode, PdfPipelineOptions
+        from docling.document_converter import DocumentConverter, PdfFormatOption
+
+        if profile == 'standard':
+            # Initialize with default configuration
+            return DocumentConverter()
+
+        pipeline_options = PdfPipelineOptions()
+        if profile in ('fast', 'digital'):
+            pipeline_options.do_ocr = False
+        if profile == 'fast':
+            pipeline_options.do_table_structure = False
+        if profile == 'full':
+            pipeline_options.ocr_options.mode = OcrMode.FULL_PAGE
+
+        return DocumentConverter(
+            format_options={
+                InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+            }
+        )
+
+    def warm_up(self, profiles: Optional[List[str]] = None) -> None:
+        """
+        Load the PDF pipeline models ahead of the first conversion.
+
+        Docling builds pipelines lazily, so without this the first request
+        served by a process pays the full model loading cost. Profiles are
+        loaded one at a time under the warm-up lock, so sandboxes fork
+        between them and a conversion never waits for every profile.
+
+        Args:
+            profiles: Pipeline profiles to warm up (default: all of them)
+        """
+        from docling.datamodel.base_models import InputFormat
+
+        profile = None
+        try:
+            for profile in profiles or PIPELINE_PROFILES:
+                with self._warm_up_lock:
+                    self.converters[profile].initialize_pipeline(InputFormat.PDF)
+                    self.warm_profiles.add(profile)
+                    self.failed_warm_profiles.discard(profile)
+            logger.info("Document converters warmed up")
+
+        except Exception as e:
+            if profile is not None:
+                self.failed_warm_profiles.add(profile)
+            logger.error(f"Failed to warm up document converter: {e}")
+            raise DocumentParsingError(f"Failed to warm up parser: {e}")
+
+    def _warm_up_for_sandbox(
+        self, profile: PipelineProfile, file_names: List[str]
+    ) -> None:
+        """
+        Load a profile's models in this process before forking a sandbox.
+
+        Sandboxed children exit after one conversion, so models they load
+        themselves are thrown away with them; loaded here, every child
+        inherits them instead. A profile that failed to load isn't retried
+        here: its children load the models themselves and report any error
+        as a conversion failure. warm_up retries it.
+
+        Args:
+            profile: Pipeline profile about to convert
+            file_names: Names of the documents about to be converted
+        """
+        if (
+            profile in self.warm_profiles
+            or profile in self.failed_warm_profiles
+            or all(
+                Path(name).suffix.lower() in MODEL_FREE_EXTENSIONS
+                for name in file_names
+            )
+        ):
+            return
+
+        with self._warm_up_lock:
+            if profile in self.warm_profiles or profile in self.failed_warm_profiles:
+                return
+            started_at = time.perf_counter()
+            try:
+                self.warm_up([profile])
+            except DocumentParsingError as e:
+                logger.warning(f"Converting without warm {profile} models: {e}")
+            tracing.record_stage('warm_up', time.perf_counter() - started_at, profile)
+
+    def _compute_config_fingerprint(self, converter) -> str:
+        """
+        Fingerprint the converter configuration for use in cache keys.
+
+        Any change to the installed docling version or to the pipeline options
+        yields a different fingerprint, so stale conversions are never reused.
+        """
+        try:
+            docling_version = importlib_metadata.version('docling')
+        except importlib_metadata.PackageNotFoundError:
+            docling_version = 'unknown'
+
+        options = {}
+        for input_format, format_option in sorted(
+            converter.format_to_options.items(), key=lambda item: str(item[0])
+        ):
+            pipeline_options = format_option.pipeline_options
+            options[str(input_format)] = (
+                pipeline_options.model_dump() if pipeline_options else None
+            )
+
+        # Sets (e.g. supported engines) must be sorted: their iteration order
+        # changes between processes with string hash randomization
+        fingerprint_source = json.dumps(
+            {'docling': docling_version, 'options': options},
+            sort_keys=True,
+            default=lambda value: (
+                sorted(map(str, value))
+                if isinstance(value, (set, frozenset))
+                else str(value)
+            ),
+        )
+        return hashlib.sha256(fingerprint_source.encode('utf-8')).hexdigest()
+
     def parse_document(
-        self, file_path: str, output_format: OutputFormat = "markdown"
-    ) -> Dict[str, Any]:
+        self,
+        source: Union[str, UploadedFile],
+        output_format: OutputFormat = "markdown",
+        page_range: Optional[PageRange] = None,
+        max_pages: Optional[int] = None,
+        profile: str = 'auto',
+    ) -> ParsedDocument:
         """
         Parse a document and return structured content in specified format.
 
+        Pages outside the requested range are never rasterized, OCR'd or
+        layout-analysed; the metadata still reports the document's total page
+        count.
+
+        The 'auto' profile reads the text layer of a few PDF pages and skips
+        OCR when every sampled page has text. Profiles only change how PDFs
+        are converted; other formats always use the standard profile.
+
         Args:
-            file_path: Path to the document file
+            source: Path to the document file, or an upload held in memory
+                    whose size and hash are already known
             output_format: Desired output format (markdown, json, text,
                           html)
+            page_range: Optional 1-based, inclusive (first, last) page range
+            max_pages: Optional cap on the number of pages converted
+            profile: Pipeline profile, one of PROFILE_CHOICES
 
         Returns:
-            Dictionary containing parsed content and metadata
+            ParsedDocument rendering the converted document on demand
 
         Raises:
             DocumentParsingError: If parsing fails
         """
         try:
-            if not os.path.exists(file_path):
-                raise DocumentParsingError(f"File not found: {file_path}")
-
-            # Convert document
-            result = self.converter.convert(file_path)
-
-            if not result or not result.document:
-                raise DocumentParsingError("No content extracted from document")
-
-            # Extract structured content
-            document = result.document
-
-            # Generate content based on the requested format
-            parsed_content = self._export_document_content(document, output_format)
-
-            # Extract metadata
-            metadata = {
-                'title': (getattr(document, 'title', None) or Path(file_path).stem),
-                'page_count': (
-                    len(document.pages) if hasattr(document, 'pages') else None
-                ),
-                'file_size': os.path.getsize(file_path),
-                'file_type': Path(file_path).suffix.lower(),
-                'tables_count': self._count_tables(document),
-                'images_count': self._count_images(document),
-                'output_format': output_format,
-            }
+            if output_format not in self.get_supported_formats():
+                raise DocumentParsingError(
+                    f"Unsupported output format: {output_format}"
+                )
 
-            return {
-                'success': True,
-                'content': parsed_content,
-                'metadata': metadata,
-                'raw_document': document,  # Keep for potential future use
-            }
+            if isinstance(source, UploadedFile):
+                file_name, file_size = source.filename, source.size
+                content_hash = source.content_hash
+            else:
+                if not os.path.exists(source):
+                    raise DocumentParsingError(f"File not found: {source}")
+                file_name, file_size = source, os.path.getsize(source)
+                content_hash = None
+
+            page_range = resolve_page_range(page_range, max_pages)
+            resolved_profile = self._resolve_profile(
+                source, file_name, profile, page_range
+            )
+
+            # Reuse a previous conversion of the same bytes when available
+            document_key = self._get_document_key(
+                file_name, page_range, content_hash, resolved_profile
+            )
+            cache_key = self._cache_key(document_key)
+            cached = self._load_cached_document(cache_key)
+            cache_hit = cached is not None
+
+            if cache_hit:
+                document, conversion_info = cached
+            else:
+                # Convert document
+                file_type = Path(file_name).suffix.lower()
+                started_at = time.perf_counter()
+                with metrics.track_stage('conversion', file_type):
+                    document, conversion_info = self._convert(
+                        source, page_range, resolved_profile
+                    )
+                metrics.record_pages(
+                    len(document.pages),
+                    time.perf_counter() - started_at,
+                    file_type,
+                    resolved_profile,
+                )
+                self._store_cached_document(
+                    cache_key,
+                    {'document': document.export_to_dict(), **conversion_info},
+                )
+
+            return self._build_parsed_document(
+                file_name,
+                document,
+                output_format,
+                cache_hit,
+                conversion_info,
+                cache_key,
+                file_size,
+                resolved_profile,
+                document_key,
+            )
+
+        except (ConversionTimeoutError, ConversionCrashedError):
+            raise
 
         except Exception as e:
-            logger.error(f"Document parsing failed for {file_path}: {e}")
+            logger.error(
+                f"Document parsing failed for {self._source_name(source)}: {e}"
+            )
             raise DocumentParsingError(f"Failed to parse document: {e}")
 
+    def parse_batch(
+        self,
+        sources: List[Union[str, UploadedFile]],
+        output_format: OutputFormat = "markdown",
+        max_parallel: int = 2,
+    ) -> Iterator[
+        Tuple[
+            Union[str, UploadedFile],
+            Optional[ParsedDocument],
+            Optional[DocumentParsingError],
+        ]
+    ]:
+        """
+        Parse many documents, yielding each one as soon as it is ready.
+
+        Cached documents are yielded first. With the sandbox on, the rest are
+        split across up to ``max_parallel`` sandboxed child processes, each
+        running Docling's bulk ``convert_all`` over its share, so results
+        arrive in completion order rather than input order and the timeout
+        applies to each document. Without the sandbox they are converted one
+        after another in the current process and ``max_parallel`` is unused.
+
+        Args:
+            sources: Paths to the document files, or uploads held in memory
+            output_format: Desired output format for every document
+            max_parallel: Maximum number of concurrent conversion processes
+
+        Yields:
+            Tuples of (source, parsed_document, error) where exactly one of
+            parsed_document/error is set
+        """
+        if output_format not in self.get_supported_formats():
+            raise DocumentParsingError(f"Unsupported output format: {output_format}")
+
+        document_keys = {}
+        pending = []
+        for index, source in enumerate(sources):
+            file_name = self._source_name(source)
+            try:
+                document_keys[index] = self._get_document_key(
+                    file_name, content_hash=self._source_hash(source)
+                )
+                cached = self._load_cached_document(
+                    self._cache_key(document_keys[index])
+                )
+                if cached is None:
+                    pending.append(index)
+                    continue
+
+                document, conversion_info = cached
+                yield source, self._build_parsed_document(
+                    file_name,
+                    document,
+                    output_format,
+                    True,
+                    conversion_info,
+                    self._cache_key(document_keys[index]),
+                    self._source_size(source),
+                    document_key=document_keys[index],
+                ), None
+
+            except Exception as e:
+                logger.error(f"Document parsing failed for {file_name}: {e}")
+                yield source, None, DocumentParsingError(
+                    f"Failed to parse document: {e}"
+                )
+
+        if not pending:
+            return
+
+        # Sources are keyed by position: uploads don't survive the round trip
+        # through a sandbox pipe as the same objects
+        if self.use_sandbox:
+            self._warm_up_for_sandbox(
+                'standard', [self._source_name(sources[index]) for index in pending]
+            )
+            shard_count = max(1, min(max_parallel, len(pending)))
+            shards = [pending[i::shard_count] for i in range(shard_count)]
+            results = iter_in_sandboxes(
+                partial(self._convert_batch_to_payloads, sources),
+                shards,
+                self.timeout,
+                fork_lock=self._warm_up_lock,
+            )
+        else:
+            results = (
+                (index, payload, None)
+                for index, payload in self._convert_batch_to_payloads(
+                    sources, pending
+                )
+            )
+
+        for index, payload, error in results:
+            source = sources[index]
+            file_name = self._source_name(source)
+            if isinstance(error, SandboxTimeoutError):
+                yield source, None, ConversionTimeoutError(
+                    f"Conversion exceeded the {self.timeout}s timeout"
+                )
+                continue
+            if isinstance(error, SandboxCrashError):
+                yield source, None, ConversionCrashedError(
+                    f"Conversion process crashed: {error}"
+                )
+                continue
+
+            try:
+                if error is not None:
+                    raise error
+                if 'error' in payload:
+                    raise DocumentParsingError(payload['error'])
+
+                self._store_cached_document(
+                    self._cache_key(document_keys[index]), payload
+                )
+                document, conversion_info = self._from_payload(payload)
+                # Batches convert in parallel, so per-document time is unknown
+                metrics.record_pages(
+                    len(document.pages), 0, Path(file_name).suffix.lower(), 'standard'
+                )
+                yield source, self._build_parsed_document(
+                    file_name,
+                    document,
+                    output_format,
+                    False,
+                    conversion_info,
+                    self._cache_key(document_keys[index]),
+                    self._source_size(source),
+                    document_key=document_keys[index],
+                ), None
+
+            except Exception as e:
+                logger.error(f"Document parsing failed for {file_name}: {e}")
+                yield source, None, DocumentParsingError(
+                    f"Failed to parse document: {e}"
+                )
+
+    def _resolve_profile(
+        self,
+        source: Union[str, UploadedFile],
+        file_name: str,
+        profile: str,
+        page_range: Optional[PageRange] = None,
+    ) -> PipelineProfile:
+        """
+        Resolve the requested profile to the pipeline profile to convert with.
+
+        Raises:
+            DocumentParsingError: If the profile is unknown
+        """
+        if profile not in PROFILE_CHOICES:
+            raise DocumentParsingError(f"Unsupported pipeline profile: {profile}")
+
+        if Path(file_name).suffix.lower() != '.pdf':
+            return 'standard'
+        if profile != 'auto':
+            return profile
+
+        probe_source = source
+        if isinstance(source, UploadedFile):
+            probe_source = source.path or source.get_stream()
+
+        try:
+            probe = probe_text_layer(probe_source, page_range)
+        except PdfProbeError as e:
+            logger.warning(f"Text layer probe failed for {file_name}: {e}")
+            return 'standard'
+
+        logger.info(
+            f"Text layer on {probe['pages_with_text']}/{probe['pages_sampled']} "
+            f"sampled pages of {file_name}"
+        )
+        return 'digital' if probe['has_text_layer'] else 'standard'
+
+    def _get_document_key(
+        self,
+        file_path: str,
+        page_range: Optional[PageRange] = None,
+        content_hash: Optional[str] = None,
+        profile: PipelineProfile = 'standard',
+    ) -> Optional[str]:
+        """
+        Get the key of a conversion for the parse cache and document store.
+
+        None when neither the cache nor the store is on, so files are only
+        hashed when the key is used; see get_document_key.
+        """
+        if not self.cache and not self.store:
+            return None
+        return self.get_document_key(file_path, page_range, content_hash, profile)
+
+    def get_document_key(
+        self,
+        file_path: str,
+        page_range: Optional[PageRange] = None,
+        content_hash: Optional[str] = None,
+        profile: PipelineProfile = 'standard',
+    ) -> str:
+        """
+        Get the content-addressed key of a conversion.
+
+        The key identifies the file's bytes and every conversion option:
+        pipeline profile and its configuration, page range and image
+        preprocessing. It is the parse cache key and the document store id.
+        The file is only hashed when its content hash isn't already known.
+
+        Args:
+            file_path: Path or name of the document file
+            page_range: Optional 1-based, inclusive (first, last) page range
+            content_hash: SHA-256 of the file, when already known
+            profile: Pipeline profile the document was converted with
+
+        Returns:
+            Hex-encoded conversion key
+        """
+        config_fingerprint = self.config_fingerprints[profile]
+        if page_range:
+            config_fingerprint += f":pages={page_range[0]}-{page_range[1]}"
+        if self._is_preprocessed_image(file_path):
+            config_fingerprint += f":{self.image_preprocessor.fingerprint}"
+
+        return ParseCache.make_key(
+            content_hash or ParseCache.hash_file(file_path), config_fingerprint
+        )
+
+    def _cache_key(self, document_key: Optional[str]) -> Optional[str]:
+        """Get the parse cache key of a conversion, or None when caching is off."""
+        return document_key if self.cache else None
+
+    def _load_cached_document(self, cache_key: Optional[str]):
+        """Load a converted document and its conversion info from the cache."""
+        if not cache_key:
+            return None
+
+        payload = self.cache.get(cache_key)
+        metrics.record_cache_lookup('parse', bool(payload))
+        if not payload:
+            return None
+
+        logger.info(f"Parse cache hit for {cache_key}")
+        return self._from_payload(payload)
+
+    def _store_cached_document(
+        self, cache_key: Optional[str], payload: Dict[str, Any]
+    ) -> None:
+        """Store a converted document payload in the parse cache."""
+        if cache_key:
+            self.cache.put(cache_key, payload)
+
+    @staticmethod
+    def _from_payload(payload: Dict[str, Any]):
+        """Split a serialized conversion into the document and its info."""
+        from docling_core.types.doc import DoclingDocument
+
+        document = DoclingDocument.model_validate(payload['document'])
+        conversion_info = {
+            key: value for key, value in payload.items() if key != 'document'
+        }
+        return document, conversion_info
+
+    def _build_parsed_document(
+        self,
+        file_path: str,
+        document,
+        output_format: OutputFormat,
+        cache_hit: bool,
+        conversion_info: Optional[Dict[str, Any]] = None,
+        cache_key: Optional[str] = None,
+        file_size: Optional[int] = None,
+        profile: PipelineProfile = 'standard',
+        document_key: Optional[str] = None,
+    ) -> ParsedDocument:
+        """
+        Wrap a converted document and its metadata in a ParsedDocument.
+
+        When the document store is on, the document's elements are stored
+        under an id derived from ``document_key`` and the id is reported as
+        ``document_id`` in the metadata.
+        """
+        conversion_info = conversion_info or {}
+        pages_converted = len(document.pages) if hasattr(document, 'pages') else None
+
+        metadata = {
+            'title': (getattr(document, 'title', None) or Path(file_path).stem),
+            'page_count': conversion_info.get('page_count') or pages_converted,
+            'file_size': (
+                file_size if file_size is not None else os.path.getsize(file_path)
+            ),
+            'file_type': Path(file_path).suffix.lower(),
+            'tables_count': self._count_tables(document),
+            'images_count': self._count_images(document),
+            'output_format': output_format,
+            'profile': profile,
+            'cache_hit': cache_hit,
+        }
+
+        if conversion_info.get('page_range'):
+            metadata['page_range'] = conversion_info['page_range']
+            metadata['pages_converted'] = pages_converted
+
+        if conversion_info.get('preprocessing'):
+            metadata['preprocessing'] = conversion_info['preprocessing']
+
+        if self.store and document_key:
+            # Conversions of the same bytes and options share an id
+            document_id = document_key[:32]
+            stored_metadata = {
+                key: value
+                for key, value in metadata.items()
+                if key not in ('output_format', 'cache_hit')
+            }
+            if self.store.put(document_id, document, stored_metadata):
+                metadata['document_id'] = document_id
+
+        return ParsedDocument(
+            document,
+            metadata,
+            output_format,
+            self._export_document_content,
+            cache_key,
+            self._stream_document_content,
+        )
+
+    def _convert(
+        self,
+        source: Union[str, UploadedFile],
+        page_range: Optional[PageRange] = None,
+        profile: PipelineProfile = 'standard',
+    ):
+        """
+        Convert a document, enforcing the timeout when the sandbox is enabled.
+
+        Args:
+            source: Path to the document file, or an uploaded file
+            page_range: Optional 1-based, inclusive (first, last) page range
+            profile: Pipeline profile whose converter is used
+
+        Returns:
+            Tuple of (converted Docling document, conversion info)
+
+        Raises:
+            ConversionTimeoutError: If the conversion exceeds the timeout
+            ConversionCrashedError: If the conversion process dies
+            DocumentParsingError: If the conversion fails
+        """
+        if not self.use_sandbox:
+            with tracing.sample_stage('conversion'):
+                return self._run_converter(source, page_range, profile)
+
+        self._warm_up_for_sandbox(profile, [self._source_name(source)])
+        if self._is_preprocessed_image(self._source_name(source)):
+            return self._convert_image(source, page_range, profile)
+
+        try:
+            # The forked child inherits in-memory uploads and loaded models
+            # without copying them
+            payload = run_in_sandbox(
+                self._convert_to_payload,
+                (source, page_range, profile),
+                self.timeout,
+                fork_lock=self._warm_up_lock,
+            )
+        except SandboxTimeoutError:
+            logger.error(
+                f"Conversion of {self._source_name(source)} timed out after "
+                f"{self.timeout}s"
+            )
+            raise ConversionTimeoutError(
+                f"Conversion exceeded the {self.timeout}s timeout"
+            )
+        except SandboxCrashError as e:
+            logger.error(
+                f"Conversion process crashed for {self._source_name(source)}: {e}"
+            )
+            raise ConversionCrashedError(f"Conversion process crashed: {e}")
+
+        tracing.add_stacks('conversion', payload.pop('profile', None))
+        return self._from_payload(payload)
+
+    @staticmethod
+    def _source_name(source: Union[str, UploadedFile]) -> str:
+        """Name of a document source for log messages."""
+        return source.filename if isinstance(source, UploadedFile) else source
+
+    @staticmethod
+    def _source_hash(source: Union[str, UploadedFile]) -> Optional[str]:
+        """Content hash of a source when already known, None for paths."""
+        return source.content_hash if isinstance(source, UploadedFile) else None
+
+    @staticmethod
+    def _source_size(source: Union[str, UploadedFile]) -> int:
+        """Size of a document source in bytes."""
+        if isinstance(source, UploadedFile):
+            return source.size
+        return os.path.getsize(source)
+
+    @staticmethod
+    def _to_converter_input(source: Union[str, UploadedFile]):
+        """Get what Docling converts for a source: a path or a byte stream."""
+        from docling.datamodel.base_models import DocumentStream
+
+        if not isinstance(source, UploadedFile):
+            return source
+        if source.path:
+            return source.path
+        return DocumentStream(name=source.filename, stream=source.get_stream())
+
+    def _run_converter(
+        self,
+        source: Union[str, UploadedFile],
+        page_range: Optional[PageRange] = None,
+        profile: PipelineProfile = 'standard',
+    ):
+        """Run the Docling converter of a profile in the current process."""
+        if self._is_preprocessed_image(self._source_name(source)):
+            return self._run_image_converter(source, page_range, profile)
+
+        convert_options = {'page_range': page_range} if page_range else {}
+        result = self.converters[profile].convert(
+            self._to_converter_input(source), **convert_options
+        )
+
+        if not result or not result.document:
+            raise DocumentParsingError("No content extracted from document")
+
+        return result.document, self._get_conversion_info(result, page_range)
+
+    def _is_preprocessed_image(self, file_name: str) -> bool:
+        """Whether a file goes through image preprocessing before conversion."""
+        return self.image_preprocessor is not None and self.image_preprocessor.is_image(
+            file_name
+        )
+
+    def _run_image_converter(
+        self,
+        source: Union[str, UploadedFile],
+        page_range: Optional[PageRange] = None,
+        profile: PipelineProfile = 'standard',
+    ):
+        """
+        Preprocess an image, convert its pages one by one and merge them.
+
+        Used when conversions run in the current process, which shares one
+        converter and so converts pages in turn; sandboxed conversions fan
+        the pages out to child processes instead, see _convert_image.
+        """
+        preprocessed = self._preprocess_image(source, page_range)
+        stem = Path(self._source_name(source)).stem
+        converter = self.converters[profile]
+
+        started_at = time.perf_counter()
+        documents = [
+            self._convert_image_page(converter, stem, page_number, page)
+            for page_number, page in self._number_image_pages(
+                preprocessed, page_range
+            ).items()
+        ]
+        return self._merge_image_pages(
+            stem, documents, preprocessed, page_range, started_at, 1
+        )
+
+    def _convert_image(
+        self,
+        source: Union[str, UploadedFile],
+        page_range: Optional[PageRange] = None,
+        profile: PipelineProfile = 'standard',
+    ):
+        """
+        Preprocess an image and convert its pages in parallel sandboxes.
+
+        Pages are preprocessed here and split across up to
+        ``image_page_parallelism`` forked children, each with its own copy of
+        the warm converter, so no converter is ever used by two threads. The
+        timeout applies to each page.
+
+        Raises:
+            ConversionTimeoutError: If a page exceeds the timeout
+            ConversionCrashedError: If a conversion process dies
+            DocumentParsingError: If a page fails to convert
+        """
+        from docling_core.types.doc import DoclingDocument
+
+        preprocessed = self._preprocess_image(source, page_range)
+        stem = Path(self._source_name(source)).stem
+        pages = self._number_image_pages(preprocessed, page_range)
+
+        started_at = time.perf_counter()
+        shard_count = min(self.image_page_parallelism, len(pages))
+        page_numbers = list(pages)
+        shards = [page_numbers[i::shard_count] for i in range(shard_count)]
+        results = iter_in_sandboxes(
+            partial(self._convert_image_pages_to_payloads, stem, pages, profile),
+            shards,
+            self.timeout,
+            fork_lock=self._warm_up_lock,
+        )
+
+        documents = {}
+        for page_number, payload, error in results:
+            if isinstance(error, SandboxTimeoutError):
+                logger.error(
+                    f"Conversion of page {page_number} of "
+                    f"{self._source_name(source)} timed out after {self.timeout}s"
+                )
+                raise ConversionTimeoutError(
+                    f"Conversion of image page {page_number} exceeded the "
+                    f"{self.timeout}s timeout"
+                )
+            if isinstance(error, SandboxCrashError):
+                raise ConversionCrashedError(f"Conversion process crashed: {error}")
+            if error is not None:
+                raise DocumentParsingError(str(error))
+            documents[page_number] = DoclingDocument.model_validate(payload)
+
+        return self._merge_image_pages(
+            stem,
+            [documents[page_number] for page_number in page_numbers],
+            preprocessed,
+            page_range,
+            started_at,
+            shard_count,
+        )
+
+    def _preprocess_image(
+        self,
+        source: Union[str, UploadedFile],
+        page_range: Optional[PageRange] = None,
+    ):
+        """Bound the resolution of an image and split it into pages."""
+        image_input = source
+        if isinstance(source, UploadedFile):
+            image_input = source.path or source.get_stream()
+        return self.image_preprocessor.preprocess(image_input, page_range)
+
+    @staticmethod
+    def _number_image_pages(
+        preprocessed, page_range: Optional[PageRange] = None
+    ) -> Dict[int, bytes]:
+        """Map the 1-based page numbers of preprocessed pages to their bytes."""
+        first_page = page_range[0] if page_range else 1
+        return {
+            first_page + index: page for index, page in enumerate(preprocessed.pages)
+        }
+
+    @staticmethod
+    def _convert_image_page(converter, stem: str, page_number: int, page: bytes):
+        """Convert one preprocessed image page to a Docling document."""
+        from docling.datamodel.base_models import DocumentStream
+
+        result = converter.convert(
+            DocumentStream(name=f"{stem}-{page_number}.png", stream=io.BytesIO(page))
+        )
+        if not result or not result.document:
+            raise DocumentParsingError(
+                f"No content extracted from image page {page_number}"
+            )
+        return result.document
+
+    def _convert_image_pages_to_payloads(
+        self,
+        stem: str,
+        pages: Dict[int, bytes],
+        profile: PipelineProfile,
+        page_numbers: List[int],
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Convert a shard of image pages, yielding each as a picklable dict."""
+        converter = self.converters[profile]
+        for page_number in page_numbers:
+            document = self._convert_image_page(
+                converter, stem, page_number, pages[page_number]
+            )
+            yield page_number, document.export_to_dict()
+
+    @staticmethod
+    def _merge_image_pages(
+        stem: str,
+        documents: List[Any],
+        preprocessed,
+        page_range: Optional[PageRange],
+        started_at: float,
+        parallelism: int,
+    ):
+        """Concatenate converted image pages and collect the conversion info."""
+        from docling_core.types.doc import DoclingDocument
+
+        if len(documents) == 1:
+            document = documents[0]
+        else:
+            document = DoclingDocument.concatenate(documents)
+        document.name = stem
+
+        preprocessing = preprocessed.info
+        preprocessing['timings']['convert_seconds'] = round(
+            time.perf_counter() - started_at, 4
+        )
+        preprocessing['parallelism'] = parallelism
+
+        return document, {
+            'page_count': preprocessed.page_count,
+            'page_range': list(page_range) if page_range else None,
+            'preprocessing': preprocessing,
+        }
+
+    @staticmethod
+    def _get_conversion_info(
+        result, page_range: Optional[PageRange] = None
+    ) -> Dict[str, Any]:
+        """Collect facts about a conversion that the document doesn't record."""
+        return {
+            'page_count': getattr(result.input, 'page_count', None) or None,
+            'page_range': list(page_range) if page_range else None,
+        }
+
+    def _convert_to_payload(
+        self,
+        source: Union[str, UploadedFile],
+        page_range: Optional[PageRange] = None,
+        profile: PipelineProfile = 'standard',
+    ) -> Dict[str, Any]:
+        """
+        Run the converter and return the conversion in picklable form.
+
+        When the request is profiled, the stacks sampled in the sandbox are
+        returned under 'profile'.
+        """
+        with tracing.sample_stage('conversion') as sampler:
+            document, conversion_info = self._run_converter(source, page_range, profile)
+
+        payload = {'document': document.export_to_dict(), **conversion_info}
+        if sampler is not None:
+            payload['profile'] = {
+                'stacks': dict(sampler.stacks),
+                'samples': sampler.samples,
+            }
+        return payload
+
+    def _convert_batch_to_payloads(
+        self, sources: List[Union[str, UploadedFile]], indices: List[int]
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Convert documents with Docling's bulk converter.
+
+        Args:
+            sources: Every source of the batch
+            indices: Positions in ``sources`` of the documents to convert
+
+        Yields:
+            Tuples of (index, payload) where the payload holds either the
+            converted document or the conversion error
+        """
+        from docling.datamodel.base_models import ConversionStatus
+
+        # Images are preprocessed and converted page by page instead
+        for index in indices:
+            if self._is_preprocessed_image(self._source_name(sources[index])):
+                try:
+                    yield index, self._convert_to_payload(sources[index])
+                except Exception as e:
+                    yield index, {'error': str(e)}
+
+        indices = [
+            index
+            for index in indices
+            if not self._is_preprocessed_image(self._source_name(sources[index]))
+        ]
+        if not indices:
+            return
+
+        results = self.converter.convert_all(
+            [self._to_converter_input(sources[index]) for index in indices],
+            raises_on_error=False,
+        )
+        for index, result in zip(indices, results):
+            if (
+                result.status
+                in (ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS)
+                and result.document
+            ):
+                yield index, {
+                    'document': result.document.export_to_dict(),
+                    **self._get_conversion_info(result),
+                }
+            else:
+                errors = '; '.join(error.error_message for error in result.errors)
+                yield index, {
+                    'error': errors or f"Conversion finished with {result.status}"
+                }
+
     def _export_document_content(self, document, output_format: OutputFormat) -> str:
         """
         Export document content in the specified format.
@@ -119,6 +1341,9 @@ class DocumentParser:
         Returns:
             String representation of the document in the specified format
         """
+        from docling_core.transforms.serializer.html import HTMLDocSerializer
+        from docling_core.transforms.serializer.markdown import MarkdownDocSerializer
+
         try:
             if output_format == "markdown":
                 # Use MarkdownDocSerializer for better control
@@ -126,16 +1351,13 @@ class DocumentParser:
                 return serializer.serialize().text
 
             elif output_format == "json":
-                # Export to dictionary and convert to JSON
-                doc_dict = document.export_to_dict()
-                return json.dumps(doc_dict, indent=2, ensure_ascii=False)
+                # Export to dictionary and encode as compact JSON
+                return json_codec.dumps(document.export_to_dict())
 
             elif output_format == "text":
                 # Extract plain text by getting markdown and stripping
                 markdown_content = document.export_to_markdown()
                 # Simple text extraction - you could make this more sophisticated
-                import re
-
                 text_content = re.sub(r'[#*`_\[\]()]', '', markdown_content)
                 text_content = re.sub(r'\n+', '\n', text_content)
                 return text_content.strip()
@@ -156,6 +1378,92 @@ class DocumentParser:
                 f"Failed to export document in {output_format} format: {e}"
             )
 
+    def _stream_document_content(
+        self, document, output_format: OutputFormat
+    ) -> Iterator[str]:
+        """
+        Render a document in the specified format one element at a time.
+
+        Walks the document body like the Docling serializers do, serializing
+        each element (a heading, paragraph, list or table) as it is reached.
+        Joined, the parts match _export_document_content, except that the
+        json format is NDJSON with one element per line.
+
+        Args:
+            document: The parsed Docling document
+            output_format: Desired output format
+
+        Yields:
+            Consecutive parts of the rendered document
+        """
+        from docling_core.transforms.serializer.base import SerializationResult
+        from docling_core.transforms.serializer.html import HTMLDocSerializer
+        from docling_core.transforms.serializer.markdown import MarkdownDocSerializer
+        from docling_core.types.doc import GroupItem
+
+        if output_format == "json":
+            for item, level in document.iterate_items(with_groups=True):
+                element = item.model_dump(mode='json', by_alias=True, exclude_none=True)
+                yield json_codec.dumps({'level': level, **element}) + '\n'
+            return
+
+        if output_format not in ("markdown", "text", "html"):
+            raise DocumentParsingError(f"Unsupported output format: {output_format}")
+
+        if output_format == "html":
+            serializer = HTMLDocSerializer(doc=document)
+            delimiter = "\n"
+        else:
+            serializer = MarkdownDocSerializer(doc=document)
+            delimiter = "\n" if output_format == "text" else "\n\n"
+
+        # Render the document wrapper (the HTML head and body tags) around a
+        # placeholder part, and stream the elements in its place
+        placeholder = f"@@{uuid.uuid4().hex}@@"
+        shell = serializer.serialize_doc(
+            parts=[SerializationResult(text=placeholder)]
+        ).text
+        head, _, tail = shell.partition(placeholder)
+
+        if head and output_format != "text":
+            yield head
+
+        params = serializer.params
+        visited = {document.body.self_ref}
+        # Each part is held back until the next one arrives, so that the plain
+        # text rendering can be stripped at both ends like a whole export
+        pending = None
+        for item, level in document.iterate_items(
+            with_groups=True,
+            included_content_layers=params.layers,
+            traverse_pictures=params.traverse_pictures,
+        ):
+            if item.self_ref in visited:
+                continue
+            # Plain groups (such as sections) are joined like the document
+            # body, so their children are streamed one by one instead
+            if type(item) is GroupItem and not getattr(item, 'meta', None):
+                continue
+            visited.add(item.self_ref)
+
+            text = serializer.serialize(item=item, visited=visited, level=level).text
+            if output_format == "text":
+                text = re.sub(r'[#*`_\[\]()]', '', text)
+                text = re.sub(r'\n+', '\n', text).strip('\n')
+            if not text:
+                continue
+
+            if pending is None:
+                pending = text.lstrip() if output_format == "text" else text
+            else:
+                yield pending
+                pending = delimiter + text
+
+        if pending is not None:
+            yield pending.rstrip() if output_format == "text" else pending
+        if tail and output_format != "text":
+            yield tail
+
     def get_supported_formats(self) -> list[OutputFormat]:
         """
         Get list of supported output formats.
@@ -163,31 +1471,15 @@ class DocumentParser:
         Returns:
             List of supported output format strings
         """
-        return ["markdown", "json", "text", "html"]
+        return list(SUPPORTED_OUTPUT_FORMATS)
 
     def _count_tables(self, document) -> int:
         """Count tables in the document."""
-        try:
-            count = 0
-            if hasattr(document, 'pages'):
-                for page in document.pages:
-                    if hasattr(page, 'tables'):
-                        count += len(page.tables)
-            return count
-        except Exception:
-            return 0
+        return len(getattr(document, 'tables', None) or [])
 
     def _count_images(self, document) -> int:
         """Count images in the document."""
-        try:
-            count = 0
-            if hasattr(document, 'pages'):
-                for page in document.pages:
-                    if hasattr(page, 'images'):
-                        count += len(page.images)
-            return count
-        except Exception:
-            return 0
+        return len(getattr(document, 'pictures', None) or [])
 
     def is_supported_format(self, file_path: str) -> bool:
         """
@@ -0,0 +1,377 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Docling item labels grouped into the element kinds served by the store
+ELEMENT_KINDS = {
+    'title': 'heading',
+    'section_header': 'heading',
+    'text': 'paragraph',
+    'paragraph': 'paragraph',
+    'reference': 'paragraph',
+    'list_item': 'list_item',
+    'table': 'table',
+    'document_index': 'table',
+    'picture': 'picture',
+    'chart': 'picture',
+    'caption': 'caption',
+    'footnote': 'footnote',
+    'formula': 'formula',
+    'code': 'code',
+    'page_header': 'furniture',
+    'page_footer': 'furniture',
+}
+ELEMENT_KIND_CHOICES = sorted(set(ELEMENT_KINDS.values()) | {'other'})
+
+
+class DocumentStoreError(Exception):
+    """Custom exception for document store errors."""
+
+    pass
+
+
+def extract_elements(document) -> List[Dict[str, Any]]:
+    """
+    Flatten a converted document into element rows, in reading order.
+
+    Args:
+        document: The converted Docling document
+
+    Returns:
+        One dictionary per element with its ``ref``, ``kind``, ``label``,
+        heading ``level``, first ``page``, ``bbox``, ``text`` and, for tables,
+        ``data`` holding the cell texts row by row
+    """
+    from docling_core.types.doc import ContentLayer
+
+    elements = []
+    # Page headers and footers live in the furniture layer
+    for item, _ in document.iterate_items(
+        included_content_layers={ContentLayer.BODY, ContentLayer.FURNITURE}
+    ):
+        label = str(getattr(item.label, 'value', item.label))
+        kind = ELEMENT_KINDS.get(label, 'other')
+        prov = item.prov[0] if getattr(item, 'prov', None) else None
+
+        level = None
+        if label == 'title':
+            level = 0
+        elif label == 'section_header':
+            level = getattr(item, 'level', 1)
+
+        data = None
+        if kind == 'table':
+            text = item.export_to_markdown(doc=document)
+            data = [[cell.text for cell in row] for row in item.data.grid]
+        elif kind == 'picture':
+            text = item.caption_text(document)
+        else:
+            text = getattr(item, 'text', '')
+
+        elements.append(
+            {
+                'ref': item.self_ref,
+                'kind': kind,
+                'label': label,
+                'level': level,
+                'page': prov.page_no if prov else None,
+                'bbox': list(prov.bbox.as_tuple()) if prov else None,
+                'text': text,
+                'data': data,
+            }
+        )
+    return elements
+
+
+class DocumentStore:
+    """
+    Persistent store of converted documents as indexed element rows.
+
+    Each document is kept as one row per heading, paragraph, table, picture
+    and other element, with its page, so an outline, a page or every table
+    of a document can be read back without converting it again. The store is
+    a SQLite database shared by every worker process; the least recently
+    used documents are removed beyond ``max_documents``.
+    """
+
+    def __init__(self, db_path: str, max_documents: int = 1000):
+        """
+        Initialize the document store.
+
+        Args:
+            db_path: Path of the SQLite database file
+            max_documents: Maximum number of documents kept
+        """
+        self.db_path = db_path
+        self.max_documents = max_documents
+
+        try:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+
+            with self._connect() as conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS documents ('
+                    'id TEXT PRIMARY KEY, '
+                    'metadata TEXT NOT NULL, '
+                    'created_at REAL NOT NULL, '
+                    'accessed_at REAL NOT NULL)'
+                )
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS elements ('
+                    'document_id TEXT NOT NULL '
+                    'REFERENCES documents (id) ON DELETE CASCADE, '
+                    'seq INTEGER NOT NULL, '
+                    'ref TEXT NOT NULL, '
+                    'kind TEXT NOT NULL, '
+                    'label TEXT NOT NULL, '
+                    'level INTEGER, '
+                    'page INTEGER, '
+                    'bbox TEXT, '
+                    'text TEXT NOT NULL, '
+                    'data TEXT, '
+                    'PRIMARY KEY (document_id, seq))'
+                )
+                conn.execute(
+                    'CREATE INDEX IF NOT EXISTS elements_kind '
+                    'ON elements (document_id, kind, seq)'
+                )
+                conn.execute(
+                    'CREATE INDEX IF NOT EXISTS elements_page '
+                    'ON elements (document_id, page, seq)'
+                )
+                conn.execute(
+                    'CREATE INDEX IF NOT EXISTS documents_accessed_at '
+                    'ON documents (accessed_at)'
+                )
+        except (OSError, sqlite3.Error) as e:
+            raise DocumentStoreError(f"Failed to open document store: {e}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open an autocommit connection to the store database."""
+        conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA foreign_keys=ON')
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def put(self, document_id: str, document, metadata: Dict[str, Any]) -> bool:
+        """
+        Store a converted document, unless it is stored already.
+
+        Args:
+            document_id: Id of the document
+            document: The converted Docling document
+            metadata: Metadata describing the source file and document
+
+        Returns:
+            True if the document is in the store, False if storing failed
+        """
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                touched = conn.execute(
+                    'UPDATE documents SET accessed_at = ? WHERE id = ?',
+                    (now, document_id),
+                ).rowcount
+                if touched:
+                    return True
+
+            rows = [
+                (
+                    document_id,
+                    seq,
+                    element['ref'],
+                    element['kind'],
+                    element['label'],
+                    element['level'],
+                    element['page'],
+                    json.dumps(element['bbox']) if element['bbox'] else None,
+                    element['text'],
+                    json.dumps(element['data']) if element['data'] else None,
+                )
+                for seq, element in enumerate(extract_elements(document))
+            ]
+
+            with self._connect() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                # Another process may have stored it while the rows were built
+                if conn.execute(
+                    'SELECT 1 FROM documents WHERE id = ?', (document_id,)
+                ).fetchone():
+                    conn.execute('COMMIT')
+                    return True
+
+                conn.execute(
+                    'INSERT INTO documents '
+                    '(id, metadata, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                    (document_id, json.dumps(metadata), now, now),
+                )
+                conn.executemany(
+                    'INSERT INTO elements VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+                )
+                conn.execute(
+                    'DELETE FROM documents WHERE id IN ('
+                    'SELECT id FROM documents ORDER BY accessed_at DESC '
+                    'LIMIT -1 OFFSET ?)',
+                    (self.max_documents,),
+                )
+                conn.execute('COMMIT')
+            return True
+
+        except (AttributeError, TypeError, ValueError, sqlite3.Error) as e:
+            logger.error(f"Failed to store document {document_id}: {e}")
+            return False
+
+    def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a stored document's metadata and element counts.
+
+        Args:
+            document_id: Id of the document
+
+        Returns:
+            Dictionary with ``id``, ``metadata``, ``stored_at``, ``pages`` (the
+            pages holding elements) and ``elements`` (counts by kind), or
+            None if the document isn't stored
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT metadata, created_at FROM documents WHERE id = ?',
+                (document_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                'UPDATE documents SET accessed_at = ? WHERE id = ?',
+                (time.time(), document_id),
+            )
+            counts = conn.execute(
+                'SELECT kind, COUNT(*) FROM elements WHERE document_id = ? '
+                'GROUP BY kind',
+                (document_id,),
+            ).fetchall()
+            pages = conn.execute(
+                'SELECT DISTINCT page FROM elements '
+                'WHERE document_id = ? AND page IS NOT NULL ORDER BY page',
+                (document_id,),
+            ).fetchall()
+
+        return {
+            'id': document_id,
+            'metadata': json.loads(row['metadata']),
+            'stored_at': row['created_at'],
+            'pages': [page[0] for page in pages],
+            'elements': {kind: count for kind, count in counts},
+        }
+
+    def get_outline(self, document_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the headings of a stored document, in reading order.
+
+        Returns:
+            Heading elements, or None if the document isn't stored
+        """
+        return self.get_elements(document_id, kind='heading')
+
+    def get_elements(
+        self,
+        document_id: str,
+        kind: Optional[str] = None,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get elements of a stored document, in reading order.
+
+        Args:
+            document_id: Id of the document
+            kind: Only return elements of this kind (see ELEMENT_KIND_CHOICES)
+            page: Only return elements on this page
+            limit: Maximum number of elements returned
+            offset: Number of matching elements skipped
+
+        Returns:
+            Matching elements, or None if the document isn't stored
+        """
+        query = (
+            'SELECT seq, ref, kind, label, level, page, bbox, text, data '
+            'FROM elements WHERE document_id = ?'
+        )
+        params: List[Any] = [document_id]
+        if kind is not None:
+            query += ' AND kind = ?'
+            params.append(kind)
+        if page is not None:
+            query += ' AND page = ?'
+            params.append(page)
+        query += ' ORDER BY seq LIMIT ? OFFSET ?'
+        params += [limit if limit is not None else -1, offset]
+
+        with self._connect() as conn:
+            if not conn.execute(
+                'SELECT 1 FROM documents WHERE id = ?', (document_id,)
+            ).fetchone():
+                return None
+            rows = conn.execute(query, params).fetchall()
+
+        return [
+            {
+                'index': row['seq'],
+                'ref': row['ref'],
+                'kind': row['kind'],
+                'label': row['label'],
+                'level': row['level'],
+                'page': row['page'],
+                'bbox': json.loads(row['bbox']) if row['bbox'] else None,
+                'text': row['text'],
+                **({'data': json.loads(row['data'])} if row['data'] else {}),
+            }
+            for row in rows
+        ]
+
+    def delete(self, document_id: str) -> bool:
+        """
+        Remove a document and its elements.
+
+        Returns:
+            True if the document was stored
+        """
+        with self._connect() as conn:
+            return bool(
+                conn.execute(
+                    'DELETE FROM documents WHERE id = ?', (document_id,)
+                ).rowcount
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with document and element counts
+        """
+        try:
+            with self._connect() as conn:
+                documents = conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+                elements = conn.execute('SELECT COUNT(*) FROM elements').fetchone()[0]
+        except sqlite3.Error:
+            documents = elements = None
+
+        return {
+            'documents': documents,
+            'elements': elements,
+            'max_documents': self.max_documents,
+        }
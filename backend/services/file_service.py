@@ -1,14 +1,68 @@
+import io
 import os
 import uuid
+import hashlib
 import logging
-from typing import Optional, Tuple
+import tempfile
+import time
+from typing import Optional, Tuple, Union
 from pathlib import Path
+from flask import Request
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 from config.settings import Config
+from services import metrics
 
 logger = logging.getLogger(__name__)
 
+# Magic numbers of the supported upload types
+FILE_SIGNATURES = [
+    (b'%PDF-', 'pdf'),
+    (b'PK\x03\x04', 'zip'),  # Office Open XML (docx, pptx)
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+]
+
+# Content type expected for each allowed extension
+EXTENSION_TYPES = {
+    'pdf': 'pdf',
+    'docx': 'zip',
+    'pptx': 'zip',
+    'png': 'png',
+    'jpg': 'jpeg',
+    'jpeg': 'jpeg',
+    'gif': 'gif',
+    'tiff': 'tiff',
+}
+
+# Bytes kept from the start of an upload for type sniffing
+SNIFF_HEADER_BYTES = 16
+
+
+def sniff_file_type(header: bytes) -> Optional[str]:
+    """
+    Detect a file type from its first bytes.
+
+    Args:
+        header: Leading bytes of the file
+
+    Returns:
+        Detected type (one of EXTENSION_TYPES' values), or None if unknown
+    """
+    for signature, file_type in FILE_SIGNATURES:
+        if header.startswith(signature):
+            return file_type
+    return None
+
+
+def spool_suffix(filename: Optional[str]) -> str:
+    """Get the extension given to the spool file of an upload."""
+    return os.path.splitext(secure_filename(filename or ''))[1].lower()
+
 
 class FileServiceError(Exception):
     """Custom exception for file service errors."""
@@ -16,6 +70,183 @@ class FileServiceError(Exception):
     pass
 
 
+class UploadSpool:
+    """
+    Upload buffer that hashes, measures and sniffs bytes as they arrive.
+
+    Bytes are kept in memory up to ``max_size`` and spooled to a named
+    temporary file beyond it, which is removed when the spool is closed.
+    Size, SHA-256 and the leading bytes are computed by ``write`` itself, so
+    nothing has to re-read the upload afterwards.
+    """
+
+    def __init__(
+        self, max_size: int, spool_dir: Optional[str] = None, suffix: str = ''
+    ):
+        """
+        Initialize the upload spool.
+
+        Args:
+            max_size: Bytes kept in memory before spooling to disk
+            spool_dir: Directory of the spooled file
+            suffix: Extension of the spooled file, so converters that detect
+                    the format from the path see the upload's extension
+        """
+        self.max_size = max_size
+        self.spool_dir = spool_dir
+        self.suffix = suffix
+        self.size = 0
+        self.header = b''
+        self._digest = hashlib.sha256()
+        self._file = io.BytesIO()
+        self._rolled = False
+
+    @property
+    def content_hash(self) -> str:
+        """Hex-encoded SHA-256 of the bytes written so far."""
+        return self._digest.hexdigest()
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the spooled file, or None while the bytes are in memory."""
+        return self._file.name if self._rolled else None
+
+    def write(self, data: bytes) -> int:
+        """Append bytes, updating size, hash and header in the same pass."""
+        self._digest.update(data)
+        self.size += len(data)
+        if len(self.header) < SNIFF_HEADER_BYTES:
+            self.header += data[: SNIFF_HEADER_BYTES - len(self.header)]
+
+        if not self._rolled and self.size > self.max_size:
+            self._rollover()
+        return self._file.write(data)
+
+    def _rollover(self) -> None:
+        """Move the buffered bytes to a named temporary file."""
+        buffered = self._file
+        self._file = tempfile.NamedTemporaryFile(
+            mode='w+b', prefix='upload-', suffix=self.suffix, dir=self.spool_dir
+        )
+        self._file.write(buffered.getbuffer())
+        self._rolled = True
+        logger.info(f"Upload larger than {self.max_size} bytes spooled to disk")
+
+    def getbuffer_stream(self) -> Optional[io.BytesIO]:
+        """
+        Get a new stream over the in-memory bytes, None if spooled.
+
+        Every stream has its own position and can be closed by its reader
+        (Docling closes the streams it converts) without affecting the spool
+        or other streams. ``getvalue`` and a BytesIO built from bytes both
+        share the buffer until written to, so no bytes are copied.
+        """
+        if self._rolled:
+            return None
+        return io.BytesIO(self._file.getvalue())
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._file.readline(size)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self) -> None:
+        """Release the buffer, deleting the spooled file if any."""
+        self._file.close()
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class UploadRequest(Request):
+    """Request receiving uploaded files into UploadSpools."""
+
+    def _get_file_stream(
+        self,
+        total_content_length: Optional[int],
+        content_type: Optional[str],
+        filename: Optional[str] = None,
+        content_length: Optional[int] = None,
+    ) -> UploadSpool:
+        return UploadSpool(
+            Config.UPLOAD_SPOOL_MAX_BYTES,
+            spool_dir=Config.UPLOAD_FOLDER,
+            suffix=spool_suffix(filename),
+        )
+
+
+class UploadedFile:
+    """
+    Validated upload ready for parsing without touching the upload folder.
+
+    Small and medium uploads stay in memory; larger ones live in the spool
+    file written while the request was received.
+    """
+
+    def __init__(self, filename: str, spool: UploadSpool, file_type: str):
+        """
+        Initialize the uploaded file.
+
+        Args:
+            filename: Sanitized original file name
+            spool: Spool holding the uploaded bytes
+            file_type: Type detected from the file's magic number
+        """
+        self.filename = filename
+        self.file_type = file_type
+        self._spool = spool
+
+    @property
+    def size(self) -> int:
+        """Size of the upload in bytes."""
+        return self._spool.size
+
+    @property
+    def content_hash(self) -> str:
+        """Hex-encoded SHA-256 of the upload."""
+        return self._spool.content_hash
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the spooled upload, or None when it is held in memory."""
+        return self._spool.path
+
+    def get_stream(self) -> Optional[io.BytesIO]:
+        """
+        Get a new stream over the in-memory bytes, None when spooled to disk.
+
+        Streams are independent of each other, see UploadSpool.getbuffer_stream.
+        """
+        return self._spool.getbuffer_stream()
+
+    def close(self) -> None:
+        """Release the upload's memory or spool file."""
+        self._spool.close()
+
+
 class FileService:
     """Service for handling file uploads and management."""
 
@@ -44,12 +275,17 @@ class FileService:
         extension = filename.rsplit('.', 1)[1].lower()
         return extension in self.allowed_extensions
 
-    def validate_file(self, file: FileStorage) -> Tuple[bool, str]:
+    def validate_file(
+        self, file: Union[FileStorage, UploadedFile]
+    ) -> Tuple[bool, str]:
         """
         Validate uploaded file.
 
+        The size of uploads received into a spool is the one counted while
+        the bytes arrived; only other streams are measured by seeking.
+
         Args:
-            file: Uploaded file object
+            file: Uploaded file object, or an upload already received
 
         Returns:
             Tuple of (is_valid, error_message)
@@ -66,9 +302,14 @@ class FileService:
 
             # Check file size (Flask handles this automatically with MAX_CONTENT_LENGTH,
             # but we can add additional validation here)
-            file.seek(0, os.SEEK_END)
-            file_size = file.tell()
-            file.seek(0)  # Reset position
+            if isinstance(file, UploadedFile):
+                file_size = file.size
+            elif isinstance(file.stream, UploadSpool):
+                file_size = file.stream.size
+            else:
+                file.seek(0, os.SEEK_END)
+                file_size = file.tell()
+                file.seek(0)  # Reset position
 
             if file_size > self.max_file_size:
                 size_mb = self.max_file_size / (1024 * 1024)
@@ -83,6 +324,91 @@ class FileService:
             logger.error(f"File validation error: {e}")
             return False, f"File validation failed: {e}"
 
+    def receive_file(
+        self, file: FileStorage
+    ) -> Tuple[bool, str, Optional[UploadedFile]]:
+        """
+        Validate an upload and keep it in memory for parsing.
+
+        Size, hash and type are taken from the spool that received the
+        upload; uploads not received by an UploadRequest are copied into a
+        spool once.
+
+        Args:
+            file: Uploaded file object
+
+        Returns:
+            Tuple of (success, message, uploaded_file)
+        """
+        spool = None
+        started_at = time.perf_counter()
+        try:
+            if not file or not file.filename:
+                return False, "No file provided", None
+
+            if not self.is_allowed_file(file.filename):
+                allowed_exts = ', '.join(self.allowed_extensions)
+                return (
+                    False,
+                    f"File type not allowed. Supported types: {allowed_exts}",
+                    None,
+                )
+
+            spool = file.stream
+            if not isinstance(spool, UploadSpool):
+                spool = UploadSpool(
+                    Config.UPLOAD_SPOOL_MAX_BYTES,
+                    spool_dir=self.upload_folder,
+                    suffix=spool_suffix(file.filename),
+                )
+                for chunk in iter(lambda: file.stream.read(1024 * 1024), b''):
+                    spool.write(chunk)
+                    if spool.size > self.max_file_size:
+                        break
+
+            if spool.size > self.max_file_size:
+                size_mb = self.max_file_size / (1024 * 1024)
+                return False, f"File too large. Maximum size: {size_mb:.1f}MB", None
+
+            if spool.size == 0:
+                return False, "File is empty", None
+
+            extension = file.filename.rsplit('.', 1)[1].lower()
+            file_type = sniff_file_type(spool.header)
+            if file_type != EXTENSION_TYPES.get(extension):
+                return (
+                    False,
+                    f"File content does not match its .{extension} extension",
+                    None,
+                )
+
+            # Take ownership of the spool: Flask closes request files once the
+            # view returns, before streamed responses consume the upload
+            uploaded_file = UploadedFile(
+                secure_filename(file.filename), spool, file_type
+            )
+            file.stream = io.BytesIO()
+            spool = None
+
+            suffix = f".{extension}"
+            metrics.observe_stage('upload', time.perf_counter() - started_at, suffix)
+            metrics.record_bytes('in', uploaded_file.size, suffix)
+            logger.info(
+                f"File received: {uploaded_file.filename} ({uploaded_file.size} bytes, "
+                f"{'spooled to disk' if uploaded_file.path else 'in memory'})"
+            )
+            return True, "File uploaded successfully", uploaded_file
+
+        except Exception as e:
+            metrics.record_error('upload', type(e).__name__)
+            logger.error(f"File receive error: {e}")
+            return False, f"Failed to receive file: {e}", None
+
+        finally:
+            # Release rejected uploads right away
+            if spool is not None:
+                spool.close()
+
     def save_file(self, file: FileStorage) -> Tuple[bool, str, Optional[str]]:
         """
         Save uploaded file to disk.
@@ -93,6 +419,7 @@ class FileService:
         Returns:
             Tuple of (success, message, file_path)
         """
+        started_at = time.perf_counter()
         try:
             # Validate file first
             is_valid, error_msg = self.validate_file(file)
@@ -114,10 +441,14 @@ class FileService:
             if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
                 return False, "Failed to save file", None
 
+            file_type = file_extension.lower()
+            metrics.observe_stage('upload', time.perf_counter() - started_at, file_type)
+            metrics.record_bytes('in', os.path.getsize(file_path), file_type)
             logger.info(f"File saved successfully: {unique_filename}")
             return True, "File uploaded successfully", file_path
 
         except Exception as e:
+            metrics.record_error('upload', type(e).__name__)
             logger.error(f"File save error: {e}")
             return False, f"Failed to save file: {e}", None
 
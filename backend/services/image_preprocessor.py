@@ -0,0 +1,240 @@
+import io
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError as e:
+    raise ImportError(
+        "Pillow is not installed. Please install it with: pip install Pillow"
+    ) from e
+
+logger = logging.getLogger(__name__)
+
+# Bump when preprocessing changes so cached conversions are not reused
+PREPROCESSING_VERSION = 1
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.tif', '.tiff', '.bmp', '.webp'}
+
+# Long side of the page assumed for images that carry no DPI (US Letter)
+ASSUMED_PAGE_LONG_SIDE_INCHES = 11.0
+
+# Modes without colour information are kept as 8-bit grayscale
+GRAYSCALE_MODES = {'1', 'L', 'LA', 'I', 'I;16', 'I;16B', 'I;16L', 'F'}
+
+
+class ImagePreprocessingError(Exception):
+    """Custom exception for image preprocessing errors."""
+
+    pass
+
+
+class PreprocessedImage:
+    """Pages of an image upload, normalized and encoded as PNG."""
+
+    def __init__(self, pages: List[bytes], page_count: int, info: Dict[str, Any]):
+        """
+        Initialize the preprocessed image.
+
+        Args:
+            pages: PNG bytes of every selected page, in order
+            page_count: Total number of pages (frames) in the source image
+            info: Resolutions, sizes and timings of the preprocessing
+        """
+        self.pages = pages
+        self.page_count = page_count
+        self.info = info
+
+
+class ImagePreprocessor:
+    """
+    Bound the resolution of image uploads before OCR.
+
+    Scans are often stored at 600 DPI or more, which multiplies OCR time and
+    memory without improving recognition. Every page is downscaled to at most
+    ``max_dpi``, converted to 8-bit grayscale or RGB, and re-encoded as PNG.
+    Multi-page TIFF and GIF files are split into one image per page so the
+    pages can be converted independently.
+    """
+
+    def __init__(self, max_dpi: int = 300):
+        """
+        Initialize the image preprocessor.
+
+        Args:
+            max_dpi: Highest effective resolution kept, in dots per inch
+        """
+        self.max_dpi = max_dpi
+
+    @property
+    def fingerprint(self) -> str:
+        """Identify the preprocessing settings for use in cache keys."""
+        return f"image:v{PREPROCESSING_VERSION}:max_dpi={self.max_dpi}"
+
+    @staticmethod
+    def is_image(file_name: str) -> bool:
+        """Whether a file is an image handled by the preprocessor."""
+        return Path(file_name).suffix.lower() in IMAGE_EXTENSIONS
+
+    def preprocess(
+        self, source: Any, page_range: Optional[Tuple[int, int]] = None
+    ) -> PreprocessedImage:
+        """
+        Downscale, normalize and split an image into PNG pages.
+
+        Args:
+            source: Path or binary file object of the image
+            page_range: Optional 1-based, inclusive (first, last) page range
+
+        Returns:
+            PreprocessedImage with the selected pages
+
+        Raises:
+            ImagePreprocessingError: If the image can't be read or has no
+                page in the requested range
+        """
+        timings = {'decode_seconds': 0.0, 'resize_seconds': 0.0, 'encode_seconds': 0.0}
+        started_at = time.perf_counter()
+
+        try:
+            image = Image.open(source)
+        except Exception as e:
+            raise ImagePreprocessingError(f"Failed to open image: {e}")
+
+        try:
+            page_count = getattr(image, 'n_frames', 1)
+            first, last = page_range or (1, page_count)
+            selected = range(first - 1, min(last, page_count))
+            if not selected:
+                raise ImagePreprocessingError(
+                    f"Page range {first}-{last} is outside the image's "
+                    f"{page_count} page(s)"
+                )
+
+            pages = []
+            original_dpi = None
+            target_dpi = None
+            original_size = None
+            size = None
+            for index in selected:
+                page, page_info = self._preprocess_page(image, index, timings)
+                pages.append(page)
+                if original_dpi is None:
+                    original_dpi = page_info['original_dpi']
+                    target_dpi = page_info['target_dpi']
+                    original_size = page_info['original_size']
+                    size = page_info['size']
+
+        except ImagePreprocessingError:
+            raise
+
+        except Exception as e:
+            raise ImagePreprocessingError(f"Failed to preprocess image: {e}")
+
+        finally:
+            image.close()
+
+        timings = {key: round(value, 4) for key, value in timings.items()}
+        timings['total_seconds'] = round(time.perf_counter() - started_at, 4)
+
+        logger.info(
+            f"Preprocessed {len(pages)} image page(s) from {original_dpi} to "
+            f"{target_dpi} DPI in {timings['total_seconds']}s"
+        )
+        return PreprocessedImage(
+            pages,
+            page_count,
+            {
+                'pages': len(pages),
+                'original_dpi': original_dpi,
+                'target_dpi': target_dpi,
+                'original_size': original_size,
+                'size': size,
+                'timings': timings,
+            },
+        )
+
+    def _preprocess_page(
+        self, image, index: int, timings: Dict[str, float]
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """Downscale, normalize and encode one page, adding to the timings."""
+        started_at = time.perf_counter()
+        image.seek(index)
+        original_size = image.size
+        original_dpi = self._effective_dpi(image)
+        scale = min(1.0, self.max_dpi / original_dpi)
+        target_size = (
+            max(1, round(original_size[0] * scale)),
+            max(1, round(original_size[1] * scale)),
+        )
+        mode = 'L' if image.mode in GRAYSCALE_MODES else 'RGB'
+
+        # JPEG can decode straight at a reduced scale, skipping most of the work
+        if scale < 1.0 and image.format == 'JPEG':
+            image.draft(mode, target_size)
+
+        page = image.copy() if getattr(image, 'n_frames', 1) > 1 else image
+        page.load()
+        timings['decode_seconds'] += time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        page = self._normalize_mode(page, mode)
+        if page.size != target_size:
+            # Shrink by whole factors with a box filter before resampling the
+            # remainder: several times faster and indistinguishable for OCR
+            page = page.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=1.0)
+        timings['resize_seconds'] += time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        target_dpi = round(original_dpi * scale)
+        buffer = io.BytesIO()
+        page.save(buffer, format='PNG', compress_level=1, dpi=(target_dpi, target_dpi))
+        timings['encode_seconds'] += time.perf_counter() - started_at
+
+        return buffer.getvalue(), {
+            'original_dpi': round(original_dpi),
+            'target_dpi': target_dpi,
+            'original_size': list(original_size),
+            'size': list(target_size),
+        }
+
+    @staticmethod
+    def _effective_dpi(image) -> float:
+        """
+        Get the resolution of an image page.
+
+        Images without a usable DPI are assumed to be a scanned page whose
+        long side is ASSUMED_PAGE_LONG_SIDE_INCHES long.
+        """
+        dpi = image.info.get('dpi')
+        try:
+            dpi = float(max(dpi)) if dpi else 0.0
+        except (TypeError, ValueError):
+            dpi = 0.0
+
+        # Some writers store 1 or 72 DPI regardless of the scan resolution
+        if dpi <= 72:
+            dpi = max(image.size) / ASSUMED_PAGE_LONG_SIDE_INCHES
+
+        return max(dpi, 1.0)
+
+    @staticmethod
+    def _normalize_mode(image, mode: str):
+        """Convert a page to 8-bit grayscale or RGB, flattening transparency."""
+        if image.mode == mode:
+            return image
+
+        if image.mode in ('I', 'I;16', 'I;16B', 'I;16L', 'F'):
+            # Scale high bit depth samples down to 8 bits
+            return image.convert('I').point(lambda value: value / 256).convert('L')
+
+        if image.mode in ('RGBA', 'LA', 'PA') or (
+            image.mode == 'P' and 'transparency' in image.info
+        ):
+            rgba = image.convert('RGBA')
+            background = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+            return Image.alpha_composite(background, rgba).convert(mode)
+
+        return image.convert(mode)
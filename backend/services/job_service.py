@@ -0,0 +1,380 @@
+import os
+import re
+import json
+import time
+import uuid
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Dict, Any, List, Optional
+from config.settings import Config
+from services.document_parser import DocumentParser, PageRange
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Per-process state of conversion pool workers
+_worker_parser: Optional[DocumentParser] = None
+_worker_openai_service = None
+
+
+class JobServiceError(Exception):
+    """Custom exception for job service errors."""
+
+    pass
+
+
+class JobStore:
+    """
+    File-backed store of job records.
+
+    Each job is a JSON file in the jobs folder, so any web worker can report
+    the status of a job submitted through another one, and pool workers can
+    publish progress without going through their parent process.
+    """
+
+    def __init__(self, jobs_folder: str):
+        """
+        Initialize the job store.
+
+        Args:
+            jobs_folder: Directory where job records are stored
+        """
+        self.jobs_folder = jobs_folder
+        os.makedirs(self.jobs_folder, exist_ok=True)
+
+    def _job_path(self, job_id: str) -> str:
+        """Get the on-disk path of a job record."""
+        return os.path.join(self.jobs_folder, f"{job_id}.json")
+
+    def _write(self, job: Dict[str, Any]) -> None:
+        """Write a job record atomically."""
+        job_path = self._job_path(job['id'])
+        tmp_path = f"{job_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, job_path)
+
+    def create(self, **fields: Any) -> Dict[str, Any]:
+        """
+        Create a new queued job.
+
+        Args:
+            **fields: Additional fields stored on the job record
+
+        Returns:
+            The created job record
+        """
+        now = time.time()
+        job = {
+            'id': uuid.uuid4().hex,
+            'status': 'queued',
+            'stage': 'queued',
+            'progress': 0.0,
+            'created_at': now,
+            'updated_at': now,
+            'result': None,
+            'error': None,
+            **fields,
+        }
+        self._write(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job record.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            The job record, or None if it doesn't exist
+        """
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+
+        try:
+            with open(self._job_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def update(self, job_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """
+        Update fields of a job record.
+
+        Args:
+            job_id: Job identifier
+            **fields: Fields to update
+
+        Returns:
+            The updated job record, or None if it doesn't exist
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+
+        job.update(fields)
+        job['updated_at'] = time.time()
+        self._write(job)
+        return job
+
+    def cleanup_old_jobs(self, max_age_hours: int = 24) -> int:
+        """
+        Delete job records older than the given age.
+
+        Args:
+            max_age_hours: Maximum age of job records to keep in hours
+
+        Returns:
+            Number of job records deleted
+        """
+        current_time = time.time()
+        max_age_seconds = max_age_hours * 3600
+        deleted_count = 0
+
+        for filename in os.listdir(self.jobs_folder):
+            job_path = os.path.join(self.jobs_folder, filename)
+            try:
+                if current_time - os.path.getmtime(job_path) > max_age_seconds:
+                    os.remove(job_path)
+                    deleted_count += 1
+            except FileNotFoundError:
+                continue
+
+        return deleted_count
+
+
+def _default_profiles() -> List[str]:
+    """Get the pipeline profiles that jobs with the default profile use."""
+    if Config.PIPELINE_DEFAULT_PROFILE == 'auto':
+        return ['digital', 'standard']
+    return [Config.PIPELINE_DEFAULT_PROFILE]
+
+
+def _init_worker() -> None:
+    """
+    Build and warm up the converter of a pool worker process.
+
+    Only the default profile is warmed: every web worker runs its own pool,
+    so each model set loaded here is multiplied by both worker counts.
+    Other profiles load on the first job that asks for them.
+    """
+    global _worker_parser
+    _worker_parser = DocumentParser.from_config()
+
+    try:
+        _worker_parser.warm_up(_default_profiles())
+    except Exception as e:
+        # The converter still loads its models lazily on first use
+        logger.warning(f"Conversion worker started cold: {e}")
+
+
+def _get_worker_openai_service():
+    """Get the OpenAI service of a pool worker process, creating it once."""
+    global _worker_openai_service
+    if _worker_openai_service is None:
+        from services.openai_service import OpenAIService
+
+        _worker_openai_service = OpenAIService.from_config()
+    return _worker_openai_service
+
+
+def _run_job(
+    jobs_folder: str,
+    job_id: str,
+    file_path: str,
+    output_format: str,
+    prompt: Optional[str] = None,
+    page_range: Optional[PageRange] = None,
+    max_pages: Optional[int] = None,
+    profile: str = 'auto',
+) -> None:
+    """
+    Run a job inside a pool worker process.
+
+    Progress and the final result are written straight to the job store.
+    """
+    store = JobStore(jobs_folder)
+
+    try:
+        store.update(job_id, status='running', stage='converting', progress=0.1)
+        parsed_document = _worker_parser.parse_document(
+            file_path, output_format, page_range, max_pages, profile
+        )
+
+        store.update(job_id, stage='exporting', progress=0.6)
+        result = {
+            'content': parsed_document.response_content(),
+            'metadata': parsed_document.metadata,
+        }
+
+        if prompt:
+            store.update(job_id, stage='analyzing', progress=0.8)
+            openai_service = _get_worker_openai_service()
+            llm_content = parsed_document.export('markdown')
+
+            if not openai_service.check_content_length(llm_content, prompt):
+                raise JobServiceError(
+                    'Document is too large for analysis. '
+                    'Please try with a smaller document.'
+                )
+
+            analysis_result = openai_service.analyze_document(
+                document_content=llm_content,
+                user_prompt=prompt,
+                document_metadata=parsed_document.metadata,
+            )
+            result = {
+                'analysis': analysis_result['response'],
+                'parsed_content': result['content'],
+                'metadata': {
+                    'document': result['metadata'],
+                    'usage': analysis_result['usage'],
+                    'model': analysis_result['usage']['model_used'],
+                    'cached': analysis_result['cached'],
+                },
+            }
+
+        store.update(
+            job_id, status='completed', stage='completed', progress=1.0, result=result
+        )
+
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        store.update(
+            job_id,
+            status='failed',
+            stage='failed',
+            error=str(e),
+            error_code=getattr(e, 'error_code', None),
+        )
+
+    finally:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+class JobService:
+    """
+    Service running document conversions asynchronously in a process pool.
+
+    The pool belongs to the process that created the service, so a server
+    with N web workers runs N pools of ``JOB_WORKERS`` processes, each with
+    its own copy of the models.
+    """
+
+    def __init__(self):
+        """Initialize the job service."""
+        self.store = JobStore(Config.JOBS_FOLDER)
+        self.max_workers = Config.JOB_WORKERS
+        self.retention_hours = Config.JOB_RETENTION_HOURS
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the conversion pool, starting it on first use."""
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers build their own converters instead of
+                # inheriting the state of a (possibly threaded) web worker
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+                logger.info(f"Started conversion pool with {self.max_workers} workers")
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        """Discard a broken conversion pool so the next submit starts a new one."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def submit(
+        self,
+        file_path: str,
+        output_format: str,
+        prompt: Optional[str] = None,
+        page_range: Optional[PageRange] = None,
+        max_pages: Optional[int] = None,
+        profile: str = 'auto',
+    ) -> Dict[str, Any]:
+        """
+        Queue a document for conversion and optional analysis.
+
+        The job owns the uploaded file from here on and deletes it when done.
+
+        Args:
+            file_path: Path to the uploaded document
+            output_format: Desired output format
+            prompt: Optional analysis prompt
+            page_range: Optional 1-based, inclusive (first, last) page range
+            max_pages: Optional cap on the number of pages converted
+            profile: Pipeline profile used for the conversion
+
+        Returns:
+            The created job record
+
+        Raises:
+            JobServiceError: If the job cannot be queued
+        """
+        try:
+            self.store.cleanup_old_jobs(self.retention_hours)
+            job = self.store.create(
+                kind='analyze' if prompt else 'parse', output_format=output_format
+            )
+
+            run_args = (self.store.jobs_folder, job['id'], file_path, output_format)
+            try:
+                future = self._get_executor().submit(
+                    _run_job, *run_args, prompt, page_range, max_pages, profile
+                )
+            except BrokenProcessPool:
+                logger.warning("Conversion pool is broken, restarting it")
+                self._reset_executor()
+                future = self._get_executor().submit(
+                    _run_job, *run_args, prompt, page_range, max_pages, profile
+                )
+
+            future.add_done_callback(partial(self._on_job_done, job['id'], file_path))
+            logger.info(f"Queued job {job['id']}")
+            return job
+
+        except Exception as e:
+            logger.error(f"Failed to queue job: {e}")
+            raise JobServiceError(f"Failed to queue job: {e}")
+
+    def _on_job_done(self, job_id: str, file_path: str, future: Future) -> None:
+        """Record jobs whose worker died before reporting a result."""
+        if future.cancelled():
+            error = 'Job was cancelled'
+        elif future.exception() is not None:
+            error = f'Conversion worker failed: {future.exception()}'
+            if isinstance(future.exception(), BrokenProcessPool):
+                self._reset_executor()
+        else:
+            return
+
+        logger.error(f"Job {job_id} did not complete: {error}")
+        self.store.update(job_id, status='failed', stage='failed', error=error)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the current state of a job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            The job record, or None if it doesn't exist
+        """
+        return self.store.get(job_id)
@@ -0,0 +1,66 @@
+import json
+import logging
+from typing import Any, Callable, Optional
+
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used instead
+    orjson = None
+
+
+def dumps_bytes(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Uses orjson when it is installed, falling back to the standard library
+    for values orjson rejects (such as integers wider than 64 bits).
+
+    Args:
+        obj: Value to encode
+        default: Function converting values that aren't JSON serializable
+
+    Returns:
+        Encoded JSON without insignificant whitespace
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError as e:
+            logger.debug(f"orjson failed, falling back to json: {e}")
+    return json.dumps(
+        obj, default=default, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Encode a value as a compact JSON string; see dumps_bytes."""
+    return dumps_bytes(obj, default).decode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider writing compact JSON with orjson when available.
+
+    Keys keep their insertion order and non-ASCII text is written as UTF-8.
+    Responses are still pretty printed in debug mode, like Flask's default.
+    """
+
+    sort_keys = False
+    ensure_ascii = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, self.default)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self.compact is False or (self.compact is None and self._app.debug):
+            body = f"{super().dumps(obj, indent=2)}\n"
+        else:
+            body = dumps_bytes(obj, self.default) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
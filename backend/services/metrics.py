@@ -0,0 +1,222 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional, Tuple
+from services import tracing
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # Metrics are optional; every recording call becomes a no-op
+    prometheus_client = None
+
+# Seconds buckets spanning fast cache hits to long OCR conversions
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+THROUGHPUT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0)
+
+STAGE_LABELS = ('stage', 'file_type', 'output_format')
+
+
+class _NoopMetric:
+    """Stand-in for a metric when prometheus_client isn't installed."""
+
+    def labels(self, *args, **kwargs) -> '_NoopMetric':
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+
+def _metric(kind: str, name: str, documentation: str, labels, **kwargs):
+    """Create a metric, or a no-op stand-in without prometheus_client."""
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labels, **kwargs)
+
+
+STAGE_SECONDS = _metric(
+    'Histogram',
+    'docparser_stage_duration_seconds',
+    'Time spent in each pipeline stage',
+    STAGE_LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = _metric(
+    'Counter',
+    'docparser_stage_errors',
+    'Pipeline stage failures by exception type',
+    STAGE_LABELS + ('error',),
+)
+BYTES = _metric(
+    'Counter',
+    'docparser_bytes',
+    'Bytes received in uploads (in) and produced by exports (out)',
+    ('direction', 'file_type', 'output_format'),
+)
+PAGES = _metric(
+    'Counter',
+    'docparser_converted_pages',
+    'Pages converted by Docling',
+    ('file_type', 'profile'),
+)
+PAGES_PER_SECOND = _metric(
+    'Histogram',
+    'docparser_conversion_pages_per_second',
+    'Conversion throughput of each document',
+    ('file_type', 'profile'),
+    buckets=THROUGHPUT_BUCKETS,
+)
+TOKENS = _metric(
+    'Counter',
+    'docparser_llm_tokens',
+    'LLM tokens by kind (prompt, completion, cached prompt)',
+    ('kind', 'model', 'file_type'),
+)
+CACHE_LOOKUPS = _metric(
+    'Counter',
+    'docparser_cache_lookups',
+    'Parse and response cache lookups by result',
+    ('cache', 'result'),
+)
+REQUESTS_IN_PROGRESS = _metric(
+    'Gauge',
+    'docparser_requests_in_progress',
+    'HTTP requests being handled',
+    ('endpoint',),
+    **({'multiprocess_mode': 'livesum'} if prometheus_client else {}),
+)
+
+
+def is_enabled() -> bool:
+    """Whether metrics are recorded (prometheus_client is installed)."""
+    return prometheus_client is not None
+
+
+def init_app(app) -> None:
+    """Track the requests in progress of a Flask app, per endpoint."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_tracking():
+        g.metrics_endpoint = request.endpoint or 'unknown'
+        REQUESTS_IN_PROGRESS.labels(g.metrics_endpoint).inc()
+
+    @app.teardown_request
+    def _stop_request_tracking(error=None):
+        endpoint = g.pop('metrics_endpoint', None)
+        if endpoint:
+            REQUESTS_IN_PROGRESS.labels(endpoint).dec()
+
+
+def observe_stage(
+    stage: str, seconds: float, file_type: str = '', output_format: str = ''
+) -> None:
+    """Observe the duration of a pipeline stage, also for Server-Timing."""
+    STAGE_SECONDS.labels(stage, file_type, output_format).observe(seconds)
+    tracing.record_stage(stage, seconds, output_format)
+
+
+def record_error(
+    stage: str, error: str, file_type: str = '', output_format: str = ''
+) -> None:
+    """Count a failure of a pipeline stage."""
+    STAGE_ERRORS.labels(stage, file_type, output_format, error).inc()
+
+
+@contextmanager
+def track_stage(stage: str, file_type: str = '', output_format: str = '') -> Iterator:
+    """
+    Time a pipeline stage, counting it as failed if it raises.
+
+    Args:
+        stage: Stage name, e.g. 'upload', 'conversion', 'export', 'analysis'
+        file_type: Extension of the document, e.g. '.pdf'
+        output_format: Output format the stage produces, if any
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        record_error(stage, type(e).__name__, file_type, output_format)
+        raise
+    finally:
+        observe_stage(stage, time.perf_counter() - started_at, file_type, output_format)
+
+
+def record_bytes(
+    direction: str, size: int, file_type: str = '', output_format: str = ''
+) -> None:
+    """Count bytes received ('in') or produced ('out')."""
+    BYTES.labels(direction, file_type, output_format).inc(size)
+
+
+def record_pages(pages: int, seconds: float, file_type: str, profile: str) -> None:
+    """Count converted pages and observe the conversion throughput."""
+    if not pages:
+        return
+    PAGES.labels(file_type, profile).inc(pages)
+    if seconds > 0:
+        PAGES_PER_SECOND.labels(file_type, profile).observe(pages / seconds)
+
+
+def record_tokens(usage: Optional[Dict[str, Any]], file_type: str = '') -> None:
+    """Count the tokens of LLM usage info as returned by OpenAIService."""
+    if not usage:
+        return
+    model = usage.get('model_used') or ''
+    for kind, key in (
+        ('prompt', 'prompt_tokens'),
+        ('completion', 'completion_tokens'),
+        ('cached', 'cached_tokens'),
+    ):
+        if usage.get(key):
+            TOKENS.labels(kind, model, file_type).inc(usage[key])
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache lookup as a hit or a miss."""
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """
+    Render every metric in the Prometheus text format.
+
+    When PROMETHEUS_MULTIPROC_DIR is set, the values written by every worker
+    process are aggregated, so any worker can answer a scrape.
+
+    Returns:
+        Tuple of (payload, content type)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+
+    return (
+        prometheus_client.generate_latest(registry),
+        prometheus_client.CONTENT_TYPE_LATEST,
+    )
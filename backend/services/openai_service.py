@@ -1,10 +1,21 @@
+import time
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional
-from openai import OpenAI
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterator, List, Optional
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
 from config.settings import Config
+from services import metrics
+from services.response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Reply expected from map calls on chunks with nothing relevant to the request
+NO_RELEVANT_CONTENT = 'NO_RELEVANT_CONTENT'
+
 
 class OpenAIServiceError(Exception):
     """Custom exception for OpenAI service errors."""
@@ -15,12 +26,39 @@ class OpenAIServiceError(Exception):
 class OpenAIService:
     """Service for interacting with OpenAI API."""
 
-    def __init__(self):
-        """Initialize the OpenAI service."""
+    def __init__(self, response_cache: Optional[ResponseCache] = None):
+        """
+        Initialize the OpenAI service.
+
+        Args:
+            response_cache: Optional cache of analysis responses
+        """
         self.client = None
         self.model = Config.OPENAI_MODEL
+        self.temperature = 0.1  # Lower temperature for more consistent responses
+        self.max_tokens = 4000  # Reasonable limit for responses
+        self.response_cache = response_cache
+        # Created on first use; the async client lives on its own event loop
+        # thread so its connection pool outlasts a single request
+        self._async_client = None
+        self._async_loop = None
+        self._async_lock = threading.Lock()
         self._initialize_client()
 
+    @classmethod
+    def from_config(cls) -> 'OpenAIService':
+        """Create an OpenAI service configured from application settings."""
+        response_cache = (
+            ResponseCache(
+                Config.RESPONSE_CACHE_PATH,
+                ttl_seconds=Config.RESPONSE_CACHE_TTL_SECONDS,
+                max_entries=Config.RESPONSE_CACHE_MAX_ENTRIES,
+            )
+            if Config.RESPONSE_CACHE_ENABLED
+            else None
+        )
+        return cls(response_cache=response_cache)
+
     def _initialize_client(self) -> None:
         """Initialize the OpenAI client."""
         try:
@@ -57,53 +95,614 @@ class OpenAIService:
         """
         try:
             # Prepare the system prompt
-            system_prompt = self._create_system_prompt(document_metadata)
+            system_prompt = self._create_system_prompt()
 
             # Prepare the user message
-            user_message = self._create_user_message(document_content, user_prompt)
+            user_message = self._create_user_message(
+                document_content, user_prompt, document_metadata
+            )
 
-            # Make API call
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message},
-                ],
-                temperature=0.1,  # Lower temperature for more consistent responses
-                max_tokens=4000,  # Reasonable limit for responses
+            return self._with_response_cache(
+                self._get_response_cache_key(
+                    'full',
+                    self._create_user_message(document_content, '', document_metadata),
+                    user_prompt,
+                ),
+                lambda: self._complete(system_prompt, user_message),
+                document_metadata,
             )
 
-            if not response.choices or not response.choices[0].message:
-                raise OpenAIServiceError("No response received from OpenAI")
+        except Exception as e:
+            logger.error(f"Error in document analysis: {e}")
+            raise OpenAIServiceError(f"Failed to analyze document: {e}")
+
+    def analyze_document_excerpts(
+        self,
+        excerpts: List[Dict[str, Any]],
+        user_prompt: str,
+        document_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Analyze only the parts of a document relevant to the request.
+
+        Args:
+            excerpts: Retrieved chunks, each with 'text', 'headings' and 'pages'
+            user_prompt: User's analysis prompt
+            document_metadata: Optional metadata about the document
 
-            ai_response = response.choices[0].message.content
+        Returns:
+            Dictionary containing AI response and metadata
 
-            # Prepare response metadata
-            usage_info = {
-                'prompt_tokens': (
-                    response.usage.prompt_tokens if response.usage else 0
+        Raises:
+            OpenAIServiceError: If analysis fails
+        """
+        try:
+            if not excerpts:
+                raise OpenAIServiceError("Document has no content to analyze")
+
+            system_prompt = self._create_system_prompt()
+            user_message = self._create_excerpts_message(
+                excerpts, user_prompt, document_metadata
+            )
+
+            return self._with_response_cache(
+                self._get_response_cache_key(
+                    'retrieval',
+                    self._create_excerpts_message(excerpts, '', document_metadata),
+                    user_prompt,
                 ),
-                'completion_tokens': (
-                    response.usage.completion_tokens if response.usage else 0
+                lambda: self._complete(system_prompt, user_message),
+                document_metadata,
+            )
+
+        except Exception as e:
+            logger.error(f"Error in excerpt document analysis: {e}")
+            raise OpenAIServiceError(f"Failed to analyze document: {e}")
+
+    def analyze_document_questions(
+        self,
+        document_content: str,
+        user_prompts: List[str],
+        document_metadata: Optional[Dict[str, Any]] = None,
+        max_concurrency: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer several prompts about the same document concurrently.
+
+        Cached answers are returned directly. The remaining prompts are sent
+        at once through the process-wide async client, with at most
+        ``max_concurrency`` requests in flight, so the total time is close to
+        that of the slowest answer.
+
+        Args:
+            document_content: Parsed document content
+            user_prompts: User's analysis prompts
+            document_metadata: Optional metadata about the document
+            max_concurrency: Maximum number of concurrent API calls
+
+        Returns:
+            One result per prompt, in order. Successful results have the same
+            shape as analyze_document; failed ones have 'success' False and
+            an 'error' message
+
+        Raises:
+            OpenAIServiceError: If the analysis cannot be run at all
+        """
+        try:
+            system_prompt = self._create_system_prompt()
+            file_type = (document_metadata or {}).get('file_type', '')
+            results: List[Optional[Dict[str, Any]]] = [None] * len(user_prompts)
+            pending = []
+
+            message_without_prompt = self._create_user_message(
+                document_content, '', document_metadata
+            )
+            for index, user_prompt in enumerate(user_prompts):
+                cache_key = self._get_response_cache_key(
+                    'full', message_without_prompt, user_prompt
+                )
+                cached = self.response_cache.get(cache_key) if cache_key else None
+                if cache_key:
+                    metrics.record_cache_lookup('response', cached is not None)
+                if cached is not None:
+                    results[index] = {**cached, 'cached': True}
+                else:
+                    pending.append((index, user_prompt, cache_key))
+
+            if pending:
+                with metrics.track_stage('analysis', file_type):
+                    completions = self._run_async(
+                        self._complete_concurrently(
+                            system_prompt,
+                            [
+                                self._create_user_message(
+                                    document_content, user_prompt, document_metadata
+                                )
+                                for _, user_prompt, _ in pending
+                            ],
+                            max_concurrency,
+                        )
+                    )
+
+                for (index, user_prompt, cache_key), completion in zip(
+                    pending, completions
+                ):
+                    if isinstance(completion, Exception):
+                        logger.error(f"Question {index + 1} failed: {completion}")
+                        metrics.record_error(
+                            'analysis', type(completion).__name__, file_type
+                        )
+                        results[index] = {
+                            'success': False,
+                            'error': f"Failed to analyze document: {completion}",
+                        }
+                        continue
+
+                    metrics.record_tokens(completion.get('usage'), file_type)
+                    if cache_key:
+                        self.response_cache.put(cache_key, completion)
+                    results[index] = {**completion, 'cached': False}
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in multi-question document analysis: {e}")
+            raise OpenAIServiceError(f"Failed to analyze document: {e}")
+
+    def _get_async_client(self) -> AsyncOpenAI:
+        """
+        Get the process-wide async client, creating it on first use.
+
+        The client and its connection pool are bound to one event loop, run
+        forever by a daemon thread, so kept-alive connections are reused by
+        every request instead of being re-established each time.
+        """
+        with self._async_lock:
+            if self._async_client is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name='openai-async', daemon=True
+                ).start()
+                self._async_loop = loop
+                self._async_client = AsyncOpenAI(
+                    api_key=Config.OPENAI_API_KEY,
+                    http_client=DefaultAsyncHttpxClient(
+                        limits=httpx.Limits(
+                            max_connections=None,
+                            max_keepalive_connections=max(
+                                1, Config.QUESTIONS_MAX_CONCURRENCY
+                            ),
+                        )
+                    ),
+                )
+            return self._async_client
+
+    def _run_async(self, coroutine) -> Any:
+        """Run a coroutine on the async client's event loop and wait for it."""
+        self._get_async_client()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._async_loop).result()
+
+    async def _complete_concurrently(
+        self, system_prompt: str, user_messages: List[str], max_concurrency: int
+    ) -> List[Any]:
+        """
+        Make chat completion calls concurrently over the shared connection pool.
+
+        Returns:
+            One completion result or exception per message, in order
+        """
+        client = self._get_async_client()
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def complete(user_message: str) -> Dict[str, Any]:
+            async with semaphore:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_message},
+                    ],
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                )
+            return self._to_completion_result(response)
+
+        return await asyncio.gather(
+            *(complete(user_message) for user_message in user_messages),
+            return_exceptions=True,
+        )
+
+    def analyze_document_map_reduce(
+        self,
+        chunks: List[Dict[str, Any]],
+        user_prompt: str,
+        document_metadata: Optional[Dict[str, Any]] = None,
+        max_concurrency: int = 4,
+    ) -> Dict[str, Any]:
+        """
+        Analyze a document too large for one request by mapping over chunks.
+
+        Each chunk is analyzed on its own (map), with at most
+        ``max_concurrency`` requests in flight. The partial answers are then
+        combined, in several rounds if they don't fit in one request, into a
+        single final answer (reduce).
+
+        Args:
+            chunks: Document chunks, each with 'text' and 'headings'
+            user_prompt: User's analysis prompt
+            document_metadata: Optional metadata about the document
+            max_concurrency: Maximum number of concurrent API calls
+
+        Returns:
+            Dictionary containing the final AI response, aggregate usage and
+            per-stage latency
+
+        Raises:
+            OpenAIServiceError: If analysis fails
+        """
+        try:
+            if not chunks:
+                raise OpenAIServiceError("Document has no content to analyze")
+
+            return self._with_response_cache(
+                self._get_response_cache_key(
+                    'map_reduce',
+                    '\n\n'.join(
+                        self._create_map_message(
+                            chunk, '', index, len(chunks), document_metadata
+                        )
+                        for index, chunk in enumerate(chunks, start=1)
+                    ),
+                    user_prompt,
                 ),
-                'total_tokens': (response.usage.total_tokens if response.usage else 0),
-                'model_used': self.model,
-            }
+                lambda: self._run_map_reduce(
+                    chunks, user_prompt, document_metadata, max_concurrency
+                ),
+                document_metadata,
+            )
+
+        except Exception as e:
+            logger.error(f"Error in map-reduce document analysis: {e}")
+            raise OpenAIServiceError(f"Failed to analyze document: {e}")
+
+    def _run_map_reduce(
+        self,
+        chunks: List[Dict[str, Any]],
+        user_prompt: str,
+        document_metadata: Optional[Dict[str, Any]],
+        max_concurrency: int,
+    ) -> Dict[str, Any]:
+        """Run the map and reduce stages of a map-reduce analysis."""
+        system_prompt = self._create_system_prompt()
+        calls: List[Dict[str, Any]] = []
+        started_at = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            # Map: analyze every chunk independently
+            map_messages = [
+                self._create_map_message(
+                    chunk, user_prompt, index, len(chunks), document_metadata
+                )
+                for index, chunk in enumerate(chunks, start=1)
+            ]
+            map_results = list(
+                executor.map(
+                    lambda message: self._complete(system_prompt, message),
+                    map_messages,
+                )
+            )
+            calls.extend(map_results)
+            map_finished_at = time.perf_counter()
+
+            partials = [
+                result['response']
+                for result in map_results
+                if result['response']
+                and result['response'].strip() != NO_RELEVANT_CONTENT
+            ]
+
+            # Reduce: merge notes in rounds until they fit one request
+            reduce_rounds = 0
+            budget = self.get_context_token_limit()
+            while (
+                len(partials) > 1
+                and self._estimate_tokens('\n\n'.join(partials)) >= budget
+            ):
+                groups = self._group_by_budget(partials, budget // 2)
+                if len(groups) == len(partials):
+                    break
+
+                round_results = list(
+                    executor.map(
+                        lambda group: self._complete(
+                            system_prompt,
+                            self._create_combine_message(group, user_prompt),
+                        ),
+                        groups,
+                    )
+                )
+                calls.extend(round_results)
+                partials = [result['response'] for result in round_results]
+                reduce_rounds += 1
+
+        # Notes too long to combine any further would overflow the context
+        reduce_message = self._create_reduce_message(partials, user_prompt)
+        if self._estimate_tokens(reduce_message) >= budget:
+            raise OpenAIServiceError(
+                "Partial answers exceed the context budget of "
+                f"{budget} tokens and cannot be combined"
+            )
+
+        final_result = self._complete(system_prompt, reduce_message)
+        calls.append(final_result)
+        finished_at = time.perf_counter()
+
+        usage_info = self._aggregate_usage(calls)
+
+        return {
+            'success': True,
+            'response': final_result['response'],
+            'usage': usage_info,
+            'finish_reason': final_result['finish_reason'],
+            'analysis': {
+                'mode': 'map_reduce',
+                'chunks': len(chunks),
+                'relevant_chunks': sum(
+                    1
+                    for result in map_results
+                    if result['response']
+                    and result['response'].strip() != NO_RELEVANT_CONTENT
+                ),
+                'reduce_rounds': reduce_rounds + 1,
+                'stage_latency': {
+                    'map_seconds': round(map_finished_at - started_at, 3),
+                    'reduce_seconds': round(finished_at - map_finished_at, 3),
+                    'total_seconds': round(finished_at - started_at, 3),
+                },
+            },
+        }
+
+    def _complete(self, system_prompt: str, user_message: str) -> Dict[str, Any]:
+        """Make a chat completion call and collect its response and usage."""
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message},
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+        )
+
+        return self._to_completion_result(response)
+
+    def _to_completion_result(self, response) -> Dict[str, Any]:
+        """Collect the response text and usage of a chat completion."""
+        if not response.choices or not response.choices[0].message:
+            raise OpenAIServiceError("No response received from OpenAI")
+
+        ai_response = response.choices[0].message.content
+
+        return {
+            'success': True,
+            'response': ai_response,
+            'usage': self._to_usage_info(response.usage),
+            'finish_reason': response.choices[0].finish_reason,
+        }
+
+    def _to_usage_info(self, usage) -> Dict[str, Any]:
+        """
+        Prepare response metadata from the usage reported by the API.
+
+        ``cached_tokens`` counts prompt tokens served from the provider's
+        prompt cache, which are billed at a discount and skip prefill.
+        """
+        details = getattr(usage, 'prompt_tokens_details', None) if usage else None
+        return {
+            'prompt_tokens': usage.prompt_tokens if usage else 0,
+            'completion_tokens': usage.completion_tokens if usage else 0,
+            'total_tokens': usage.total_tokens if usage else 0,
+            'cached_tokens': (getattr(details, 'cached_tokens', None) or 0),
+            'model_used': self.model,
+        }
+
+    def _get_response_cache_key(
+        self, mode: str, message: str, user_prompt: str
+    ) -> Optional[str]:
+        """
+        Get the response cache key of a request, or None when caching is off.
+
+        ``message`` is the user message exactly as sent, document header
+        included, but built with an empty prompt: the prompt is keyed
+        separately, after normalization.
+        """
+        if not self.response_cache:
+            return None
+
+        content_hash = hashlib.sha256(message.encode('utf-8')).hexdigest()
+        return ResponseCache.make_key(
+            f"{mode}:{content_hash}",
+            user_prompt,
+            self.model,
+            self.temperature,
+            self.max_tokens,
+        )
+
+    def _with_response_cache(
+        self,
+        cache_key: Optional[str],
+        analyze: Callable[[], Dict[str, Any]],
+        document_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Return a cached analysis result, or run the analysis and cache it."""
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            metrics.record_cache_lookup('response', cached is not None)
+            if cached is not None:
+                logger.info(f"Response cache hit for {cache_key}")
+                return {**cached, 'cached': True}
+
+        file_type = (document_metadata or {}).get('file_type', '')
+        with metrics.track_stage('analysis', file_type):
+            result = analyze()
+        metrics.record_tokens(result.get('usage'), file_type)
+        if cache_key:
+            self.response_cache.put(cache_key, result)
+        return {**result, 'cached': False}
+
+    def _aggregate_usage(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Sum the token usage of several completion calls."""
+        return {
+            'prompt_tokens': sum(r['usage']['prompt_tokens'] for r in results),
+            'completion_tokens': sum(r['usage']['completion_tokens'] for r in results),
+            'total_tokens': sum(r['usage']['total_tokens'] for r in results),
+            'cached_tokens': sum(r['usage'].get('cached_tokens', 0) for r in results),
+            'model_used': self.model,
+            'calls': len(results),
+        }
+
+    def _group_by_budget(self, texts: List[str], budget: int) -> List[List[str]]:
+        """Group consecutive texts so each group stays within a token budget."""
+        groups: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for text in texts:
+            tokens = self._estimate_tokens(text)
+            if current and current_tokens + tokens > budget:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+
+        if current:
+            groups.append(current)
+        return groups
+
+    def stream_analysis(
+        self,
+        document_content: str,
+        user_prompt: str,
+        document_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze document content, yielding completion tokens as they arrive.
 
-            return {
-                'success': True,
-                'response': ai_response,
+        Args:
+            document_content: Parsed document content
+            user_prompt: User's analysis prompt
+            document_metadata: Optional metadata about the document
+
+        Yields:
+            Events of the form {'type': 'token', 'content': ...} for each
+            completion delta, followed by one {'type': 'usage', 'usage': ...,
+            'finish_reason': ..., 'cached': ...} event. A cached answer is
+            yielded as a single token event
+
+        Raises:
+            OpenAIServiceError: If analysis fails
+        """
+        stream = None
+        file_type = (document_metadata or {}).get('file_type', '')
+        try:
+            cache_key = self._get_response_cache_key(
+                'full',
+                self._create_user_message(document_content, '', document_metadata),
+                user_prompt,
+            )
+            cached = self.response_cache.get(cache_key) if cache_key else None
+            if cache_key:
+                metrics.record_cache_lookup('response', cached is not None)
+            if cached is not None:
+                logger.info(f"Response cache hit for {cache_key}")
+                yield {'type': 'token', 'content': cached['response']}
+                yield {
+                    'type': 'usage',
+                    'usage': cached['usage'],
+                    'finish_reason': cached['finish_reason'],
+                    'cached': True,
+                }
+                return
+
+            system_prompt = self._create_system_prompt()
+            user_message = self._create_user_message(
+                document_content, user_prompt, document_metadata
+            )
+
+            started_at = time.perf_counter()
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_message},
+                ],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+
+            finish_reason = None
+            usage = None
+            parts = []
+            for chunk in stream:
+                # The final chunk carries usage and no choices
+                if chunk.usage:
+                    usage = chunk.usage
+
+                if not chunk.choices:
+                    continue
+
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                if choice.delta and choice.delta.content:
+                    parts.append(choice.delta.content)
+                    yield {'type': 'token', 'content': choice.delta.content}
+
+            usage_info = self._to_usage_info(usage)
+            metrics.observe_stage(
+                'analysis', time.perf_counter() - started_at, file_type
+            )
+            metrics.record_tokens(usage_info, file_type)
+
+            # Only complete answers are cached; an abandoned stream never gets here
+            if cache_key:
+                self.response_cache.put(
+                    cache_key,
+                    {
+                        'success': True,
+                        'response': ''.join(parts),
+                        'usage': usage_info,
+                        'finish_reason': finish_reason,
+                    },
+                )
+
+            yield {
+                'type': 'usage',
                 'usage': usage_info,
-                'finish_reason': response.choices[0].finish_reason,
+                'finish_reason': finish_reason,
+                'cached': False,
             }
 
         except Exception as e:
-            logger.error(f"Error in document analysis: {e}")
+            logger.error(f"Error in streaming document analysis: {e}")
+            metrics.record_error('analysis', type(e).__name__, file_type)
             raise OpenAIServiceError(f"Failed to analyze document: {e}")
 
-    def _create_system_prompt(self, metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Create system prompt for document analysis."""
-        base_prompt = """You are an expert document analyst. Your role is to provide accurate, insightful analysis of documents based on their content and the user's specific questions or requests.
+        finally:
+            if stream is not None:
+                stream.close()
+
+    def _create_system_prompt(self) -> str:
+        """
+        Create system prompt for document analysis.
+
+        The system prompt is identical for every request so that, together
+        with the document block that follows it, it forms a stable prompt
+        prefix the provider can cache across questions.
+        """
+        return """You are an expert document analyst. Your role is to provide accurate, insightful analysis of documents based on their content and the user's specific questions or requests.
 
 Guidelines:
 - Provide clear, concise, and well-structured responses
@@ -112,33 +711,122 @@ Guidelines:
 - Use bullet points or numbered lists when appropriate for clarity
 - Cite specific sections or information from the document when possible"""
 
-        if metadata:
-            metadata_info = f"""
+    def _create_document_info(self, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Describe the document for the start of a user message.
+
+        Only facts derived from the document content are included; the title
+        defaults to the randomized upload file name, which would make the
+        prompt prefix differ between uploads of the same document.
+        """
+        if not metadata:
+            return ''
 
-Document Information:
+        document_info = f"""Document Information:
 - File type: {metadata.get('file_type', 'Unknown')}
-- Title: {metadata.get('title', 'Unknown')}
 """
-            if metadata.get('page_count'):
-                metadata_info += f"- Pages: {metadata['page_count']}\n"
-            if metadata.get('tables_count'):
-                metadata_info += f"- Tables: {metadata['tables_count']}\n"
-            if metadata.get('images_count'):
-                metadata_info += f"- Images: {metadata['images_count']}\n"
-
-            base_prompt += metadata_info
+        if metadata.get('page_count'):
+            document_info += f"- Pages: {metadata['page_count']}\n"
+        if metadata.get('tables_count'):
+            document_info += f"- Tables: {metadata['tables_count']}\n"
+        if metadata.get('images_count'):
+            document_info += f"- Images: {metadata['images_count']}\n"
 
-        return base_prompt
+        return document_info + '\n'
 
-    def _create_user_message(self, document_content: str, user_prompt: str) -> str:
-        """Create user message combining document content and prompt."""
-        return f"""User Request: {user_prompt}
+    def _create_user_message(
+        self,
+        document_content: str,
+        user_prompt: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Create user message combining document content and prompt.
 
-Document Content:
+        The document comes first and the request last, so every question about
+        the same document shares a byte-identical prompt prefix.
+        """
+        return f"""{self._create_document_info(metadata)}Document Content:
 {document_content}
 
+User Request: {user_prompt}
+
 Please analyze the document and respond to the user's request based on the content above."""
 
+    def _create_excerpts_message(
+        self,
+        excerpts: List[Dict[str, Any]],
+        user_prompt: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Create user message combining retrieved excerpts and prompt."""
+        blocks = []
+        for excerpt in excerpts:
+            section = ' > '.join(excerpt.get('headings') or []) or 'Unknown'
+            pages = excerpt.get('pages') or []
+            location = f"Section: {section}"
+            if pages:
+                location += (
+                    f" | Page {pages[0]}"
+                    if len(pages) == 1
+                    else f" | Pages {pages[0]}-{pages[-1]}"
+                )
+            blocks.append(f"[{location}]\n{excerpt['text']}")
+        joined_excerpts = '\n\n---\n\n'.join(blocks)
+
+        return f"""{self._create_document_info(metadata)}Document Excerpts (the parts of the document most relevant to the request, in document order):
+{joined_excerpts}
+
+User Request: {user_prompt}
+
+Please respond to the user's request based on the excerpts above. If they don't contain the information needed, say so."""
+
+    def _create_map_message(
+        self,
+        chunk: Dict[str, Any],
+        user_prompt: str,
+        index: int,
+        total: int,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Create the message analyzing one chunk of a larger document."""
+        section = ' > '.join(chunk.get('headings') or []) or 'Unknown'
+        return f"""{self._create_document_info(metadata)}You are reading part {index} of {total} of a document that is too long to read at once (section: {section}).
+
+Document Excerpt:
+{chunk['text']}
+
+User Request: {user_prompt}
+
+Extract everything in this excerpt that is relevant to the user's request, including specific facts, figures and section references. Do not answer from outside the excerpt. If nothing in the excerpt is relevant, reply with exactly {NO_RELEVANT_CONTENT}."""
+
+    def _create_combine_message(self, notes: List[str], user_prompt: str) -> str:
+        """Create the message merging partial notes into fewer, shorter notes."""
+        joined_notes = '\n\n---\n\n'.join(notes)
+        return f"""Below are notes extracted from consecutive parts of a long document.
+
+Notes:
+{joined_notes}
+
+User Request: {user_prompt}
+
+Merge these notes into one set of notes, keeping every detail relevant to the user's request and removing repetition."""
+
+    def _create_reduce_message(self, notes: List[str], user_prompt: str) -> str:
+        """Create the message producing the final answer from partial notes."""
+        joined_notes = (
+            '\n\n---\n\n'.join(notes)
+            if notes
+            else 'No part of the document contained information relevant to the request.'
+        )
+        return f"""The document was too long to read at once, so it was analyzed in parts. These are the relevant notes extracted from each part, in document order:
+
+{joined_notes}
+
+User Request: {user_prompt}
+
+Please respond to the user's request based on these notes."""
+
     def _estimate_tokens(self, text: str) -> int:
         """Rough estimate of token count for text."""
         # Simple estimation: ~4 characters per token
@@ -156,5 +844,8 @@ Please analyze the document and respond to the user's request based on the conte
             True if within limits, False otherwise
         """
         estimated_tokens = self._estimate_tokens(document_content + user_prompt)
-        max_tokens = 12000 if self.model.startswith('gpt-4') else 3000
-        return estimated_tokens < max_tokens
+        return estimated_tokens < self.get_context_token_limit()
+
+    def get_context_token_limit(self) -> int:
+        """Get the maximum estimated prompt size sent in a single request."""
+        return 12000 if self.model.startswith('gpt-4') else 3000
@@ -0,0 +1,232 @@
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+import uuid
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_SUFFIX = '.json.gz'
+
+
+class ParseCacheError(Exception):
+    """Custom exception for parse cache errors."""
+
+    pass
+
+
+class ParseCache:
+    """
+    Persistent, content-addressed cache for converted documents.
+
+    Entries are gzip-compressed JSON files stored under a local directory and
+    named by their cache key. File modification times double as the LRU
+    recency marker, so the eviction order survives restarts and is shared by
+    every worker process pointing at the same directory.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the parse cache.
+
+        Args:
+            cache_dir: Directory where cache entries are stored
+            max_bytes: Maximum total size of the cache on disk
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            raise ParseCacheError(f"Failed to create cache directory: {e}")
+
+    @staticmethod
+    def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Compute the SHA-256 digest of a file's bytes.
+
+        Args:
+            file_path: Path to the file
+            chunk_size: Number of bytes read per iteration
+
+        Returns:
+            Hex-encoded SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(content_hash: str, config_fingerprint: str) -> str:
+        """
+        Build a cache key from the content hash and converter configuration.
+
+        Args:
+            content_hash: SHA-256 of the uploaded bytes
+            config_fingerprint: Fingerprint of the converter configuration
+
+        Returns:
+            Hex-encoded cache key
+        """
+        return hashlib.sha256(
+            f"{content_hash}:{config_fingerprint}".encode('utf-8')
+        ).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        """Get the on-disk path of a cache entry."""
+        return os.path.join(self.cache_dir, f"{key}{CACHE_FILE_SUFFIX}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached payload.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached payload, or None on a miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                payload = json.loads(gzip.decompress(f.read()))
+
+            # Mark the entry as most recently used
+            os.utime(entry_path, None)
+
+            with self._lock:
+                self._hits += 1
+            return payload
+
+        except FileNotFoundError:
+            pass
+
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            self._remove(entry_path)
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, key: str, payload: Dict[str, Any]) -> bool:
+        """
+        Store a payload in the cache, evicting old entries if needed.
+
+        Args:
+            key: Cache key
+            payload: JSON-serializable payload
+
+        Returns:
+            True if stored successfully, False otherwise
+        """
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            data = gzip.compress(
+                json.dumps(payload, separators=(',', ':')).encode('utf-8'),
+                compresslevel=6,
+            )
+
+            if len(data) > self.max_bytes:
+                logger.info(f"Cache entry {key} exceeds cache size, not storing")
+                return False
+
+            # Write atomically so concurrent readers never see partial entries
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, entry_path)
+
+            self._evict()
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to store cache entry {key}: {e}")
+            self._remove(tmp_path)
+            return False
+
+    def _list_entries(self) -> list:
+        """List cache entries as (mtime, size, path) tuples."""
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(CACHE_FILE_SUFFIX):
+                continue
+            entry_path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(entry_path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        return entries
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until the cache fits its budget."""
+        entries = self._list_entries()
+        total_size = sum(size for _, size, _ in entries)
+        if total_size <= self.max_bytes:
+            return
+
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            if self._remove(entry_path):
+                total_size -= size
+                with self._lock:
+                    self._evictions += 1
+
+    def _remove(self, path: str) -> bool:
+        """Remove a file, ignoring entries already removed by another worker."""
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Failed to remove cache file {path}: {e}")
+            return False
+
+    def clear(self) -> int:
+        """
+        Remove every entry from the cache.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for _, _, entry_path in self._list_entries():
+            if self._remove(entry_path):
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Hit, miss and eviction counts are tracked per process; entry count and
+        size reflect the shared on-disk state.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        entries = self._list_entries()
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': (self._hits / lookups) if lookups else 0.0,
+                'entries': len(entries),
+                'size_bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,192 @@
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+except ImportError:  # Installed with docling; without it PDFs are never probed
+    pdfium = None
+
+logger = logging.getLogger(__name__)
+
+# Pages sampled when probing a PDF's text layer
+PROBE_SAMPLE_PAGES = 5
+
+# Characters a page needs in its text layer to count as born-digital
+MIN_TEXT_CHARS_PER_PAGE = 32
+
+
+class PdfProbeError(Exception):
+    """Custom exception for PDF probing errors."""
+
+    pass
+
+
+def _sample_pages(
+    page_count: int, page_range: Optional[Tuple[int, int]], samples: int
+) -> list:
+    """Pick up to ``samples`` 0-based page indexes spread over the range."""
+    first, last = page_range or (1, page_count)
+    first, last = max(1, first), min(last, page_count)
+    if last < first:
+        return []
+
+    span = last - first + 1
+    if span <= samples:
+        return list(range(first - 1, last))
+
+    step = (span - 1) / (samples - 1)
+    return sorted({first - 1 + round(i * step) for i in range(samples)})
+
+
+def _page_text_chars(page) -> int:
+    """Count the non-whitespace characters in a page's text layer."""
+    text_page = page.get_textpage()
+    try:
+        text = text_page.get_text_range()
+    finally:
+        text_page.close()
+    return len(''.join(text.split()))
+
+
+def probe_text_layer(
+    source: Any,
+    page_range: Optional[Tuple[int, int]] = None,
+    samples: int = PROBE_SAMPLE_PAGES,
+    min_chars: int = MIN_TEXT_CHARS_PER_PAGE,
+) -> Dict[str, Any]:
+    """
+    Check whether a PDF carries a usable text layer.
+
+    Only the text layer of a few pages spread over the range is read; nothing
+    is rendered, so the probe takes milliseconds even for long documents.
+
+    Args:
+        source: Path, bytes or binary file object of the PDF
+        page_range: Optional 1-based, inclusive (first, last) page range
+        samples: Maximum number of pages inspected
+        min_chars: Characters a page needs to count as having text
+
+    Returns:
+        Dictionary with 'has_text_layer', 'pages_sampled', 'pages_with_text'
+        and 'page_count'
+
+    Raises:
+        PdfProbeError: If pypdfium2 is missing or the PDF can't be read
+    """
+    if pdfium is None:
+        raise PdfProbeError("pypdfium2 is not installed")
+
+    try:
+        pdf = pdfium.PdfDocument(source)
+    except Exception as e:
+        raise PdfProbeError(f"Failed to open PDF: {e}")
+
+    try:
+        page_count = len(pdf)
+        sampled = _sample_pages(page_count, page_range, max(1, samples))
+
+        pages_with_text = 0
+        for index in sampled:
+            page = pdf[index]
+            try:
+                if _page_text_chars(page) >= min_chars:
+                    pages_with_text += 1
+            finally:
+                page.close()
+
+        return {
+            # Every sampled page must have text: a single scanned page needs OCR
+            'has_text_layer': bool(sampled) and pages_with_text == len(sampled),
+            'pages_sampled': len(sampled),
+            'pages_with_text': pages_with_text,
+            'page_count': page_count,
+        }
+
+    except Exception as e:
+        raise PdfProbeError(f"Failed to read PDF text layer: {e}")
+
+    finally:
+        pdf.close()
+
+
+def probe_page_layout(
+    source: Any,
+    page_range: Optional[Tuple[int, int]] = None,
+    samples: int = PROBE_SAMPLE_PAGES,
+    min_chars: int = MIN_TEXT_CHARS_PER_PAGE,
+) -> Dict[str, Any]:
+    """
+    Read the text layer and image placements of a few PDF pages.
+
+    Like probe_text_layer nothing is rendered or decoded: image objects are
+    only located on the page, which tells scans (one page-sized image and no
+    text) from born-digital pages.
+
+    Args:
+        source: Path, bytes or binary file object of the PDF
+        page_range: Optional 1-based, inclusive (first, last) page range
+        samples: Maximum number of pages inspected
+        min_chars: Characters a page needs to count as having text
+
+    Returns:
+        The probe_text_layer fields plus 'image_coverage' (mean fraction of
+        the sampled pages' area covered by images), 'images_per_page',
+        'scanned_pages' (sampled pages mostly covered by images and without
+        text) and 'page_size' (width and height of the first sampled page,
+        in points)
+
+    Raises:
+        PdfProbeError: If pypdfium2 is missing or the PDF can't be read
+    """
+    if pdfium is None:
+        raise PdfProbeError("pypdfium2 is not installed")
+
+    try:
+        pdf = pdfium.PdfDocument(source)
+    except Exception as e:
+        raise PdfProbeError(f"Failed to open PDF: {e}")
+
+    try:
+        page_count = len(pdf)
+        sampled = _sample_pages(page_count, page_range, max(1, samples))
+
+        pages_with_text = scanned_pages = images = 0
+        coverage = 0.0
+        page_size = None
+        for index in sampled:
+            page = pdf[index]
+            try:
+                width, height = page.get_size()
+                page_size = page_size or [round(width, 1), round(height, 1)]
+                has_text = _page_text_chars(page) >= min_chars
+
+                image_area = 0.0
+                for image in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE]):
+                    left, bottom, right, top = image.get_bounds()
+                    image_area += max(0.0, right - left) * max(0.0, top - bottom)
+                    images += 1
+                page_coverage = min(1.0, image_area / max(1.0, width * height))
+            finally:
+                page.close()
+
+            coverage += page_coverage
+            pages_with_text += has_text
+            scanned_pages += not has_text and page_coverage >= 0.5
+
+        return {
+            'has_text_layer': bool(sampled) and pages_with_text == len(sampled),
+            'pages_sampled': len(sampled),
+            'pages_with_text': pages_with_text,
+            'page_count': page_count,
+            'image_coverage': round(coverage / len(sampled), 3) if sampled else 0.0,
+            'images_per_page': round(images / len(sampled), 2) if sampled else 0.0,
+            'scanned_pages': scanned_pages,
+            'page_size': page_size,
+        }
+
+    except Exception as e:
+        raise PdfProbeError(f"Failed to read PDF page layout: {e}")
+
+    finally:
+        pdf.close()
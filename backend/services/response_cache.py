@@ -0,0 +1,214 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCacheError(Exception):
+    """Custom exception for response cache errors."""
+
+    pass
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt so trivially different phrasings share an entry."""
+    return re.sub(r'\s+', ' ', prompt).strip().lower()
+
+
+class ResponseCache:
+    """
+    Persistent cache of LLM analysis responses.
+
+    Entries live in a SQLite database so every worker process shares them.
+    Each entry expires after a TTL, and the least recently used entries are
+    evicted once the cache holds more than ``max_entries``.
+    """
+
+    def __init__(
+        self, db_path: str, ttl_seconds: int = 24 * 3600, max_entries: int = 10000
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            db_path: Path of the SQLite database file
+            ttl_seconds: Seconds an entry stays valid after being stored
+            max_entries: Maximum number of entries kept
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        try:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+
+            with self._connect() as conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    'key TEXT PRIMARY KEY, '
+                    'payload TEXT NOT NULL, '
+                    'created_at REAL NOT NULL, '
+                    'accessed_at REAL NOT NULL)'
+                )
+                conn.execute(
+                    'CREATE INDEX IF NOT EXISTS responses_accessed_at '
+                    'ON responses (accessed_at)'
+                )
+        except (OSError, sqlite3.Error) as e:
+            raise ResponseCacheError(f"Failed to open response cache: {e}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open an autocommit connection to the cache database."""
+        conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(
+        content_hash: str,
+        prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
+        """
+        Build a cache key for an analysis request.
+
+        Args:
+            content_hash: Hash of the message sent to the model, without the
+                          prompt
+            prompt: User's analysis prompt, normalized before hashing
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+
+        Returns:
+            Hex-encoded cache key
+        """
+        key_source = json.dumps(
+            [content_hash, normalize_prompt(prompt), model, temperature, max_tokens]
+        )
+        return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached response, or None on a miss or an expired entry
+        """
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT payload FROM responses WHERE key = ? AND created_at > ?',
+                    (key, now - self.ttl_seconds),
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        'UPDATE responses SET accessed_at = ? WHERE key = ?',
+                        (now, key),
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache lookup failed for {key}: {e}")
+            row = None
+
+        with self._lock:
+            if row:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, response: Dict[str, Any]) -> bool:
+        """
+        Store a response, evicting expired and least recently used entries.
+
+        Args:
+            key: Cache key
+            response: JSON-serializable response
+
+        Returns:
+            True if stored successfully, False otherwise
+        """
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses '
+                    '(key, payload, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(response), now, now),
+                )
+                conn.execute(
+                    'DELETE FROM responses WHERE created_at <= ?',
+                    (now - self.ttl_seconds,),
+                )
+                conn.execute(
+                    'DELETE FROM responses WHERE key IN ('
+                    'SELECT key FROM responses ORDER BY accessed_at DESC '
+                    'LIMIT -1 OFFSET ?)',
+                    (self.max_entries,),
+                )
+            return True
+
+        except (TypeError, ValueError, sqlite3.Error) as e:
+            logger.error(f"Failed to store response cache entry {key}: {e}")
+            return False
+
+    def clear(self) -> int:
+        """
+        Remove every entry from the cache.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM responses').rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Hit and miss counts are tracked per process; the entry count reflects
+        the shared database.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        try:
+            with self._connect() as conn:
+                entries = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': (self._hits / lookups) if lookups else 0.0,
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+            }
@@ -0,0 +1,333 @@
+import re
+import math
+import base64
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from services.parse_cache import ParseCache
+
+try:
+    import numpy as np
+except ImportError:  # Dense scoring is optional; BM25 works without NumPy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the index layout or scoring changes so stored indexes are rebuilt
+INDEX_VERSION = 1
+
+# Dimension of the hashed dense vectors
+DENSE_DIMENSIONS = 1024
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+class RetrievalIndexError(Exception):
+    """Custom exception for retrieval index errors."""
+
+    pass
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _hash_feature(feature: str) -> int:
+    """Map a feature to a stable signed bucket (positive/negative index)."""
+    digest = int.from_bytes(
+        hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little'
+    )
+    bucket = digest % DENSE_DIMENSIONS
+    return bucket if digest >> 63 else -bucket - 1
+
+
+class RetrievalIndex:
+    """
+    Offline retrieval index over the chunks of one document.
+
+    Chunks are scored with BM25 over their text and heading path. When NumPy
+    is available, each chunk also gets a hashed bag-of-features vector (word
+    unigrams, bigrams and character trigrams) and the final score blends the
+    normalized BM25 score with cosine similarity, which helps with
+    morphological variants BM25 misses. No model or network access is needed.
+    """
+
+    def __init__(
+        self,
+        chunks: List[Dict[str, Any]],
+        use_dense: bool = True,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """
+        Build the index.
+
+        Args:
+            chunks: Document chunks, each with 'text' and 'headings'
+            use_dense: Also score with hashed dense vectors when NumPy is present
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+
+        self._term_freqs = [
+            Counter(tokenize(self._index_text(chunk))) for chunk in chunks
+        ]
+        self._lengths = [sum(freqs.values()) for freqs in self._term_freqs]
+        self._avg_length = (
+            (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        )
+
+        doc_freqs: Counter = Counter()
+        for freqs in self._term_freqs:
+            doc_freqs.update(freqs.keys())
+        self._idf = {
+            term: math.log(1 + (len(chunks) - freq + 0.5) / (freq + 0.5))
+            for term, freq in doc_freqs.items()
+        }
+
+        self._vectors = None
+        if use_dense and np is not None and chunks:
+            self._vectors = np.vstack(
+                [self._embed(self._index_text(chunk)) for chunk in chunks]
+            )
+
+    @property
+    def has_dense(self) -> bool:
+        """Whether dense vectors are used for scoring."""
+        return self._vectors is not None
+
+    @staticmethod
+    def _index_text(chunk: Dict[str, Any]) -> str:
+        """Text indexed for a chunk: its heading path followed by its content."""
+        return ' '.join(chunk.get('headings') or []) + '\n' + chunk['text']
+
+    @staticmethod
+    def _embed(text: str):
+        """Compute the L2-normalized hashed feature vector of a text."""
+        vector = np.zeros(DENSE_DIMENSIONS, dtype=np.float32)
+        tokens = tokenize(text)
+
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for token in tokens:
+            padded = f"#{token}#"
+            features.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+
+        for feature in features:
+            bucket = _hash_feature(feature)
+            if bucket >= 0:
+                vector[bucket] += 1.0
+            else:
+                vector[-bucket - 1] -= 1.0
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _bm25_scores(self, query_terms: List[str]) -> List[float]:
+        """Score every chunk against the query terms with BM25."""
+        scores = []
+        for freqs, length in zip(self._term_freqs, self._lengths):
+            score = 0.0
+            for term in query_terms:
+                freq = freqs.get(term)
+                if not freq:
+                    continue
+                norm = 1 - self.b + self.b * length / (self._avg_length or 1.0)
+                score += (
+                    self._idf[term] * freq * (self.k1 + 1) / (freq + self.k1 * norm)
+                )
+            scores.append(score)
+        return scores
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find the chunks most relevant to a query.
+
+        Args:
+            query: Free-text query, typically the user's prompt
+            top_k: Maximum number of chunks returned
+
+        Returns:
+            Up to top_k chunks in document order, each with its 'score' and
+            'index' in the document
+        """
+        if not self.chunks:
+            return []
+
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        scores = self._bm25_scores(query_terms)
+
+        # Blend normalized BM25 with cosine similarity of the hashed vectors
+        if self._vectors is not None:
+            max_score = max(scores) or 1.0
+            similarities = self._vectors @ self._embed(query)
+            scores = [
+                0.5 * (score / max_score) + 0.5 * max(float(similarity), 0.0)
+                for score, similarity in zip(scores, similarities)
+            ]
+
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        selected = sorted(ranked[: max(1, top_k)])
+
+        return [
+            {**self.chunks[i], 'index': i, 'score': round(scores[i], 4)}
+            for i in selected
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to a JSON-compatible dictionary."""
+        return {
+            'version': INDEX_VERSION,
+            'k1': self.k1,
+            'b': self.b,
+            'chunks': self.chunks,
+            'term_freqs': [dict(freqs) for freqs in self._term_freqs],
+            'idf': self._idf,
+            'vectors': (
+                base64.b64encode(self._vectors.astype(np.float32).tobytes()).decode(
+                    'ascii'
+                )
+                if self._vectors is not None
+                else None
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], use_dense: bool = True):
+        """
+        Load an index serialized with to_dict without re-tokenizing chunks.
+
+        Raises:
+            RetrievalIndexError: If the data was written by another version
+        """
+        if data.get('version') != INDEX_VERSION:
+            raise RetrievalIndexError(
+                f"Unsupported retrieval index version: {data.get('version')}"
+            )
+
+        index = cls.__new__(cls)
+        index.chunks = data['chunks']
+        index.k1 = data['k1']
+        index.b = data['b']
+        index._term_freqs = [Counter(freqs) for freqs in data['term_freqs']]
+        index._lengths = [sum(freqs.values()) for freqs in index._term_freqs]
+        index._avg_length = (
+            (sum(index._lengths) / len(index._lengths)) if index._lengths else 0.0
+        )
+        index._idf = data['idf']
+
+        index._vectors = None
+        if use_dense and np is not None and index.chunks:
+            if data.get('vectors'):
+                index._vectors = np.frombuffer(
+                    base64.b64decode(data['vectors']), dtype=np.float32
+                ).reshape(len(index.chunks), DENSE_DIMENSIONS)
+            else:
+                index._vectors = np.vstack(
+                    [cls._embed(cls._index_text(chunk)) for chunk in index.chunks]
+                )
+
+        return index
+
+
+class RetrievalIndexStore:
+    """
+    Reuse retrieval indexes across requests for the same document.
+
+    Recently used indexes are kept in memory. Indexes are also persisted in
+    an on-disk cache of their own, keyed by the converted document they were
+    built from, so other worker processes and restarts load them instead of
+    rebuilding.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ParseCache] = None,
+        max_entries: int = 32,
+        use_dense: bool = True,
+    ):
+        """
+        Initialize the index store.
+
+        Args:
+            cache: Optional cache used to persist indexes, separate from
+                   the parse cache of converted documents
+            max_entries: Maximum number of indexes kept in memory
+            use_dense: Build indexes with dense vectors when NumPy is present
+        """
+        self.cache = cache
+        self.max_entries = max_entries
+        self.use_dense = use_dense
+        self._indexes: 'OrderedDict[str, RetrievalIndex]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(document_key: str, chunk_tokens: int) -> str:
+        """
+        Build the key of the index of a document.
+
+        Args:
+            document_key: Key identifying the converted document
+            chunk_tokens: Chunk size the index was built with
+
+        Returns:
+            Hex-encoded index key
+        """
+        return ParseCache.make_key(
+            document_key, f"retrieval:v{INDEX_VERSION}:chunks={chunk_tokens}"
+        )
+
+    def get_or_build(
+        self, key: str, build_chunks: Callable[[], List[Dict[str, Any]]]
+    ) -> Tuple[RetrievalIndex, bool]:
+        """
+        Get the index for a key, building it from chunks on a miss.
+
+        Args:
+            key: Index key, see make_key
+            build_chunks: Callable returning the document chunks to index
+
+        Returns:
+            Tuple of (RetrievalIndex, cache_hit)
+        """
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index, True
+
+        index = self._load(key)
+        cache_hit = index is not None
+
+        if index is None:
+            index = RetrievalIndex(build_chunks(), use_dense=self.use_dense)
+            if self.cache:
+                self.cache.put(key, index.to_dict())
+
+        with self._lock:
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+
+        return index, cache_hit
+
+    def _load(self, key: str) -> Optional[RetrievalIndex]:
+        """Load a persisted index from the index cache."""
+        if not self.cache:
+            return None
+
+        data = self.cache.get(key)
+        if not data:
+            return None
+
+        try:
+            return RetrievalIndex.from_dict(data, use_dense=self.use_dense)
+        except Exception as e:
+            logger.warning(f"Ignoring unusable retrieval index {key}: {e}")
+            return None
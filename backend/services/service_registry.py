@@ -0,0 +1,175 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+from config.settings import Config
+from services.document_parser import PIPELINE_PROFILES, DocumentParser
+from services.document_store import DocumentStore, DocumentStoreError
+from services.openai_service import OpenAIService
+from services.parse_cache import ParseCache
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_MODES = ['preload', 'background', 'lazy']
+
+# Process-wide service instances, created on first use
+_lock = threading.Lock()
+_parse_cache: Optional[ParseCache] = None
+_parse_cache_created = False
+_retrieval_index_cache: Optional[ParseCache] = None
+_retrieval_index_cache_created = False
+_document_store: Optional[DocumentStore] = None
+_document_store_created = False
+_document_parser: Optional[DocumentParser] = None
+_openai_service: Optional[OpenAIService] = None
+
+_warm_up_state: Dict[str, Any] = {
+    'status': 'cold',
+    'profiles': [],
+    'started_at': None,
+    'duration_seconds': None,
+    'error': None,
+}
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """Get the shared parse cache, or None when caching is disabled."""
+    global _parse_cache, _parse_cache_created
+    with _lock:
+        if not _parse_cache_created:
+            _parse_cache = (
+                ParseCache(Config.PARSE_CACHE_DIR, Config.PARSE_CACHE_MAX_BYTES)
+                if Config.PARSE_CACHE_ENABLED
+                else None
+            )
+            _parse_cache_created = True
+        return _parse_cache
+
+
+def get_retrieval_index_cache() -> Optional[ParseCache]:
+    """
+    Get the cache persisting retrieval indexes, or None when caching is disabled.
+
+    It is separate from the parse cache so indexes have their own size budget
+    and statistics.
+    """
+    global _retrieval_index_cache, _retrieval_index_cache_created
+    with _lock:
+        if not _retrieval_index_cache_created:
+            _retrieval_index_cache = (
+                ParseCache(
+                    Config.RETRIEVAL_INDEX_CACHE_DIR,
+                    Config.RETRIEVAL_INDEX_CACHE_MAX_BYTES,
+                )
+                if Config.PARSE_CACHE_ENABLED
+                else None
+            )
+            _retrieval_index_cache_created = True
+        return _retrieval_index_cache
+
+
+def get_document_store() -> Optional[DocumentStore]:
+    """Get the shared document store, or None when it is disabled."""
+    global _document_store, _document_store_created
+    with _lock:
+        if not _document_store_created:
+            if Config.DOCUMENT_STORE_ENABLED:
+                try:
+                    _document_store = DocumentStore(
+                        Config.DOCUMENT_STORE_PATH,
+                        Config.DOCUMENT_STORE_MAX_DOCUMENTS,
+                    )
+                except DocumentStoreError as e:
+                    logger.error(f"Document store disabled: {e}")
+            _document_store_created = True
+        return _document_store
+
+
+def get_document_parser() -> DocumentParser:
+    """
+    Get the shared document parser, creating it on first use.
+
+    Creating the parser imports Docling; the layout and OCR models are only
+    loaded by warm_up_models or the first conversion.
+    """
+    global _document_parser
+    cache = get_parse_cache()
+    store = get_document_store()
+    with _lock:
+        if _document_parser is None:
+            _document_parser = DocumentParser.from_config(cache=cache, store=store)
+        return _document_parser
+
+
+def get_openai_service() -> OpenAIService:
+    """Get the shared OpenAI service, creating it on first use."""
+    global _openai_service
+    with _lock:
+        if _openai_service is None:
+            _openai_service = OpenAIService.from_config()
+        return _openai_service
+
+
+def warm_up_models(profiles: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Create the document parser and load the models of its pipelines.
+
+    Failures are recorded in the warm-up state instead of raised: sandboxed
+    conversions then load the models themselves. Profiles load one at a time
+    under the parser's warm-up lock, which sandboxes also hold while forking,
+    so a conversion forked during warm-up waits for the current profile.
+
+    Args:
+        profiles: Pipeline profiles to warm up (default: all of them)
+
+    Returns:
+        The warm-up state after the attempt
+    """
+    started_at = time.time()
+    with _lock:
+        _warm_up_state.update(
+            status='warming',
+            profiles=list(profiles or PIPELINE_PROFILES),
+            started_at=started_at,
+            duration_seconds=None,
+            error=None,
+        )
+
+    try:
+        get_document_parser().warm_up(profiles)
+        status, error = 'ready', None
+        logger.info(
+            f"Models warmed up in {time.time() - started_at:.1f}s "
+            f"(pid {os.getpid()})"
+        )
+
+    except Exception as e:
+        status, error = 'failed', str(e)
+        logger.error(f"Model warm-up failed: {e}")
+
+    with _lock:
+        _warm_up_state.update(
+            status=status,
+            duration_seconds=round(time.time() - started_at, 3),
+            error=error,
+        )
+    return get_warm_up_state()
+
+
+def start_warm_up(profiles: Optional[List[str]] = None) -> threading.Thread:
+    """Warm up the models from a background thread."""
+    with _lock:
+        _warm_up_state['status'] = 'warming'
+
+    thread = threading.Thread(
+        target=warm_up_models, args=(profiles,), name='model-warm-up', daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def get_warm_up_state() -> Dict[str, Any]:
+    """Get a snapshot of the model warm-up state."""
+    with _lock:
+        return dict(_warm_up_state, profiles=list(_warm_up_state['profiles']))
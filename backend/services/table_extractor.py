@@ -0,0 +1,197 @@
+import io
+import csv
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Layouts a table can be returned in:
+# - columns: column names and the cell texts of each column
+# - csv: the table as CSV text, header rows first
+# - arrays: typed column arrays with dtypes, ready for numpy or pyarrow
+TABLE_FORMATS = ['columns', 'csv', 'arrays']
+
+# Numbers as written in financial tables: "1,234.5", "$ 12", "(3.2)", "45%"
+NUMBER_PATTERN = re.compile(
+    r'^(\()?[-+]?[$€£¥]?\s*[-+]?(\d[\d,]*\.?\d*|\.\d+)\s*%?(\))?$'
+)
+
+
+class TableExtractionError(Exception):
+    """Custom exception for table extraction errors."""
+
+    pass
+
+
+def parse_number(text: str) -> Optional[Union[int, float]]:
+    """
+    Parse a numeric cell, or return None when the cell isn't a number.
+
+    Thousands separators, currency symbols and percent signs are dropped, and
+    accounting negatives written in parentheses are negated. Numbers without
+    a decimal point are parsed as exact integers, so ids and amounts beyond
+    2**53 keep every digit.
+    """
+    text = text.strip()
+    match = NUMBER_PATTERN.match(text)
+    if not match or bool(match.group(1)) != bool(match.group(3)):
+        return None
+    digits = match.group(2).replace(',', '')
+    value = float(digits) if '.' in digits else int(digits)
+    negative = match.group(1) or text.lstrip('($€£¥ ').startswith('-')
+    return -value if negative else value
+
+
+def table_rows(table) -> Tuple[List[List[str]], int]:
+    """
+    Read the cell grid of a Docling table.
+
+    Cells spanning several rows or columns repeat their text in each of them.
+
+    Args:
+        table: A Docling TableItem
+
+    Returns:
+        Tuple of (rows of cell texts, number of leading column header rows)
+    """
+    header_rows = 0
+    rows = []
+    for row in table.data.grid:
+        rows.append([cell.text for cell in row])
+        if (
+            header_rows == len(rows) - 1
+            and row
+            and all(cell.column_header for cell in row)
+        ):
+            header_rows += 1
+    return rows, header_rows
+
+
+def column_names(rows: List[List[str]], header_rows: int, num_cols: int) -> List[str]:
+    """
+    Name the columns of a table from its header rows.
+
+    Stacked header rows are joined with " / "; missing and repeated names are
+    replaced with ``column_<n>`` so every name is unique.
+    """
+    names = []
+    seen = set()
+    for col in range(num_cols):
+        parts = []
+        for row in rows[:header_rows]:
+            text = row[col].strip() if col < len(row) else ''
+            if text and (not parts or parts[-1] != text):
+                parts.append(text)
+        name = ' / '.join(parts) or f"column_{col + 1}"
+        if name in seen:
+            name = f"{name}_{col + 1}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _typed_column(values: List[str]) -> Tuple[str, List[Any]]:
+    """Infer a column's dtype and convert its values, empty cells to None."""
+    numbers = [parse_number(value) if value.strip() else None for value in values]
+    if all(
+        number is not None or not value.strip()
+        for number, value in zip(numbers, values)
+    ) and any(number is not None for number in numbers):
+        if all(number is None or isinstance(number, int) for number in numbers):
+            return 'int64', numbers
+        return 'float64', [None if n is None else float(n) for n in numbers]
+    return 'string', [value if value.strip() else None for value in values]
+
+
+def format_table(
+    rows: List[List[str]], header_rows: int, table_format: str = 'columns'
+) -> Dict[str, Any]:
+    """
+    Lay out a table's cells in one of TABLE_FORMATS.
+
+    Args:
+        rows: Rows of cell texts, header rows first
+        header_rows: Number of leading column header rows
+        table_format: One of TABLE_FORMATS
+
+    Returns:
+        ``{'csv': ...}`` for csv; ``columns`` and ``data`` (column name to
+        cell texts) for columns; ``columns``, ``dtypes`` and ``values`` (one
+        typed array per column, nulls for empty cells) for arrays
+
+    Raises:
+        TableExtractionError: If the format isn't supported
+    """
+    if table_format not in TABLE_FORMATS:
+        raise TableExtractionError(f"Unsupported table format: {table_format}")
+
+    if table_format == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        return {'csv': buffer.getvalue()}
+
+    num_cols = max((len(row) for row in rows), default=0)
+    names = column_names(rows, header_rows, num_cols)
+    body = [row + [''] * (num_cols - len(row)) for row in rows[header_rows:]]
+    columns = [[row[col] for row in body] for col in range(num_cols)]
+
+    if table_format == 'columns':
+        return {'columns': names, 'data': dict(zip(names, columns))}
+
+    typed = [_typed_column(column) for column in columns]
+    return {
+        'columns': names,
+        'dtypes': [dtype for dtype, _ in typed],
+        'values': [values for _, values in typed],
+    }
+
+
+def extract_tables(document, table_format: str = 'columns') -> List[Dict[str, Any]]:
+    """
+    Extract every table of a converted document, in reading order.
+
+    The document tree is walked for its tables, page headers and footers
+    included; nothing else is exported.
+
+    Args:
+        document: The converted Docling document
+        table_format: One of TABLE_FORMATS
+
+    Returns:
+        One dictionary per table with its ``index``, ``ref``, ``caption``,
+        size, ``provenance`` (page and bounding box of each region the table
+        spans) and its cells laid out by format_table
+
+    Raises:
+        TableExtractionError: If the format isn't supported
+    """
+    from docling_core.types.doc import ContentLayer, TableItem
+
+    tables = []
+    items = document.iterate_items(
+        included_content_layers={ContentLayer.BODY, ContentLayer.FURNITURE}
+    )
+    reading_order = (item for item, _ in items if isinstance(item, TableItem))
+    for index, table in enumerate(reading_order):
+        rows, header_rows = table_rows(table)
+        tables.append(
+            {
+                'index': index,
+                'ref': table.self_ref,
+                'caption': table.caption_text(document) or None,
+                'num_rows': table.data.num_rows,
+                'num_cols': table.data.num_cols,
+                'header_rows': header_rows,
+                'provenance': [
+                    {
+                        'page': prov.page_no,
+                        'bbox': list(prov.bbox.as_tuple()),
+                        'coord_origin': prov.bbox.coord_origin.value,
+                    }
+                    for prov in table.prov
+                ],
+                **format_table(rows, header_rows, table_format),
+            }
+        )
+    return tables
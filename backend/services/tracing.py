@@ -0,0 +1,365 @@
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Request ids from clients become part of trace file names, so only simple
+# ones are kept
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+# Trace ids are the request id plus a server-generated suffix
+TRACE_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}-[0-9a-f]{8}$')
+
+PROFILE_HEADER = 'X-Profile'
+REQUEST_ID_HEADER = 'X-Request-ID'
+TRACE_HEADER = 'X-Profile-Trace'
+
+
+class TracingError(Exception):
+    """Custom exception for request tracing errors."""
+
+    pass
+
+
+class StackSampler:
+    """
+    Statistical profiler sampling Python stacks from a background thread.
+
+    Every ``interval`` seconds the stacks of the thread that started the
+    sampler, and of any thread started while sampling (converter worker
+    pools), are recorded in the folded format read by flamegraph.pl and
+    speedscope. Threads already running when sampling started, such as those
+    serving other requests, are left out.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ignored: set = set()
+
+    def start(self) -> None:
+        """Start sampling the calling thread."""
+        caller = threading.get_ident()
+        self._ignored = set(sys._current_frames()) - {caller}
+        self._thread = threading.Thread(
+            target=self._run, name='stack-sampler', daemon=True
+        )
+        self._thread.start()
+        self._ignored.add(self._thread.ident)
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'StackSampler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in self._ignored:
+                    self.stacks[self._fold(frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _fold(frame) -> str:
+        """Render a stack root first, frames separated by semicolons."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            file_name = '/'.join(code.co_filename.split(os.sep)[-2:])
+            name = getattr(code, 'co_qualname', code.co_name)
+            names.append(f"{name} ({file_name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names)).replace('\n', ' ')
+
+
+class RequestTrace:
+    """Stage timings, and optionally a stack profile, of one request."""
+
+    def __init__(
+        self,
+        request_id: str,
+        profile: bool = False,
+        interval: float = 0.005,
+    ):
+        """
+        Initialize the request trace.
+
+        Args:
+            request_id: Id of the request, echoed in response headers
+            profile: Whether stages are profiled with a StackSampler
+            interval: Seconds between profiling samples
+        """
+        self.request_id = request_id
+        # Names the trace files: request ids come from clients and repeat
+        # across retries, so they alone would let traces overwrite each other
+        self.trace_id = f"{request_id}-{uuid.uuid4().hex[:8]}"
+        self.profile = profile
+        self.interval = interval
+        self.started_at = time.time()
+        self.stages: List[Tuple[str, float, str]] = []
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def add_stage(self, stage: str, seconds: float, description: str = '') -> None:
+        """Record the duration of a pipeline stage."""
+        self.stages.append((stage, seconds, description))
+
+    def add_stacks(self, stage: str, stacks: Dict[str, int], samples: int) -> None:
+        """Add folded stacks sampled during a stage, rooted at the stage name."""
+        for stack, count in stacks.items():
+            self.stacks[f"{stage};{stack}"] += count
+        self.samples += samples
+
+    def server_timing(self, total_seconds: Optional[float] = None) -> str:
+        """
+        Render the stage timings as a Server-Timing header value.
+
+        Repeated stages with the same description are summed.
+        """
+        durations: Dict[Tuple[str, str], float] = {}
+        for stage, seconds, description in self.stages:
+            key = (stage, description)
+            durations[key] = durations.get(key, 0.0) + seconds
+
+        metrics = []
+        for (stage, description), seconds in durations.items():
+            metric = f"{stage};dur={seconds * 1000:.1f}"
+            if description:
+                metric += f';desc="{description}"'
+            metrics.append(metric)
+        if total_seconds is not None:
+            metrics.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ', '.join(metrics)
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar(
+    'current_trace', default=None
+)
+
+
+@contextmanager
+def activate(trace: RequestTrace) -> Iterator[RequestTrace]:
+    """Make a trace current for a block of code run outside of a request."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def record_stage(stage: str, seconds: float, description: str = '') -> None:
+    """Record a stage duration in the current request's trace, if any."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_stage(stage, seconds, description)
+
+
+@contextmanager
+def sample_stage(stage: str) -> Iterator[Optional[StackSampler]]:
+    """
+    Profile a stage when the current request is being profiled.
+
+    Yields the sampler, or None when the request isn't profiled. The samples
+    are added to the current trace. Code running in a sandbox process only
+    has a copy of the trace, so it returns the sampler's ``stacks`` and
+    ``samples`` to the parent, which adds them with add_stacks.
+
+    Args:
+        stage: Stage name the sampled stacks are rooted at
+    """
+    trace = _current_trace.get()
+    if trace is None or not trace.profile:
+        yield None
+        return
+
+    sampler = StackSampler(trace.interval)
+    with sampler:
+        yield sampler
+    trace.add_stacks(stage, sampler.stacks, sampler.samples)
+
+
+def add_stacks(stage: str, profile: Optional[Dict[str, Any]]) -> None:
+    """Add stacks sampled in a sandbox process to the current trace."""
+    trace = _current_trace.get()
+    if trace is not None and profile:
+        trace.add_stacks(stage, profile['stacks'], profile['samples'])
+
+
+def write_trace(trace: RequestTrace, trace_dir: str, max_traces: int = 0) -> str:
+    """
+    Write the stack profile of a request to the trace directory.
+
+    ``<trace_id>.folded`` holds one "stack count" line per sampled stack,
+    ready for flamegraph.pl or speedscope; ``<trace_id>.json`` holds the
+    stage timings. The oldest traces are removed beyond ``max_traces``.
+
+    Returns:
+        Path of the folded stacks file
+
+    Raises:
+        TracingError: If the trace can't be written
+    """
+    try:
+        os.makedirs(trace_dir, exist_ok=True)
+        folded_path = os.path.join(trace_dir, f"{trace.trace_id}.folded")
+        with open(folded_path, 'w', encoding='utf-8') as f:
+            for stack, count in trace.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        with open(
+            os.path.join(trace_dir, f"{trace.trace_id}.json"), 'w', encoding='utf-8'
+        ) as f:
+            json.dump(
+                {
+                    'trace_id': trace.trace_id,
+                    'request_id': trace.request_id,
+                    'started_at': trace.started_at,
+                    'interval_seconds': trace.interval,
+                    'samples': trace.samples,
+                    'stages': [
+                        {'stage': stage, 'seconds': round(seconds, 4), 'desc': desc}
+                        for stage, seconds, desc in trace.stages
+                    ],
+                },
+                f,
+                indent=2,
+            )
+
+    except OSError as e:
+        raise TracingError(f"Failed to write trace {trace.trace_id}: {e}")
+
+    if max_traces > 0:
+        _prune_traces(trace_dir, max_traces)
+    return folded_path
+
+
+def _prune_traces(trace_dir: str, max_traces: int) -> None:
+    """Remove the oldest traces beyond ``max_traces``."""
+    try:
+        folded = [
+            os.path.join(trace_dir, name)
+            for name in os.listdir(trace_dir)
+            if name.endswith('.folded')
+        ]
+        folded.sort(key=os.path.getmtime)
+        for path in folded[: max(0, len(folded) - max_traces)]:
+            for stale in (path, path[: -len('.folded')] + '.json'):
+                if os.path.exists(stale):
+                    os.remove(stale)
+    except OSError as e:
+        logger.warning(f"Failed to prune traces in {trace_dir}: {e}")
+
+
+def get_trace_path(trace_id: str, trace_dir: str) -> Optional[str]:
+    """Get the folded stacks file of a trace, or None if there is none."""
+    if not TRACE_ID_PATTERN.match(trace_id):
+        return None
+    path = os.path.join(trace_dir, f"{trace_id}.folded")
+    return path if os.path.exists(path) else None
+
+
+def init_app(app) -> None:
+    """
+    Trace every request of a Flask app.
+
+    Responses carry the request id and a Server-Timing header with the
+    duration of each pipeline stage. When profiling is enabled, requests
+    sending ``X-Profile: true`` (and a PROFILING_SAMPLE_RATE fraction of
+    the others) are profiled and their trace is written to PROFILING_TRACE_DIR,
+    named by the ``X-Profile-Trace`` response header.
+
+    Headers are sent before a streamed body is produced, so the Server-Timing
+    of streamed responses (/parse with stream=true, /analyze/stream) only
+    covers the stages run before streaming, such as conversion. Their trace
+    is finished when the response is closed, so stages run while streaming,
+    such as export and analysis, are recorded in the written trace.
+    """
+    from flask import g, request
+
+    config = app.config
+
+    def finish_trace(trace: RequestTrace) -> None:
+        _current_trace.set(None)
+        if not trace.profile:
+            return
+        try:
+            path = write_trace(
+                trace, config['PROFILING_TRACE_DIR'], config['PROFILING_MAX_TRACES']
+            )
+            logger.info(
+                f"Wrote profile of request {trace.request_id} "
+                f"({trace.samples} samples) to {path}"
+            )
+        except TracingError as e:
+            logger.error(str(e))
+
+    @app.before_request
+    def _start_trace():
+        request_id = request.headers.get(REQUEST_ID_HEADER, '')
+        if not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        profile = config['PROFILING_ENABLED'] and (
+            request.headers.get(PROFILE_HEADER, '').lower() in ('1', 'true')
+            or random.random() < config['PROFILING_SAMPLE_RATE']
+        )
+        trace = RequestTrace(
+            request_id, profile, config['PROFILING_INTERVAL_MS'] / 1000
+        )
+        g.trace = trace
+        _current_trace.set(trace)
+        g.trace_started_at = time.perf_counter()
+
+    @app.after_request
+    def _add_trace_headers(response):
+        trace = g.get('trace')
+        if trace is None:
+            return response
+
+        response.headers[REQUEST_ID_HEADER] = trace.request_id
+        response.headers['Server-Timing'] = trace.server_timing(
+            time.perf_counter() - g.trace_started_at
+        )
+        if trace.profile:
+            response.headers[TRACE_HEADER] = trace.trace_id
+        if response.is_streamed:
+            # The body is produced after teardown; keep the trace current
+            # while it streams and write it once the response is closed
+            g.trace_deferred = True
+            response.call_on_close(lambda: finish_trace(trace))
+        return response
+
+    @app.teardown_request
+    def _finish_trace(error=None):
+        trace = g.pop('trace', None)
+        if trace is None:
+            _current_trace.set(None)
+        elif not g.pop('trace_deferred', False):
+            finish_trace(trace)
@@ -1,9 +1,9 @@
 import React, { useState } from "react";
-import { OutputFormat } from "../types/api";
+import { OutputFormat, ParsedContent } from "../types/api";
 import "./ParsedContentDisplay.css";
 
 interface ParsedContentDisplayProps {
-	content: string;
+	content: ParsedContent;
 	format: OutputFormat;
 	title?: string;
 }
@@ -15,10 +15,12 @@ const ParsedContentDisplay: React.FC<ParsedContentDisplayProps> = ({
 }) => {
 	const [isCollapsed, setIsCollapsed] = useState<boolean>(false);
 	const [copySuccess, setCopySuccess] = useState<boolean>(false);
+	const text =
+		typeof content === "string" ? content : JSON.stringify(content, null, 2);
 
 	const handleCopy = async () => {
 		try {
-			await navigator.clipboard.writeText(content);
+			await navigator.clipboard.writeText(text);
 			setCopySuccess(true);
 			setTimeout(() => setCopySuccess(false), 2000);
 		} catch (err) {
@@ -98,13 +100,13 @@ const ParsedContentDisplay: React.FC<ParsedContentDisplayProps> = ({
 
 			{isCollapsed ? (
 				<div className="content-preview">
-					<div className="preview-text">{getContentPreview(content)}</div>
+					<div className="preview-text">{getContentPreview(text)}</div>
 					<button onClick={() => setIsCollapsed(false)} className="expand-link">
 						Click to expand full content
 					</button>
 				</div>
 			) : (
-				<div className="content-body">{formatContent(content, format)}</div>
+				<div className="content-body">{formatContent(text, format)}</div>
 			)}
 		</div>
 	);
@@ -6,6 +6,10 @@ import {
 	OutputFormatsResponse,
 	ParseResult,
 	OutputFormat,
+	Job,
+	JobResponse,
+	AnalysisStreamHandlers,
+	QuestionsResult,
 } from "../types/api";
 
 // Environment variable for React apps
@@ -63,6 +67,140 @@ export const analyzeDocument = async (
 	}
 };
 
+export const analyzeDocumentQuestions = async (
+	file: File,
+	prompts: string[],
+	outputFormat: OutputFormat = "markdown"
+): Promise<QuestionsResult> => {
+	try {
+		const formData = new FormData();
+		formData.append("file", file);
+		prompts.forEach((prompt) => formData.append("prompts", prompt));
+		formData.append("output_format", outputFormat);
+
+		const response = await api.post<QuestionsResult>(
+			"/analyze/questions",
+			formData
+		);
+
+		if (!response.data.success) {
+			throw new Error("Analysis failed");
+		}
+
+		return response.data;
+	} catch (error) {
+		const axiosError = error as AxiosError<{ error: string }>;
+
+		if (axiosError.response?.data?.error) {
+			throw new ApiError(axiosError.response.data.error);
+		} else if (axiosError.message === "timeout of 300000ms exceeded") {
+			throw new ApiError(
+				"Request timed out. The document might be too large or complex."
+			);
+		} else if (axiosError.message === "Network Error") {
+			throw new ApiError(
+				"Unable to connect to the server. Please check if the backend is running."
+			);
+		} else {
+			throw new ApiError(axiosError.message || "An unexpected error occurred");
+		}
+	}
+};
+
+const parseSseEvent = (raw: string): { event: string; data: any } => {
+	let event = "message";
+	const dataLines: string[] = [];
+
+	for (const line of raw.split("\n")) {
+		if (line.startsWith("event:")) {
+			event = line.slice(6).trim();
+		} else if (line.startsWith("data:")) {
+			dataLines.push(line.slice(5).trimStart());
+		}
+	}
+
+	return {
+		event,
+		data: dataLines.length ? JSON.parse(dataLines.join("\n")) : null,
+	};
+};
+
+export const analyzeDocumentStream = async (
+	file: File,
+	prompt: string,
+	outputFormat: OutputFormat = "markdown",
+	handlers: AnalysisStreamHandlers = {},
+	signal?: AbortSignal
+): Promise<string> => {
+	const formData = new FormData();
+	formData.append("file", file);
+	formData.append("prompt", prompt);
+	formData.append("output_format", outputFormat);
+
+	// EventSource only supports GET, so read the SSE stream through fetch
+	let response: Response;
+	try {
+		response = await fetch(`${API_BASE_URL}/analyze/stream`, {
+			method: "POST",
+			body: formData,
+			headers: { Accept: "text/event-stream" },
+			signal,
+		});
+	} catch (error) {
+		if ((error as Error).name === "AbortError") {
+			throw error;
+		}
+		throw new ApiError(
+			"Unable to connect to the server. Please check if the backend is running."
+		);
+	}
+
+	if (!response.ok || !response.body) {
+		const body = await response.json().catch(() => null);
+		throw new ApiError(body?.error || "Analysis failed", response.status);
+	}
+
+	const reader = response.body.getReader();
+	const decoder = new TextDecoder();
+	let buffer = "";
+	let analysis = "";
+
+	for (;;) {
+		const { done, value } = await reader.read();
+		if (done) {
+			break;
+		}
+
+		buffer += decoder.decode(value, { stream: true });
+
+		let boundary = buffer.indexOf("\n\n");
+		while (boundary !== -1) {
+			const { event, data } = parseSseEvent(buffer.slice(0, boundary));
+			buffer = buffer.slice(boundary + 2);
+			boundary = buffer.indexOf("\n\n");
+
+			switch (event) {
+				case "metadata":
+					handlers.onMetadata?.(data);
+					break;
+				case "token":
+					analysis += data.content;
+					handlers.onToken?.(data.content);
+					break;
+				case "usage":
+					handlers.onUsage?.(data);
+					break;
+				case "error":
+					throw new ApiError(data?.error || "Analysis failed");
+				case "done":
+					return analysis;
+			}
+		}
+	}
+
+	return analysis;
+};
+
 export const parseDocument = async (
 	file: File,
 	outputFormat: OutputFormat = "markdown"
@@ -143,6 +281,64 @@ export const validateFile = async (file: File): Promise<ValidationResponse> => {
 	}
 };
 
+export const createJob = async (
+	file: File,
+	outputFormat: OutputFormat = "markdown",
+	prompt?: string
+): Promise<Job> => {
+	try {
+		const formData = new FormData();
+		formData.append("file", file);
+		formData.append("output_format", outputFormat);
+		if (prompt) {
+			formData.append("prompt", prompt);
+		}
+
+		const response = await api.post<JobResponse>("/jobs", formData);
+		return response.data.job;
+	} catch (error) {
+		const axiosError = error as AxiosError<{ error: string }>;
+		throw new ApiError(
+			axiosError.response?.data?.error || "Failed to create job",
+			axiosError.response?.status
+		);
+	}
+};
+
+export const getJob = async (jobId: string): Promise<Job> => {
+	try {
+		const response = await api.get<JobResponse>(`/jobs/${jobId}`);
+		return response.data.job;
+	} catch (error) {
+		const axiosError = error as AxiosError<{ error: string }>;
+		throw new ApiError(
+			axiosError.response?.data?.error || "Failed to get job status",
+			axiosError.response?.status
+		);
+	}
+};
+
+export const waitForJob = async (
+	jobId: string,
+	onProgress?: (job: Job) => void,
+	pollIntervalMs: number = 1000
+): Promise<Job> => {
+	// Poll with short requests instead of holding one long-lived connection
+	for (;;) {
+		const job = await getJob(jobId);
+		onProgress?.(job);
+
+		if (job.status === "completed") {
+			return job;
+		}
+		if (job.status === "failed") {
+			throw new ApiError(job.error || "Job failed");
+		}
+
+		await new Promise((resolve) => setTimeout(resolve, pollIntervalMs));
+	}
+};
+
 export class ApiError extends Error {
 	constructor(message: string, public status?: number) {
 		super(message);
@@ -6,32 +6,98 @@ export interface DocumentMetadata {
 	tables_count: number;
 	images_count: number;
 	output_format?: string;
+	document_id?: string;
 }
 
 export interface UsageInfo {
 	prompt_tokens: number;
 	completion_tokens: number;
 	total_tokens: number;
+	cached_tokens?: number;
 	model_used: string;
 }
 
+// Parsed documents are nested JSON objects with output_format=json, else text
+export type ParsedContent = string | Record<string, unknown>;
+
 export interface AnalysisResult {
 	success: boolean;
 	analysis: string;
-	parsed_content?: string;
+	parsed_content?: ParsedContent;
 	metadata: {
 		document: DocumentMetadata;
 		usage: UsageInfo;
 		model: string;
+		cached: boolean;
+	};
+}
+
+export interface QuestionAnswer {
+	prompt: string;
+	success: boolean;
+	analysis?: string;
+	usage?: UsageInfo;
+	cached?: boolean;
+	finish_reason?: string | null;
+	error?: string;
+}
+
+export interface QuestionsResult {
+	success: boolean;
+	answers: QuestionAnswer[];
+	parsed_content?: ParsedContent;
+	metadata: {
+		document: DocumentMetadata;
+		usage: UsageInfo & { calls: number };
+		model: string;
 	};
 }
 
+export interface AnalysisStreamMetadata {
+	document: DocumentMetadata;
+	parsed_content?: ParsedContent;
+}
+
+export interface AnalysisStreamUsage {
+	usage: UsageInfo;
+	model: string;
+	finish_reason: string | null;
+	cached: boolean;
+}
+
+export interface AnalysisStreamHandlers {
+	onMetadata?: (event: AnalysisStreamMetadata) => void;
+	onToken?: (content: string) => void;
+	onUsage?: (event: AnalysisStreamUsage) => void;
+}
+
 export interface ParseResult {
 	success: boolean;
-	content: string;
+	content: ParsedContent;
 	metadata: DocumentMetadata;
 }
 
+export type JobStatus = "queued" | "running" | "completed" | "failed";
+
+export interface Job {
+	id: string;
+	kind: "parse" | "analyze";
+	status: JobStatus;
+	stage: string;
+	progress: number;
+	output_format: OutputFormat;
+	created_at: number;
+	updated_at: number;
+	result: Omit<ParseResult, "success"> | Omit<AnalysisResult, "success"> | null;
+	error: string | null;
+}
+
+export interface JobResponse {
+	success: boolean;
+	job: Job;
+	status_url?: string;
+}
+
 export interface SupportedFormatsResponse {
 	success: boolean;
 	formats: string[];